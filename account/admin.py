@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, UserAvatar, PerfilPCD, PerfilMedico, PerfilEmpresa
+from .models import User, UserAvatar, PerfilPCD, PerfilMedico, PerfilEmpresa, EmailPendente
+from .avatars import url_avatar_tamanho
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -43,17 +44,16 @@ class UserAdmin(BaseUserAdmin):
     tipo_usuario.short_description = 'Tipo'
 
     def avatar_preview(self, obj):
-        url = obj.get_foto_url()
-        if url and 'default' not in url:
-            return format_html('<img src="{}" style="width:80px; height:80px; object-fit:cover; border-radius:50%;">', url)
+        if obj.avatar_path:
+            return format_html('<img src="{}" style="width:80px; height:80px; object-fit:cover; border-radius:50%;">', url_avatar_tamanho(obj.avatar_path, 160))
         return "Sem avatar"
     avatar_preview.short_description = 'Foto atual'
 
 @admin.register(UserAvatar)
 class UserAvatarAdmin(admin.ModelAdmin):
-    list_display = ['user', 'criado_em', 'is_atual']
-    list_filter = ['is_atual', 'criado_em']
-    readonly_fields = ['user', 'imagem', 'criado_em']
+    list_display = ['user', 'criado_em', 'is_atual', 'status']
+    list_filter = ['is_atual', 'status', 'criado_em']
+    readonly_fields = ['user', 'imagem', 'status', 'criado_em']
 
 @admin.register(PerfilPCD)
 class PerfilPCDAdmin(admin.ModelAdmin):
@@ -69,4 +69,12 @@ class PerfilMedicoAdmin(admin.ModelAdmin):
 @admin.register(PerfilEmpresa)
 class PerfilEmpresaAdmin(admin.ModelAdmin):
     list_display = ['user', 'cnpj', 'razao_social', 'telefone_principal']
-    search_fields = ['user__email', 'user__nome_completo', 'cnpj', 'razao_social']
\ No newline at end of file
+    search_fields = ['user__email', 'user__nome_completo', 'cnpj', 'razao_social']
+
+
+@admin.register(EmailPendente)
+class EmailPendenteAdmin(admin.ModelAdmin):
+    list_display = ['assunto', 'status', 'tentativas', 'proxima_tentativa_em', 'criado_em', 'enviado_em']
+    list_filter = ['status', 'criado_em']
+    search_fields = ['assunto', 'id_provedor']
+    readonly_fields = ['remetente', 'destinatarios', 'assunto', 'html', 'texto', 'tentativas', 'ultimo_erro', 'id_provedor', 'criado_em', 'enviado_em']
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
-    verbose_name = 'Contas e Autenticação'
\ No newline at end of file
+    verbose_name = 'Contas e Autenticação'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,104 @@
+"""
+Registro de atividade (User.ultima_sessao) com escrita agrupada.
+
+Cada usuário grava no máximo uma vez por janela (settings.ATIVIDADE_JANELA
+segundos): a primeira atividade da janela marca uma chave no cache e as
+seguintes são descartadas sem tocar no banco. Os horários acumulados são
+aplicados em lote com um único UPDATE ... CASE quando o intervalo de flush
+expira, o buffer enche ou o processo termina (src/flush.py).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from src.flush import FlushPeriodico
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+LIMITE_BUFFER = 1000
+
+
+def aplicar_atividades(ultimas):
+    """Aplica {user_id: datetime} com um UPDATE ... CASE por lote."""
+    ids = list(ultimas)
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        lote = ids[inicio:inicio + TAMANHO_LOTE]
+        ultima_sessao = Case(
+            *[When(pk=user_id, then=Value(ultimas[user_id])) for user_id in lote],
+            output_field=DateTimeField(),
+        )
+        User.objects.filter(pk__in=lote).update(ultima_sessao=ultima_sessao)
+    return len(ids)
+
+
+class BufferAtividade:
+    def __init__(self, intervalo, limite=LIMITE_BUFFER):
+        self.intervalo = intervalo
+        self.limite = limite
+        self._lock = threading.Lock()
+        self._ultimas = {}
+        self._ultimo_flush = time.monotonic()
+        self._periodico = FlushPeriodico(intervalo, self.flush, 'atividades')
+
+    def registrar(self, user_id, quando):
+        with self._lock:
+            self._ultimas[user_id] = quando
+            vencido = time.monotonic() - self._ultimo_flush >= self.intervalo
+            if not (vencido or len(self._ultimas) >= self.limite):
+                self._periodico.agendar()
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            ultimas, self._ultimas = self._ultimas, {}
+            self._ultimo_flush = time.monotonic()
+        if not ultimas:
+            return 0
+        try:
+            return aplicar_atividades(ultimas)
+        except Exception:
+            with self._lock:
+                for user_id, quando in ultimas.items():
+                    self._ultimas.setdefault(user_id, quando)
+            raise
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = BufferAtividade(getattr(settings, 'ATIVIDADE_FLUSH_INTERVALO', 30))
+    return _buffer
+
+
+def registrar_atividade(user):
+    if not cache.add(f'atividade:{user.pk}', 1, getattr(settings, 'ATIVIDADE_JANELA', 300)):
+        return
+    agora = timezone.now()
+    user.ultima_sessao = agora
+    if getattr(settings, 'ATIVIDADE_FLUSH_SINCRONO', False):
+        aplicar_atividades({user.pk: agora})
+        return
+    try:
+        get_buffer().registrar(user.pk, agora)
+    except Exception:
+        # Atividade é informativa; nunca deve derrubar a requisição
+        logger.warning("Falha ao registrar atividade do usuário %s", user.pk, exc_info=True)
+
+
+def flush_atividades():
+    return get_buffer().flush()
@@ -0,0 +1,215 @@
+"""
+Avatares: processamento em segundo plano, variantes e URLs sem query.
+
+O upload grava o original e agenda processar_avatar (Celery), que gera fora da
+requisição as variantes VARIANTES (WebP e JPEG em cada tamanho). Até lá
+User.avatar_path fica vazio e as páginas mostram o avatar padrão. Avatares
+que ficam em 'processando' (broker fora no upload) são reagendados pelo beat.
+
+As variantes ficam em avatars/v/<sha256 do original>/<tamanho>.<ext>: o mesmo
+arquivo enviado de novo reaproveita as variantes existentes sem reprocessar.
+O avatar aponta para a maior variante JPEG; as demais são derivadas do caminho.
+
+URLs (assinadas quando AWS_QUERYSTRING_AUTH) e srcsets ficam em cache até
+pouco antes de a assinatura expirar.
+"""
+import hashlib
+import logging
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+TAMANHOS = (64, 160, 400, 800)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+PASTA_VARIANTES = 'avatars/v'
+
+AVATAR_PADRAO = '/static/img/avatar-default.png'
+# Fração da validade da assinatura descartada antes de expirar, para que uma
+# página servida do cache não entregue um link que vença logo em seguida
+MARGEM_EXPIRACAO = 0.1
+# Maior que a janela de tentativas da task: um avatar 'processando' há mais
+# tempo que isso não tem task pendente
+REAGENDAR_APOS = timedelta(minutes=30)
+LOTE_REAGENDAMENTO = 100
+
+
+def _timeout():
+    if not getattr(settings, 'AWS_QUERYSTRING_AUTH', False):
+        return None
+    expira = getattr(settings, 'AWS_QUERYSTRING_EXPIRE', 3600)
+    return max(int(expira * (1 - MARGEM_EXPIRACAO)), 1)
+
+
+def _cache_key(path):
+    return f'avatar:url:{hashlib.md5(path.encode()).hexdigest()}'
+
+
+def url_avatar(path, storage=None):
+    if not path:
+        return AVATAR_PADRAO
+    key = _cache_key(path)
+    url = cache.get(key)
+    if url is None:
+        url = (storage or default_storage).url(path)
+        cache.set(key, url, _timeout())
+    return url
+
+
+def esquecer_url_avatar(path):
+    if path:
+        cache.delete(_cache_key(path))
+
+
+def srcset_avatar(path, ext='jpg'):
+    """Valor de srcset com todas as variantes; vazio para avatares sem variantes."""
+    if caminho_variante(path, max(TAMANHOS), ext) is None:
+        return ''
+    key = f'avatar:srcset:{ext}:{hashlib.md5(path.encode()).hexdigest()}'
+    srcset = cache.get(key)
+    if srcset is None:
+        srcset = ', '.join(
+            f'{url_avatar(caminho_variante(path, tamanho, ext))} {tamanho}w' for tamanho in TAMANHOS
+        )
+        cache.set(key, srcset, _timeout())
+    return srcset
+
+
+def url_avatar_tamanho(path, tamanho, ext='jpg'):
+    """URL da menor variante que cobre `tamanho` px (o avatar inteiro se não houver variantes)."""
+    tamanho = next((t for t in TAMANHOS if t >= tamanho), max(TAMANHOS))
+    return url_avatar(caminho_variante(path, tamanho, ext) or path)
+
+
+def _pasta(hash_conteudo):
+    return f'{PASTA_VARIANTES}/{hash_conteudo}'
+
+
+def caminho_variante(path, tamanho, ext='jpg'):
+    """Caminho da variante a partir do caminho do avatar; None para avatares sem variantes."""
+    if not path or not path.startswith(PASTA_VARIANTES + '/'):
+        return None
+    return f'{posixpath.dirname(path)}/{tamanho}.{ext}'
+
+
+def _gerar_variantes(dados, pasta, storage):
+    img = Image.open(BytesIO(dados))
+    maior = max(TAMANHOS)
+    if img.format == 'JPEG':
+        # Decodifica direto numa escala menor (1/2, 1/4, 1/8) em vez da foto inteira
+        img.draft('RGB', (maior, maior))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Do maior para o menor: cada redução parte da anterior, não do original
+    for tamanho in sorted(TAMANHOS, reverse=True):
+        img.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+        for ext, (formato, opcoes) in FORMATOS.items():
+            caminho = f'{pasta}/{tamanho}.{ext}'
+            if storage.exists(caminho):
+                continue
+            output = BytesIO()
+            img.save(output, format=formato, **opcoes)
+            storage.save(caminho, ContentFile(output.getvalue()))
+
+
+def marcar_erro_avatar(avatar_id):
+    from .models import UserAvatar
+
+    UserAvatar.objects.filter(pk=avatar_id, status='processando').update(status='erro')
+
+
+def processar_avatar(avatar_id):
+    """
+    Gera as variantes do avatar. Erros do storage que não são OSError (p.ex.
+    botocore) sobem para a task tentar de novo; imagem inválida vira 'erro'.
+    """
+    from .models import User, UserAvatar
+
+    avatar = UserAvatar.objects.filter(pk=avatar_id, status='processando').first()
+    if avatar is None:
+        return
+
+    original = avatar.imagem.name
+    storage = avatar.imagem.storage
+    try:
+        with avatar.imagem.open('rb') as arquivo:
+            dados = arquivo.read()
+        hash_conteudo = hashlib.sha256(dados).hexdigest()
+        if not UserAvatar.objects.filter(hash_conteudo=hash_conteudo, status='pronto').exists():
+            _gerar_variantes(dados, _pasta(hash_conteudo), storage)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # Imagem inválida: tentar de novo não adianta
+        logger.warning("Falha ao processar avatar %s", avatar_id, exc_info=True)
+        marcar_erro_avatar(avatar_id)
+        return
+
+    principal = f'{_pasta(hash_conteudo)}/{max(TAMANHOS)}.jpg'
+    with transaction.atomic():
+        UserAvatar.objects.filter(pk=avatar_id).update(imagem=principal, hash_conteudo=hash_conteudo, status='pronto')
+        User.objects.filter(pk=avatar.user_id, avatar_id=avatar_id).update(avatar_path=principal)
+
+    if original != principal:
+        storage.delete(original)
+
+
+def remover_arquivos_avatar(nome, hash_conteudo):
+    """Apaga os arquivos de um avatar removido, preservando variantes ainda usadas por outro."""
+    from .models import UserAvatar
+
+    storage = UserAvatar._meta.get_field('imagem').storage
+    if not hash_conteudo:
+        caminhos = [nome]
+    elif UserAvatar.objects.filter(hash_conteudo=hash_conteudo).exists():
+        caminhos = []
+    else:
+        pasta = _pasta(hash_conteudo)
+        caminhos = [f'{pasta}/{tamanho}.{ext}' for tamanho in TAMANHOS for ext in FORMATOS]
+
+    for caminho in caminhos:
+        esquecer_url_avatar(caminho)
+        if caminho and storage.exists(caminho):
+            storage.delete(caminho)
+
+
+def agendar_processamento_avatar(avatar_id):
+    if getattr(settings, 'AVATAR_PROCESSAMENTO_SINCRONO', False):
+        try:
+            processar_avatar(avatar_id)
+        except Exception:
+            logger.exception("Falha ao processar avatar %s", avatar_id)
+            marcar_erro_avatar(avatar_id)
+        return
+    from .tasks import processar_avatar_task
+    try:
+        processar_avatar_task.delay(avatar_id)
+    except Exception:
+        # O upload já foi gravado; reagendar_avatares_pendentes pega o avatar depois
+        logger.warning("Falha ao agendar processamento do avatar %s", avatar_id, exc_info=True)
+
+
+def reagendar_avatares_pendentes():
+    from .models import UserAvatar
+    from .tasks import processar_avatar_task
+
+    pendentes = list(
+        UserAvatar.objects
+        .filter(status='processando', criado_em__lt=timezone.now() - REAGENDAR_APOS)
+        .order_by('criado_em')
+        .values_list('pk', flat=True)[:LOTE_REAGENDAMENTO]
+    )
+    for avatar_id in pendentes:
+        processar_avatar_task.delay(avatar_id)
+    return len(pendentes)
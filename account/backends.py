@@ -0,0 +1,15 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+from .papeis import PERFIS
+
+
+class PerfilBackend(ModelBackend):
+    """ModelBackend que carrega os perfis do usuário no mesmo SELECT da sessão."""
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related(*PERFIS).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
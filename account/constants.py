@@ -5,6 +5,9 @@ class Routes:
     ACCOUNT_FORGOT_PASSWORD = "account:forgot_password"        
     ACCOUNT_RESET_COMPLETE = "account:password_reset_complete"  
 
+class Grupos:
+    MEDICO = "Médico"
+
 class Messages:
     LOGIN_SUCCESS = "Bem-vindo de volta, {}!"
     REGISTER_PCD_SUCCESS = "Bem-vindo à Plataforma PCD, {}!"
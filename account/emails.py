@@ -0,0 +1,224 @@
+"""
+Fila de saída de e-mails transacionais.
+
+enfileirar_email() grava o e-mail em EmailPendente dentro da transação de quem
+chama: se a transação desfizer, nada é enviado. Depois do commit a task
+enviar_emails_pendentes_task drena a fila em lotes, com novas tentativas em
+backoff exponencial e limite de envios por minuto.
+
+settings.EMAIL_OUTBOX_BACKEND escolhe o envio:
+    account.emails.BackendResend  API de lote do Resend
+    account.emails.BackendDjango  settings.EMAIL_BACKEND do Django (console,
+                                  arquivo, SMTP...), útil offline e em testes
+"""
+import logging
+from datetime import timedelta
+
+import resend
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from .models import EmailPendente
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE = 30
+BACKOFF_MAXIMO = 60 * 60 * 6
+# Tempo que um lote fica reservado para um worker antes de voltar à fila
+RESERVA = timedelta(minutes=5)
+
+
+class BackendResend:
+    LOTE_MAXIMO = 100
+
+    def __init__(self):
+        resend.api_key = settings.API_RESEND
+
+    def enviar(self, emails):
+        resultados = []
+        for inicio in range(0, len(emails), self.LOTE_MAXIMO):
+            lote = emails[inicio:inicio + self.LOTE_MAXIMO]
+            params = [
+                {
+                    'from': email.remetente,
+                    'to': email.destinatarios,
+                    'subject': email.assunto,
+                    'html': email.html,
+                    **({'text': email.texto} if email.texto else {}),
+                }
+                for email in lote
+            ]
+            try:
+                resposta = resend.Batch.send(params)
+            except Exception as e:
+                resultados.extend([e] * len(lote))
+                continue
+            ids = [item.get('id', '') for item in resposta.get('data', [])]
+            resultados.extend(ids + [''] * (len(lote) - len(ids)))
+        return resultados
+
+
+class BackendDjango:
+    def enviar(self, emails):
+        resultados = []
+        with get_connection() as conexao:
+            for email in emails:
+                mensagem = EmailMultiAlternatives(
+                    subject=email.assunto,
+                    body=email.texto or strip_tags(email.html),
+                    from_email=email.remetente,
+                    to=email.destinatarios,
+                    connection=conexao,
+                )
+                if email.html:
+                    mensagem.attach_alternative(email.html, 'text/html')
+                try:
+                    mensagem.send()
+                except Exception as e:
+                    resultados.append(e)
+                else:
+                    resultados.append('')
+        return resultados
+
+
+def get_backend():
+    return import_string(settings.EMAIL_OUTBOX_BACKEND)()
+
+
+def enfileirar_email(destinatarios, assunto, html='', texto='', remetente=None):
+    if isinstance(destinatarios, str):
+        destinatarios = [destinatarios]
+    email = EmailPendente.objects.create(
+        remetente=remetente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+        assunto=assunto,
+        html=html,
+        texto=texto,
+    )
+    transaction.on_commit(_agendar_envio)
+    return email
+
+
+def _agendar_envio():
+    if getattr(settings, 'EMAIL_OUTBOX_SINCRONO', False):
+        enviar_pendentes()
+        return
+    from .tasks import enviar_emails_pendentes_task
+    try:
+        enviar_emails_pendentes_task.delay()
+    except Exception:
+        # O agendamento periódico (beat) drena a fila mesmo sem o aviso
+        logger.warning("Falha ao agendar envio de e-mails", exc_info=True)
+
+
+def _cota_key():
+    return f'emails:cota:{int(timezone.now().timestamp() // 60)}'
+
+
+def _reservar_cota(quantidade):
+    """Reserva até `quantidade` envios na janela do minuto atual."""
+    limite = getattr(settings, 'EMAIL_OUTBOX_LIMITE_POR_MINUTO', None)
+    if not limite:
+        return quantidade
+    key = _cota_key()
+    while True:
+        if cache.add(key, quantidade, 120):
+            total = quantidade
+            break
+        try:
+            total = cache.incr(key, quantidade)
+            break
+        except ValueError:
+            # A chave expirou entre o add e o incr: cria de novo
+            continue
+    excedente = min(max(total - limite, 0), quantidade)
+    if excedente:
+        try:
+            cache.decr(key, excedente)
+        except ValueError:
+            pass
+    return quantidade - excedente
+
+
+def _devolver_cota(quantidade):
+    if quantidade > 0 and getattr(settings, 'EMAIL_OUTBOX_LIMITE_POR_MINUTO', None):
+        try:
+            cache.decr(_cota_key(), quantidade)
+        except ValueError:
+            pass
+
+
+def _reservar_lote(tamanho):
+    agora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailPendente.objects
+            .filter(status='pendente', proxima_tentativa_em__lte=agora)
+            .order_by('proxima_tentativa_em', 'pk')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)[:tamanho]
+        )
+        if not ids:
+            return []
+        # UPDATE condicional: só fica com o worker o que ainda estava vencido
+        EmailPendente.objects.filter(
+            pk__in=ids, status='pendente', proxima_tentativa_em__lte=agora
+        ).update(proxima_tentativa_em=agora + RESERVA)
+    return list(EmailPendente.objects.filter(pk__in=ids, proxima_tentativa_em=agora + RESERVA))
+
+
+def _backoff(tentativas):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (tentativas - 1), BACKOFF_MAXIMO))
+
+
+def _registrar_resultados(emails, resultados):
+    agora = timezone.now()
+    maximo = getattr(settings, 'EMAIL_OUTBOX_MAX_TENTATIVAS', 8)
+    enviados = 0
+    for email, resultado in zip(emails, resultados):
+        email.tentativas += 1
+        if isinstance(resultado, Exception):
+            email.ultimo_erro = str(resultado)[:2000]
+            if email.tentativas >= maximo:
+                email.status = 'falhou'
+                logger.error("E-mail %s descartado após %s tentativas: %s", email.pk, email.tentativas, resultado)
+            else:
+                email.proxima_tentativa_em = agora + _backoff(email.tentativas)
+        else:
+            email.status = 'enviado'
+            email.enviado_em = agora
+            email.id_provedor = resultado or ''
+            enviados += 1
+    EmailPendente.objects.bulk_update(
+        emails, ['status', 'tentativas', 'proxima_tentativa_em', 'ultimo_erro', 'enviado_em', 'id_provedor']
+    )
+    return enviados
+
+
+def enviar_pendentes(max_lotes=10):
+    """Envia os e-mails vencidos em lotes. Retorna quantos foram enviados."""
+    tamanho = getattr(settings, 'EMAIL_OUTBOX_LOTE', 100)
+    backend = get_backend()
+    enviados = 0
+    for _ in range(max_lotes):
+        cota = _reservar_cota(tamanho)
+        if not cota:
+            break
+        emails = _reservar_lote(cota)
+        _devolver_cota(cota - len(emails))
+        if not emails:
+            break
+        try:
+            resultados = backend.enviar(emails)
+        except Exception as e:
+            logger.error("Falha no backend de e-mail: %s", e, exc_info=True)
+            resultados = [e] * len(emails)
+        enviados += _registrar_resultados(emails, resultados)
+        if len(emails) < cota:
+            break
+    return enviados
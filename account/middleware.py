@@ -0,0 +1,15 @@
+from .atividade import registrar_atividade
+
+
+class AtividadeSessaoMiddleware:
+    """Marca a atividade do usuário autenticado; a escrita é agrupada em account/atividade.py."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            registrar_atividade(user)
+        return response
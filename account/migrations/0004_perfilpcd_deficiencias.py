@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_alter_especialidade_options_alter_useravatar_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfilpcd',
+            name='deficiencias',
+            field=models.ManyToManyField(blank=True, to='account.categoriadeficiencia'),
+        ),
+    ]
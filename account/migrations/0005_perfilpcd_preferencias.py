@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_perfilpcd_deficiencias'),
+        ('job_vacancies', '0003_vagaelegibilidade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfilpcd',
+            name='localizacao',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Cidade/Estado'),
+        ),
+        migrations.AddField(
+            model_name='perfilpcd',
+            name='modalidade_preferida',
+            field=models.CharField(blank=True, choices=[('presencial', 'Presencial'), ('remoto', 'Remoto'), ('hibrido', 'Híbrido')], max_length=20, verbose_name='Modalidade Preferida'),
+        ),
+        migrations.AddField(
+            model_name='perfilpcd',
+            name='recursos_necessarios',
+            field=models.ManyToManyField(blank=True, to='job_vacancies.recursoacessibilidade'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def preencher_avatar_path(apps, schema_editor):
+    User = apps.get_model('account', 'User')
+    UserAvatar = apps.get_model('account', 'UserAvatar')
+
+    atual = UserAvatar.objects.filter(user=OuterRef('pk'), is_atual=True).order_by('-criado_em')
+    User.objects.filter(avatars__is_atual=True).update(
+        avatar_id=Subquery(atual.values('pk')[:1]),
+        avatar_path=Subquery(atual.values('imagem')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_perfilpcd_preferencias'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='useravatar',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_path',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(preencher_avatar_path, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='useravatar',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_atual', True)), fields=('user',), name='useravatar_um_atual_por_usuario'),
+        ),
+    ]
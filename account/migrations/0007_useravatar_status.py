@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+def marcar_existentes_como_prontos(apps, schema_editor):
+    # Avatares anteriores já foram processados no upload
+    UserAvatar = apps.get_model('account', 'UserAvatar')
+    UserAvatar.objects.update(status='pronto')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_user_avatar_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useravatar',
+            name='status',
+            field=models.CharField(choices=[('processando', 'Processando'), ('pronto', 'Pronto'), ('erro', 'Erro')], default='processando', editable=False, max_length=20),
+        ),
+        migrations.RunPython(marcar_existentes_como_prontos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_useravatar_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useravatar',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_useravatar_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailPendente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('remetente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField()),
+                ('assunto', models.CharField(max_length=255)),
+                ('html', models.TextField(blank=True)),
+                ('texto', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('proxima_tentativa_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_erro', models.TextField(blank=True)),
+                ('id_provedor', models.CharField(blank=True, max_length=255)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'E-mail Pendente',
+                'verbose_name_plural': 'E-mails Pendentes',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pendente')), fields=['proxima_tentativa_em', 'id'], name='email_pendente_fila_idx')],
+            },
+        ),
+    ]
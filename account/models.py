@@ -1,11 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.base_user import BaseUserManager
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.core.validators import FileExtensionValidator
-from PIL import Image
-from io import BytesIO
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from functools import partial
 
 
 def avatar_upload_path(instance, filename):
@@ -51,6 +50,8 @@ class User(AbstractUser):
     avatar_id = models.PositiveBigIntegerField(
         null=True, blank=True, editable=False, db_index=True
     )
+    # Caminho no storage do avatar atual, para montar a URL sem consultar UserAvatar
+    avatar_path = models.CharField(max_length=500, blank=True, editable=False)
 
     criado_em = models.DateTimeField(auto_now_add=True)
     criado_por = models.ForeignKey(
@@ -82,8 +83,16 @@ class User(AbstractUser):
         super().save(*args, **kwargs)
 
     def get_foto_url(self):
-        avatar = self.avatars.filter(is_atual=True).first()
-        return avatar.imagem.url if avatar and avatar.imagem else '/static/img/avatar-default.png'
+        from .avatars import url_avatar
+        return url_avatar(self.avatar_path)
+
+    @cached_property
+    def nomes_grupos(self):
+        from .papeis import grupos_do_usuario
+        return grupos_do_usuario(self)
+
+    def pertence_ao_grupo(self, nome):
+        return nome in self.nomes_grupos
 
     @property
     def eh_pcd(self):
@@ -115,6 +124,12 @@ class User(AbstractUser):
 
 
 class UserAvatar(models.Model):
+    STATUS_CHOICES = [
+        ('processando', 'Processando'),
+        ('pronto', 'Pronto'),
+        ('erro', 'Erro'),
+    ]
+
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='avatars'
     )
@@ -126,51 +141,48 @@ class UserAvatar(models.Model):
         max_length=500
     )
     is_atual = models.BooleanField(default=True, verbose_name='Avatar atual')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='processando', editable=False)
+    # sha256 do arquivo enviado; identifica a pasta de variantes compartilhada por uploads iguais
+    hash_conteudo = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
     criado_em = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = 'Avatar de Usuário'
         verbose_name_plural = 'Avatares de Usuário'
         ordering = ['-criado_em']
-        unique_together = ('user', 'is_atual')
+        constraints = [
+            models.UniqueConstraint(fields=['user'], condition=models.Q(is_atual=True), name='useravatar_um_atual_por_usuario'),
+        ]
 
     def __str__(self):
         return f"Avatar de {self.user}"
 
     def save(self, *args, **kwargs):
+        from .avatars import agendar_processamento_avatar
+
         is_new = self.pk is None
-        
-        if self.imagem:
-            img = Image.open(self.imagem)
-            
-            max_size = (800, 800)
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
-            
-            output = BytesIO()
-            img.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            
-            self.imagem = InMemoryUploadedFile(
-                output, 'ImageField', 
-                f"{self.imagem.name.split('.')[0]}.jpg",
-                'image/jpeg', output.getbuffer().nbytes, None
-            )
+        with transaction.atomic():
+            if is_new and self.is_atual:
+                UserAvatar.objects.filter(user=self.user, is_atual=True).update(is_atual=False)
+            super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            UserAvatar.objects.filter(user=self.user).exclude(pk=self.pk).update(is_atual=False)
-            self.user.avatar_id = self.pk
-            self.user.save(update_fields=['avatar_id'])
+            if is_new and self.is_atual:
+                # Enquanto processa, o usuário fica com o avatar padrão
+                self.user.avatar_id = self.pk
+                self.user.avatar_path = self.imagem.name if self.status == 'pronto' else ''
+                self.user.save(update_fields=['avatar_id', 'avatar_path'])
+
+            if is_new and self.status == 'processando':
+                transaction.on_commit(partial(agendar_processamento_avatar, self.pk))
 
     def delete(self, *args, **kwargs):
-        storage, path = self.imagem.storage, self.imagem.path
-        super().delete(*args, **kwargs)
-        if storage.exists(path):
-            storage.delete(path)
+        from .avatars import remover_arquivos_avatar
+
+        pk = self.pk
+        with transaction.atomic():
+            super().delete(*args, **kwargs)
+            User.objects.filter(pk=self.user_id, avatar_id=pk).update(avatar_id=None, avatar_path='')
+            transaction.on_commit(partial(remover_arquivos_avatar, self.imagem.name, self.hash_conteudo))
 
 
 class PerfilPCD(models.Model):
@@ -183,6 +195,14 @@ class PerfilPCD(models.Model):
         ('rejeitado', 'Rejeitado')
     ])
     percentual_perfil = models.DecimalField('Percentual de Perfil', max_digits=5, decimal_places=2, default=0)
+    deficiencias = models.ManyToManyField('CategoriaDeficiencia', blank=True)
+    modalidade_preferida = models.CharField('Modalidade Preferida', max_length=20, blank=True, choices=[
+        ('presencial', 'Presencial'),
+        ('remoto', 'Remoto'),
+        ('hibrido', 'Híbrido')
+    ])
+    localizacao = models.CharField('Cidade/Estado', max_length=255, blank=True)
+    recursos_necessarios = models.ManyToManyField('job_vacancies.RecursoAcessibilidade', blank=True)
     
     def __str__(self):
         return f"Perfil PCD de {self.user}"
@@ -228,4 +248,41 @@ class CategoriaDeficiencia(models.Model):
         verbose_name_plural = 'Categorias de Deficiência'
 
     def __str__(self):
-        return self.nome
\ No newline at end of file
+        return self.nome
+
+
+class EmailPendente(models.Model):
+    """Fila de saída de e-mails, gravada na transação de quem envia (account/emails.py)."""
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou'),
+    ]
+
+    remetente = models.CharField(max_length=255)
+    destinatarios = models.JSONField()
+    assunto = models.CharField(max_length=255)
+    html = models.TextField(blank=True)
+    texto = models.TextField(blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    proxima_tentativa_em = models.DateTimeField(default=timezone.now)
+    ultimo_erro = models.TextField(blank=True)
+    id_provedor = models.CharField(max_length=255, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'E-mail Pendente'
+        verbose_name_plural = 'E-mails Pendentes'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(
+                fields=['proxima_tentativa_em', 'id'], condition=models.Q(status='pendente'), name='email_pendente_fila_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assunto} → {', '.join(self.destinatarios)}"
+
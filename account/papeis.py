@@ -0,0 +1,29 @@
+"""
+Papéis do usuário resolvidos sem repetir queries.
+
+O perfil (pcd/empresa/médico) vem junto com o usuário no SELECT do
+PerfilBackend; os nomes dos grupos ficam em cache por usuário e são
+invalidados quando os grupos ou os perfis do usuário mudam.
+"""
+from django.core.cache import cache
+
+PERFIS = ('perfil_pcd', 'perfil_empresa', 'perfil_medico')
+TIMEOUT = 60 * 10
+
+
+def _cache_key(user_id):
+    return f'papeis:grupos:{user_id}'
+
+
+def grupos_do_usuario(user):
+    key = _cache_key(user.pk)
+    grupos = cache.get(key)
+    if grupos is None:
+        grupos = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(key, grupos, TIMEOUT)
+    return grupos
+
+
+def invalidar_papeis(user):
+    cache.delete(_cache_key(user.pk))
+    user.__dict__.pop('nomes_grupos', None)
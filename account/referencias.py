@@ -0,0 +1,67 @@
+"""
+Cache em memória das tabelas de referência: categorias de deficiência,
+especialidades e recursos de acessibilidade.
+
+Cada processo guarda a tabela inteira junto com a versão em que a leu. A
+versão fica no cache compartilhado e é trocada depois do commit de qualquer
+save/delete desses modelos (account/signals.py), então os outros processos
+releem a tabela na próxima consulta. Por isso o CACHE_BACKEND precisa ser
+compartilhado entre os processos (Redis, ou arquivo num servidor só), o que o
+settings já cobra fora do DEBUG. Os objetos devolvidos são compartilhados
+entre requisições e não devem ser alterados.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+
+MODELOS = (
+    'account.CategoriaDeficiencia',
+    'account.Especialidade',
+    'job_vacancies.RecursoAcessibilidade',
+)
+
+_tabelas = {}
+_lock = threading.Lock()
+
+
+def _label(modelo):
+    return modelo if isinstance(modelo, str) else modelo._meta.label
+
+
+def _versao_key(label):
+    return f'referencias:versao:{label}'
+
+
+def _versao(label):
+    key = _versao_key(label)
+    versao = cache.get(key)
+    if versao is None:
+        cache.add(key, time.time_ns(), None)
+        versao = cache.get(key)
+    return versao
+
+
+def referencias(modelo):
+    """Tupla com todas as linhas do modelo, ordenadas por nome."""
+    label = _label(modelo)
+    versao = _versao(label)
+    local = _tabelas.get(label)
+    if local and local[0] == versao:
+        return local[1]
+    objetos = tuple(apps.get_model(label).objects.order_by('nome', 'pk'))
+    with _lock:
+        _tabelas[label] = (versao, objetos)
+    return objetos
+
+
+def referencias_por_id(modelo):
+    return {obj.pk: obj for obj in referencias(modelo)}
+
+
+def invalidar_referencias(modelo):
+    label = _label(modelo)
+    cache.set(_versao_key(label), time.time_ns(), None)
+    with _lock:
+        _tabelas.pop(label, None)
@@ -8,30 +8,44 @@ from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.db import transaction
-import resend
 import logging
 from .models import User, PerfilPCD, PerfilEmpresa
-from .constants import Messages
+from .constants import Grupos, Messages
+from .emails import enfileirar_email
+from .atividade import registrar_atividade
 from django.contrib.auth.models import Group
 
 logger = logging.getLogger(__name__)
 
-resend.api_key = settings.API_RESEND
-
 def register_doctor_user(form):
-    doctor_group, _= Group.objects.get_or_create(name='Médico')
+    doctor_group, _= Group.objects.get_or_create(name=Grupos.MEDICO)
     User.groups.add(doctor_group)
 
-def update_user_metadata(user, request=None, update_session=False):
+def update_user_metadata(user, request=None, update_session=False, campos=()):
+    """
+    Grava os metadados de auditoria. Usuários novos são inseridos por inteiro;
+    nos existentes só vão para o banco as colunas de auditoria e `campos`.
+    """
+    novo = user.pk is None
     if request and request.user.is_authenticated:
-        if not user.pk:
+        if novo:
             user.criado_por = request.user
         user.modificado_por = request.user
-    
+
+    if novo:
+        if update_session:
+            user.ultima_sessao = timezone.now()
+        user.save()
+        return user
+
     if update_session:
-        user.ultima_sessao = timezone.now()
-    
-    user.save()
+        registrar_atividade(user)
+
+    update_fields = {'modificado_em', *campos}
+    if request and request.user.is_authenticated:
+        update_fields.add('modificado_por')
+    if campos or 'modificado_por' in update_fields:
+        user.save(update_fields=update_fields)
     return user
 
 
@@ -82,7 +96,8 @@ def register_company_user(form):
 
 
 def login_user(request, user):
-    login(request, user)
+    # Com mais de um backend o login exige um; o cadastro loga sem passar por authenticate()
+    login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
     update_user_metadata(user, update_session=True)
     messages.success(
         request,
@@ -111,19 +126,16 @@ def send_password_reset_email(request, user):
         
         html_content = render_to_string('account/password_reset_email.html', context)
         
-        params = {
-            "from": settings.DEFAULT_FROM_EMAIL,
-            "to": [user.email],
-            "subject": "Redefinição de senha - Plataforma PCD",
-            "html": html_content,
-        }
-        
-        resend.Emails.send(params)
+        enfileirar_email(
+            destinatarios=[user.email],
+            assunto="Redefinição de senha - Plataforma PCD",
+            html=html_content,
+        )
         
         return True
         
     except Exception as e:
-        logger.error(f"Erro ao enviar e-mail de reset: {str(e)}", exc_info=True)
+        logger.error(f"Erro ao enfileirar e-mail de reset: {str(e)}", exc_info=True)
         return False
 
 
@@ -144,7 +156,7 @@ def validate_reset_token(uidb64, token):
 def reset_user_password(user, new_password):
     try:
         user.set_password(new_password)
-        update_user_metadata(user)
+        update_user_metadata(user, campos=['password'])
         return True
     except Exception as e:
         logger.error(f"Erro ao resetar senha: {str(e)}", exc_info=True)
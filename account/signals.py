@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PerfilEmpresa, PerfilMedico, PerfilPCD, User
+from .papeis import invalidar_papeis
+from .referencias import MODELOS, invalidar_referencias
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_papeis_por_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidar_papeis(instance)
+        return
+
+    # Pelo lado do grupo; no clear pk_set vem None, então os usuários são
+    # lidos antes de o vínculo sumir
+    if action == 'pre_clear':
+        instance._usuarios_do_clear = set(instance.user_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_usuarios_do_clear', ())
+    elif not action.startswith('post_'):
+        return
+    for user in User.objects.filter(pk__in=pk_set).only('pk'):
+        invalidar_papeis(user)
+
+
+@receiver(post_save, sender=PerfilPCD)
+@receiver(post_save, sender=PerfilEmpresa)
+@receiver(post_save, sender=PerfilMedico)
+@receiver(post_delete, sender=PerfilPCD)
+@receiver(post_delete, sender=PerfilEmpresa)
+@receiver(post_delete, sender=PerfilMedico)
+def invalidar_papeis_por_perfil(sender, instance, **kwargs):
+    invalidar_papeis(instance.user)
+
+
+def invalidar_tabela_de_referencia(sender, **kwargs):
+    # Depois do commit, para nenhum processo reler a tabela antes da alteração valer
+    transaction.on_commit(partial(invalidar_referencias, sender))
+
+
+for _modelo in MODELOS:
+    post_save.connect(invalidar_tabela_de_referencia, sender=_modelo, dispatch_uid=f'referencias_save_{_modelo}')
+    post_delete.connect(invalidar_tabela_de_referencia, sender=_modelo, dispatch_uid=f'referencias_delete_{_modelo}')
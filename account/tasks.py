@@ -0,0 +1,25 @@
+from celery import shared_task
+
+from .avatars import marcar_erro_avatar, processar_avatar, reagendar_avatares_pendentes
+from .emails import enviar_pendentes
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=5, default_retry_delay=30)
+def processar_avatar_task(self, avatar_id):
+    try:
+        processar_avatar(avatar_id)
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            marcar_erro_avatar(avatar_id)
+            raise
+        raise self.retry(exc=exc, countdown=self.default_retry_delay * 2 ** self.request.retries)
+
+
+@shared_task(ignore_result=True)
+def reagendar_avatares_pendentes_task():
+    return reagendar_avatares_pendentes()
+
+
+@shared_task(ignore_result=True)
+def enviar_emails_pendentes_task():
+    return enviar_pendentes()
@@ -0,0 +1,27 @@
+from django import template
+
+from account.avatars import srcset_avatar, url_avatar_tamanho
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(user, tamanho=160, ext='jpg'):
+    return url_avatar_tamanho(user.avatar_path, tamanho, ext)
+
+
+@register.simple_tag
+def avatar_srcset(user, ext='jpg'):
+    return srcset_avatar(user.avatar_path, ext)
+
+
+@register.inclusion_tag('account/_avatar.html')
+def avatar(user, tamanho=160, classe=''):
+    return {
+        'user': user,
+        'tamanho': tamanho,
+        'classe': classe,
+        'src': url_avatar_tamanho(user.avatar_path, tamanho),
+        'srcset_webp': srcset_avatar(user.avatar_path, 'webp'),
+        'srcset_jpg': srcset_avatar(user.avatar_path, 'jpg'),
+    }
@@ -0,0 +1,299 @@
+import threading
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import Group
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from kombu.exceptions import OperationalError
+from PIL import Image
+
+from job_vacancies.recomendacoes import recomendar_vagas
+from job_vacancies.tests import SENHA, ambiente_de_teste, criar_empresa, criar_medico, criar_pcd, vaga_aberta
+
+from .atividade import BufferAtividade
+from .avatars import FORMATOS, REAGENDAR_APOS, TAMANHOS, caminho_variante, reagendar_avatares_pendentes
+from .constants import Grupos
+from .emails import BACKOFF_BASE, _reservar_cota, enfileirar_email, enviar_pendentes
+from .models import CategoriaDeficiencia, EmailPendente, User, UserAvatar
+from .papeis import grupos_do_usuario
+from .referencias import referencias, referencias_por_id
+from .tasks import processar_avatar_task
+
+
+@ambiente_de_teste
+class BackendSessaoTests(TestCase):
+    def test_sessao_antiga_do_model_backend_continua_logada(self):
+        pcd = criar_pcd()
+        self.client.force_login(pcd, backend='django.contrib.auth.backends.ModelBackend')
+
+        response = self.client.get(reverse('account:panel'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, pcd)
+
+    def test_login_novo_usa_perfil_backend(self):
+        pcd = criar_pcd()
+        response = self.client.post(reverse('account:login'), {'email': pcd.email, 'password': SENHA})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'account.backends.PerfilBackend')
+
+
+class PapeisTests(TestCase):
+    def test_clear_pelo_lado_do_grupo_invalida(self):
+        medico = criar_medico()
+        self.assertIn(Grupos.MEDICO, grupos_do_usuario(User.objects.get(pk=medico.pk)))
+        Group.objects.get(name=Grupos.MEDICO).user_set.clear()
+        self.assertNotIn(Grupos.MEDICO, grupos_do_usuario(User.objects.get(pk=medico.pk)))
+
+
+@mock.patch.dict('account.referencias._tabelas', clear=True)
+class ReferenciasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sem_consultas_depois_de_aquecido_e_invalidado_no_save(self):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        self.assertEqual(referencias(CategoriaDeficiencia), (visual,))
+        with self.assertNumQueries(0):
+            self.assertEqual(referencias_por_id(CategoriaDeficiencia), {visual.pk: visual})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            auditiva = CategoriaDeficiencia.objects.create(nome="Auditiva")
+        self.assertEqual(referencias(CategoriaDeficiencia), (auditiva, visual))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            visual.delete()
+        self.assertEqual(referencias(CategoriaDeficiencia), (auditiva,))
+
+    def test_versao_trocada_por_outro_processo(self):
+        CategoriaDeficiencia.objects.create(nome="Visual")
+        referencias(CategoriaDeficiencia)
+        # Outro processo gravou e trocou a versão; a tabela local deste ficou velha
+        CategoriaDeficiencia.objects.create(nome="Auditiva")
+        cache.set('referencias:versao:account.CategoriaDeficiencia', 0, None)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(referencias(CategoriaDeficiencia)), 2)
+
+
+class ErroStorage(Exception):
+    """Como as exceções do botocore: não herda de OSError."""
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ProcessarAvatarTests(TestCase):
+    def novo_avatar(self, n=1):
+        imagem = BytesIO()
+        Image.new('RGB', (50, 50), 'red').save(imagem, format='PNG')
+        return UserAvatar.objects.create(
+            user=criar_pcd(n), imagem=SimpleUploadedFile('foto.png', imagem.getvalue(), content_type='image/png')
+        )
+
+    def test_processa_avatar(self):
+        avatar = self.novo_avatar()
+        processar_avatar_task.apply(args=[avatar.pk])
+        avatar.refresh_from_db()
+        self.assertEqual(avatar.status, 'pronto')
+        self.assertEqual(avatar.user.avatar_path, avatar.imagem.name)
+
+    def test_mesmo_arquivo_reaproveita_as_variantes(self):
+        primeiro, segundo = self.novo_avatar(1), self.novo_avatar(2)
+        processar_avatar_task.apply(args=[primeiro.pk])
+        with mock.patch('account.avatars._gerar_variantes') as gerar:
+            processar_avatar_task.apply(args=[segundo.pk])
+        gerar.assert_not_called()
+
+        primeiro.refresh_from_db()
+        segundo.refresh_from_db()
+        self.assertEqual(primeiro.hash_conteudo, segundo.hash_conteudo)
+        self.assertEqual(primeiro.imagem.name, segundo.imagem.name)
+        variantes = [caminho_variante(primeiro.imagem.name, tamanho, ext) for tamanho in TAMANHOS for ext in FORMATOS]
+        storage = primeiro.imagem.storage
+        self.assertTrue(all(storage.exists(caminho) for caminho in variantes))
+
+        # Só a remoção do último avatar que usa as variantes apaga os arquivos
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro.delete()
+        self.assertTrue(all(storage.exists(caminho) for caminho in variantes))
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        self.assertFalse(any(storage.exists(caminho) for caminho in variantes))
+
+    def test_erro_do_storage_tenta_de_novo_e_marca_erro(self):
+        avatar = self.novo_avatar()
+        with mock.patch('account.avatars._gerar_variantes', side_effect=ErroStorage) as gerar:
+            resultado = processar_avatar_task.apply(args=[avatar.pk])
+
+        self.assertIsInstance(resultado.result, ErroStorage)
+        self.assertEqual(gerar.call_count, processar_avatar_task.max_retries + 1)
+        avatar.refresh_from_db()
+        self.assertEqual(avatar.status, 'erro')
+
+    def test_broker_fora_no_upload_deixa_para_o_reagendamento(self):
+        with mock.patch('account.tasks.processar_avatar_task.delay', side_effect=OperationalError) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                avatar = self.novo_avatar()
+        delay.assert_called_once_with(avatar.pk)
+        avatar.refresh_from_db()
+        self.assertEqual(avatar.status, 'processando')
+
+        with mock.patch('account.tasks.processar_avatar_task.delay') as delay:
+            self.assertEqual(reagendar_avatares_pendentes(), 0)
+            UserAvatar.objects.filter(pk=avatar.pk).update(criado_em=timezone.now() - REAGENDAR_APOS)
+            self.assertEqual(reagendar_avatares_pendentes(), 1)
+        delay.assert_called_once_with(avatar.pk)
+
+
+@override_settings(EMAIL_OUTBOX_LIMITE_POR_MINUTO=10)
+class CotaEmailTests(TestCase):
+    @mock.patch('account.emails._cota_key', return_value='emails:cota:teste')
+    def test_reserva_respeita_o_limite(self, _):
+        cache.delete('emails:cota:teste')
+        self.assertEqual(_reservar_cota(6), 6)
+        self.assertEqual(_reservar_cota(6), 4)
+        self.assertEqual(_reservar_cota(6), 0)
+
+    def test_chave_expirada_entre_add_e_incr(self):
+        with mock.patch('account.emails.cache') as cache_mock:
+            # A chave existe no add, some antes do incr e é recriada na segunda volta
+            cache_mock.add.side_effect = [False, True]
+            cache_mock.incr.side_effect = ValueError
+            self.assertEqual(_reservar_cota(4), 4)
+
+
+class BackendFalhaParcial:
+    """Recusa os destinatários do domínio @falha; os demais recebem um id."""
+    def enviar(self, emails):
+        return [
+            ConnectionError("recusado") if email.destinatarios[0].endswith('@falha') else f'id-{email.pk}'
+            for email in emails
+        ]
+
+
+@override_settings(
+    EMAIL_OUTBOX_BACKEND='account.tests.BackendFalhaParcial', EMAIL_OUTBOX_LIMITE_POR_MINUTO=None,
+    EMAIL_OUTBOX_MAX_TENTATIVAS=3,
+)
+class EnvioEmailsTests(TestCase):
+    def vencer(self, email):
+        EmailPendente.objects.filter(pk=email.pk).update(proxima_tentativa_em=timezone.now())
+
+    def test_lote_com_falha_parcial_e_backoff(self):
+        ok = enfileirar_email('a@teste.com', "Olá")
+        ruim = enfileirar_email('b@falha', "Olá")
+
+        antes = timezone.now()
+        self.assertEqual(enviar_pendentes(), 1)
+        ok.refresh_from_db()
+        ruim.refresh_from_db()
+        self.assertEqual((ok.status, ok.id_provedor, ok.tentativas), ('enviado', f'id-{ok.pk}', 1))
+        self.assertEqual((ruim.status, ruim.tentativas, ruim.ultimo_erro), ('pendente', 1, "recusado"))
+        self.assertGreaterEqual(ruim.proxima_tentativa_em, antes + timedelta(seconds=BACKOFF_BASE))
+
+        # Ainda no backoff: nada a enviar
+        self.assertEqual(enviar_pendentes(), 0)
+        self.vencer(ruim)
+        antes = timezone.now()
+        enviar_pendentes()
+        ruim.refresh_from_db()
+        self.assertEqual(ruim.tentativas, 2)
+        self.assertGreaterEqual(ruim.proxima_tentativa_em, antes + timedelta(seconds=2 * BACKOFF_BASE))
+
+        self.vencer(ruim)
+        with self.assertLogs('account.emails', 'ERROR'):
+            enviar_pendentes()
+        ruim.refresh_from_db()
+        self.assertEqual((ruim.status, ruim.tentativas), ('falhou', 3))
+
+    @override_settings(EMAIL_OUTBOX_BACKEND='account.emails.BackendDjango')
+    def test_backend_django_envia_pelo_email_backend(self):
+        enfileirar_email(['a@teste.com', 'b@teste.com'], "Assunto", html="<p>Corpo</p>")
+        self.assertEqual(enviar_pendentes(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual((mail.outbox[0].to, mail.outbox[0].body), (['a@teste.com', 'b@teste.com'], "Corpo"))
+
+
+class BufferAtividadeTests(SimpleTestCase):
+    def test_flush_sem_novas_atividades(self):
+        descarregado = threading.Event()
+        gravadas = {}
+
+        def aplicar(ultimas):
+            gravadas.update(ultimas)
+            descarregado.set()
+
+        with mock.patch('account.atividade.aplicar_atividades', side_effect=aplicar):
+            buffer = BufferAtividade(intervalo=0.05)
+            buffer.registrar(1, 'agora')
+            self.assertTrue(descarregado.wait(2))
+        self.assertEqual(gravadas, {1: 'agora'})
+
+
+@ambiente_de_teste
+class ContaViewsTests(TestCase):
+    """Cada rota passa pelo OrcamentoConsultasMiddleware, que na suíte falha acima do orçamento."""
+
+    @classmethod
+    def setUpTestData(cls):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        empresa, medico = criar_empresa(), criar_medico()
+        for n in range(1, 4):
+            vaga_aberta(empresa, medico, [visual], f"Analista {n}")
+        cls.pcd = criar_pcd(deficiencias=[visual])
+        cls.empresa = empresa
+
+    def test_paginas_publicas(self):
+        for nome in ('register_choice', 'register_pcd', 'register_company', 'login', 'forgot_password',
+                     'password_reset_sent', 'password_reset_complete'):
+            with self.subTest(nome):
+                self.assertEqual(self.client.get(reverse(f'account:{nome}')).status_code, 200)
+
+    def test_cadastro_pcd(self):
+        response = self.client.post(reverse('account:register_pcd'), {
+            'nome_completo': "Novo Candidato", 'email': 'novo@teste.com', 'telefone': '11999999999',
+            'cpf': '12345678901', 'data_nascimento': '1990-01-01', 'password1': SENHA, 'password2': SENHA,
+        })
+        self.assertRedirects(response, reverse('account:panel'), fetch_redirect_response=False)
+
+    def test_cadastro_empresa(self):
+        response = self.client.post(reverse('account:register_company'), {
+            'nome_completo': "Nova Empresa", 'email': 'nova@teste.com', 'cnpj': '12345678000199',
+            'password1': SENHA, 'password2': SENHA,
+        })
+        self.assertRedirects(response, reverse('account:login'), fetch_redirect_response=False)
+
+    def test_login_e_logout(self):
+        response = self.client.post(reverse('account:login'), {'email': self.pcd.email, 'password': SENHA})
+        self.assertRedirects(response, reverse('account:panel'), fetch_redirect_response=False)
+        response = self.client.get(reverse('account:logout'))
+        self.assertRedirects(response, reverse('account:login'), fetch_redirect_response=False)
+
+    def test_painel(self):
+        cache.clear()
+        for user in (self.pcd, self.empresa):
+            with self.subTest(user.tipo):
+                self.client.force_login(user)
+                self.assertEqual(self.client.get(reverse('account:panel')).status_code, 200)
+        self.assertEqual(len(recomendar_vagas(self.pcd)), 3)
+
+    def test_redefinicao_de_senha(self):
+        response = self.client.post(reverse('account:forgot_password'), {'email': self.pcd.email})
+        self.assertRedirects(response, reverse('account:password_reset_sent'), fetch_redirect_response=False)
+
+        url = reverse('account:password_reset_confirm', args=[
+            urlsafe_base64_encode(force_bytes(self.pcd.pk)), default_token_generator.make_token(self.pcd),
+        ])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'password1': 'nova-senha-1', 'password2': 'nova-senha-1'})
+        self.assertRedirects(response, reverse('account:password_reset_complete'), fetch_redirect_response=False)
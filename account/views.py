@@ -20,11 +20,14 @@ from .services import (
 )
 from .models import User
 from .constants import Routes, Messages
+from job_vacancies.recomendacoes import recomendar_vagas
+from src.consultas import orcamento
 
 
 class RegisterChoiceView(View):
     
     template_name = "account/register_choice.html"
+    orcamento_consultas = 3
     
     def get(self, request):
         if request.user.is_authenticated:
@@ -35,6 +38,7 @@ class RegisterChoiceView(View):
 class RegisterPCDView(View):
     
     template_name = "account/register_pcd.html"
+    orcamento_consultas = 18
     
     def get(self, request):
         if request.user.is_authenticated:
@@ -63,6 +67,7 @@ class RegisterPCDView(View):
 class RegisterCompanyView(View):
     
     template_name = "account/register_company.html"
+    orcamento_consultas = 12
     
     def get(self, request):
         if request.user.is_authenticated:
@@ -90,6 +95,7 @@ class RegisterCompanyView(View):
 class LoginView(View):
     
     template_name = "account/login.html"
+    orcamento_consultas = 12
 
     def get(self, request):
         if request.user.is_authenticated:
@@ -114,6 +120,8 @@ class LoginView(View):
 
 class CustomLogoutView(View):
     
+    orcamento_consultas = 10
+    
     def get(self, request):
         messages.info(request, Messages.LOGOUT_INFO)
         logout(request)
@@ -123,6 +131,7 @@ class CustomLogoutView(View):
 class PanelView(LoginRequiredMixin, View):
     
     template_name = "account/panel.html"
+    orcamento_consultas = 6
     
     def get(self, request):
         user = request.user
@@ -131,12 +140,15 @@ class PanelView(LoginRequiredMixin, View):
             "primeiro_nome": user.primeiro_nome,
             "tipo": user.tipo,
         }
+        if context["tipo"] == 'pcd':
+            context["vagas_recomendadas"] = recomendar_vagas(user)
         return render(request, self.template_name, context)
 
 
 class PasswordResetView:
     
     @staticmethod
+    @orcamento(8)
     def request_view(request):
         if request.method == "POST":
             form = PasswordResetRequestForm(request.POST)
@@ -153,6 +165,7 @@ class PasswordResetView:
         return render(request, "account/forgot_password.html", {"form": form})
 
     @staticmethod
+    @orcamento(8)
     def confirm_view(request, uidb64, token):
         user = validate_reset_token(uidb64, token)
         if not user:
@@ -175,10 +188,12 @@ class PasswordResetView:
         })
 
     @staticmethod
+    @orcamento(3)
     def sent_view(request):
         return render(request, "account/password_reset_sent.html")
     
     @staticmethod
+    @orcamento(3)
     def complete_view(request):
         return render(request, "account/password_reset_complete.html")
     
\ No newline at end of file
@@ -1,3 +1,54 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from account.models import CategoriaDeficiencia
+from job_vacancies.models import Vaga
+from job_vacancies.services import submeter_para_aprovacao
+from job_vacancies.tests import ambiente_de_teste, criar_empresa, criar_medico, nova_vaga, vaga_aberta
+
+
+@ambiente_de_teste
+class MedicoViewsTests(TestCase):
+    """Cada rota passa pelo OrcamentoConsultasMiddleware, que na suíte falha acima do orçamento."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categorias = [CategoriaDeficiencia.objects.create(nome=nome) for nome in ("Visual", "Auditiva")]
+        empresa = criar_empresa()
+        cls.medico = criar_medico()
+        for n in range(1, 4):
+            vaga_aberta(empresa, cls.medico, cls.categorias, f"Avaliada {n}")
+        cls.pendentes = [nova_vaga(empresa, f"Pendente {n}") for n in range(1, 4)]
+        for vaga in cls.pendentes:
+            submeter_para_aprovacao(vaga, empresa)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.medico)
+
+    def test_painel(self):
+        response = self.client.get(reverse('doctor:dashboard'))
+        self.assertEqual(response.context['metricas']['total'], 3)
+
+    def test_fila(self):
+        response = self.client.get(reverse('doctor:fila'))
+        self.assertEqual(len(response.context['vagas']), 3)
+
+    def test_reservar_e_liberar(self):
+        response = self.client.post(reverse('doctor:reservar_vagas'))
+        self.assertRedirects(response, reverse('doctor:fila'), fetch_redirect_response=False)
+        self.assertEqual(Vaga.objects.filter(revisao_medico=self.medico).count(), 3)
+
+        self.client.post(reverse('doctor:liberar_reserva', args=[self.pendentes[0].pk]))
+        self.assertEqual(Vaga.objects.filter(revisao_medico=self.medico).count(), 2)
+
+    def test_avaliar(self):
+        url = reverse('doctor:avaliar_vaga', args=[self.pendentes[0].pk])
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['deficiencias']), 2)
+
+        self.client.post(url, {'status': 'aprovada', 'deficiencias': [categoria.pk for categoria in self.categorias]})
+        self.pendentes[0].refresh_from_db()
+        self.assertEqual(self.pendentes[0].status, 'aprovada')
+        self.assertEqual(self.pendentes[0].elegibilidades.count(), 2)
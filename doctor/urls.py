@@ -2,6 +2,8 @@ from django.urls import path
 from .views import (
     DashboardDoctorView,
     FilaAprovacaoView,
+    ReservarVagasView,
+    LiberarReservaView,
     AvaliarVagaView,
 )
 
@@ -10,5 +12,7 @@ app_name = "doctor"
 urlpatterns = [
     path("", DashboardDoctorView.as_view(), name="dashboard"),
     path("fila/", FilaAprovacaoView.as_view(), name="fila"),
+    path("fila/reservar/", ReservarVagasView.as_view(), name="reservar_vagas"),
     path("avaliar/<int:pk>/", AvaliarVagaView.as_view(), name="avaliar_vaga"),
+    path("avaliar/<int:pk>/liberar/", LiberarReservaView.as_view(), name="liberar_reserva"),
 ]
\ No newline at end of file
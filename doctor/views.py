@@ -1,81 +1,110 @@
+from django.conf import settings
 from django.views import View
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.db.models import Count, Avg, F, Q, ExpressionWrapper, DurationField
 from django.utils import timezone
-from datetime import timedelta
 
 from job_vacancies.models import Vaga, AvaliacaoVagaMedica
 from job_vacancies.services import aprovar_vaga_medico
+from job_vacancies.fila_aprovacao import liberar_reserva, reservar_vaga, reservar_vagas, reservas_ativas, vagas_na_fila
+from job_vacancies.metricas_medicas import metricas_do_medico, vagas_pendentes
+from job_vacancies.paginacao import paginar_por_criacao
+from job_vacancies.cache import obter_ou_calcular
 from account.models import CategoriaDeficiencia
+from account.referencias import referencias
+from account.constants import Grupos
+from src.replicas import ReplicaLeituraMixin
 
 
 class DoctorRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
-        if not request.user.groups.filter(name='Médico').exists():
+        if not request.user.is_authenticated or not request.user.pertence_ao_grupo(Grupos.MEDICO):
             messages.error(request, "Acesso restrito a médicos.")
             return redirect("account:login")
         return super().dispatch(request, *args, **kwargs)
 
 
-class DashboardDoctorView(DoctorRequiredMixin, LoginRequiredMixin, View):
+class DashboardDoctorView(ReplicaLeituraMixin, DoctorRequiredMixin, LoginRequiredMixin, View):
     template_name = "doctor/dashboard.html"
+    orcamento_consultas = 8
 
     def get(self, request):
-        hoje = timezone.now().date()
-        ultimo_mes = hoje - timedelta(days=30)
-
-        metricas = AvaliacaoVagaMedica.objects.filter(
-            medico=request.user,
-            avaliado_em__date__gte=ultimo_mes
-        ).aggregate(
-            total=Count('id'),
-            aprovadas=Count('id', filter=Q(status='aprovada')),
-            rejeitadas=Count('id', filter=Q(status='rejeitada')),
-            ajustes=Count('id', filter=Q(status='ajustes_necessarios')),
-            tempo_medio=Avg(
-                ExpressionWrapper(F('avaliado_em') - F('vaga__criado_em'), output_field=DurationField())
-            )
-        )
+        metricas = metricas_do_medico(request.user, dias=30)
+        tempo_medio = metricas['tempo_medio']
+        metricas['tempo_medio_horas'] = round(tempo_medio.total_seconds() / 3600, 1) if tempo_medio else None
 
         context = {
-            "metricas": {
-                "total": metricas['total'] or 0,
-                "aprovadas": metricas['aprovadas'] or 0,
-                "rejeitadas": metricas['rejeitadas'] or 0,
-                "ajustes": metricas['ajustes'] or 0,
-                "taxa_aprovacao": round((metricas['aprovadas'] or 0) / max(metricas['total'] or 1, 1) * 100, 1),
-                "tempo_medio": metricas['tempo_medio'],
-            },
-            "vagas_pendentes": Vaga.objects.filter(status='aguardando_aprovacao').count(),
+            "metricas": metricas,
+            "vagas_pendentes": vagas_pendentes(),
         }
         return render(request, self.template_name, context)
 
 
-class FilaAprovacaoView(DoctorRequiredMixin, LoginRequiredMixin, View):
+class FilaAprovacaoView(ReplicaLeituraMixin, DoctorRequiredMixin, LoginRequiredMixin, View):
     template_name = "doctor/fila.html"
+    orcamento_consultas = 6
 
     def get(self, request):
-        vagas = Vaga.objects.filter(
-            status='aguardando_aprovacao'
-        ).select_related('empresa').prefetch_related('recursos_disponiveis', 'avaliacoes_medicas')
+        agora = timezone.now()
+        cursor = request.GET.get('cursor')
+        # A página é a mesma para todos os médicos; reservas e aprovações trocam a versão
+        vagas, proximo_cursor = obter_ou_calcular(
+            'fila_aprovacao',
+            lambda: paginar_por_criacao(vagas_na_fila().select_related('empresa', 'revisao_medico'), cursor=cursor),
+            partes=(cursor,),
+            timeout=30,
+        )
+        for vaga in vagas:
+            vaga.reservada = bool(vaga.revisao_expira_em and vaga.revisao_expira_em > agora)
+
+        return render(request, self.template_name, {
+            "minhas_reservas": reservas_ativas(request.user, agora).select_related('empresa').order_by('criado_em', 'pk'),
+            "vagas": vagas,
+            "proximo_cursor": proximo_cursor,
+            "lote": settings.FILA_MEDICA_LOTE,
+        })
+
 
-        return render(request, self.template_name, {"vagas": vagas})
+class ReservarVagasView(DoctorRequiredMixin, LoginRequiredMixin, View):
+    orcamento_consultas = 15
+
+    def post(self, request):
+        reservadas = reservar_vagas(request.user)
+        if reservadas:
+            messages.success(request, f"{len(reservadas)} vaga(s) reservada(s) para você.")
+        else:
+            messages.info(request, "Nenhuma vaga livre na fila no momento.")
+        return redirect("doctor:fila")
+
+
+class LiberarReservaView(DoctorRequiredMixin, LoginRequiredMixin, View):
+    orcamento_consultas = 8
+
+    def post(self, request, pk):
+        vaga = get_object_or_404(Vaga, pk=pk)
+        liberar_reserva(vaga, request.user)
+        messages.info(request, "Vaga devolvida para a fila.")
+        return redirect("doctor:fila")
 
 
 class AvaliarVagaView(DoctorRequiredMixin, LoginRequiredMixin, View):
     template_name = "doctor/avaliar_vaga.html"
+    # O POST (avaliação + elegibilidades + mensagem) é o caso mais caro
+    orcamento_consultas = 20
 
     def get(self, request, pk):
         vaga = get_object_or_404(Vaga, pk=pk, status='aguardando_aprovacao')
+        if not reservar_vaga(vaga, request.user):
+            messages.error(request, "Esta vaga está reservada por outro médico.")
+            return redirect("doctor:fila")
         avaliacao = vaga.avaliacoes_medicas.filter(medico__isnull=True).first() or vaga.avaliacoes_medicas.latest('id')
-        deficiencias = CategoriaDeficiencia.objects.all()
 
         return render(request, self.template_name, {
             "vaga": vaga,
             "avaliacao": avaliacao,
-            "deficiencias": deficiencias,
+            "deficiencias": referencias(CategoriaDeficiencia),
+            "selecionadas": set(avaliacao.deficiencias_elegiveis.values_list('id', flat=True)),
         })
 
     def post(self, request, pk):
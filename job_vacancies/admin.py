@@ -1,5 +1,5 @@
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 from django.db.models import Count, Q
 from .models import (
@@ -98,13 +98,14 @@ class AvaliacaoVagaMedicaAdmin(admin.ModelAdmin):
     medico_link.short_description = 'Médico'
 
     def deficiencias_list(self, obj):
-        defs = obj.deficiencias_elegiveis.all()[:3]
+        # Lista já vem do prefetch de get_queryset; count() e fatias não vão ao banco
+        defs = list(obj.deficiencias_elegiveis.all())
         if not defs:
             return "Nenhuma"
-        html = " • ".join([f'<span class="badge badge-sm badge-outline">{d.nome}</span>' for d in defs])
-        if obj.deficiencias_elegiveis.count() > 3:
-            html += f" +{obj.deficiencias_elegiveis.count() - 3}"
-        return format_html(html)
+        html = format_html_join(" • ", '<span class="badge badge-sm badge-outline">{}</span>', ((d.nome,) for d in defs[:3]))
+        if len(defs) > 3:
+            html = format_html("{} +{}", html, len(defs) - 3)
+        return html
     deficiencias_list.short_description = 'Deficiências Elegíveis'
 
     def status_badge(self, obj):
@@ -125,6 +126,7 @@ class CandidaturaAdmin(admin.ModelAdmin):
     search_fields = ['pcd__nome_completo', 'vaga__titulo']
     autocomplete_fields = ['pcd', 'vaga']
     readonly_fields = ['criado_em', 'atualizado_em']
+    list_select_related = ['pcd', 'vaga']
 
     def pcd_link(self, obj):
         url = reverse('admin:account_user_change', args=[obj.pcd.pk])
@@ -7,4 +7,4 @@ class JobVacanciesConfig(AppConfig):
     verbose_name = 'Vagas e Compliance PCD'
 
     def ready(self):
-        pass
\ No newline at end of file
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Benchmarks dos caminhos quentes do fluxo de contratação.
+
+Roda sobre dados gerados por gerar_dados_sinteticos. Cada cenário prepara
+os objetos fora da medição e mede, por iteração, o tempo e o número de
+consultas (src/consultas.py). Cenários que escrevem rodam numa transação
+desfeita no fim, então o banco fica como estava.
+
+Os resultados vão, uma linha JSON por execução, para
+settings.BENCHMARK_RESULTADOS junto com o commit atual, para comparar
+execuções de commits diferentes.
+"""
+import json
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import CategoriaDeficiencia, User
+from account.referencias import referencias
+from src.consultas import RegistroConsultas
+
+from .dados_sinteticos import DOMINIO
+from .fila_aprovacao import reservar_vaga, vagas_na_fila
+from .models import Candidatura, Vaga, VagaElegibilidade
+from .services import aprovar_vaga_medico, candidatar_pcd
+
+
+class DadosInsuficientes(Exception):
+    pass
+
+
+@dataclass
+class Cenario:
+    nome: str
+    # Recebe o número de iterações e devolve uma função por iteração
+    preparar: Callable[[int], list]
+    escreve: bool = False
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def _usuario(papel, tag):
+    user = User.objects.filter(email__startswith=papel, email__endswith=f'.{tag}@{DOMINIO}').order_by('pk').first()
+    if user is None:
+        raise DadosInsuficientes(f"Nenhum usuário '{papel}' com a tag '{tag}'; rode gerar_dados_sinteticos")
+    return user
+
+
+def _cliente(user):
+    # SERVER_NAME dentro do ALLOWED_HOSTS padrão do DEBUG
+    cliente = Client(SERVER_NAME='localhost')
+    cliente.force_login(user)
+    return cliente
+
+
+def _get(cliente, url):
+    def executar():
+        resposta = cliente.get(url)
+        if resposta.status_code != 200:
+            raise DadosInsuficientes(f"GET {url} respondeu {resposta.status_code}")
+    return executar
+
+
+class Benchmarks:
+    def __init__(self, tag):
+        self.tag = tag
+
+    def candidatar_pcd(self, iteracoes):
+        pares = []
+        elegibilidades = (
+            VagaElegibilidade.objects.filter(vaga__status='aberta')
+            .select_related('vaga').order_by('?')[:iteracoes * 5]
+        )
+        usados = set()
+        for elegibilidade in elegibilidades:
+            pcd = (
+                User.objects.filter(perfil_pcd__deficiencias=elegibilidade.categoria_id)
+                .exclude(candidaturas__vaga=elegibilidade.vaga_id)
+                .select_related('perfil_pcd').order_by('?').first()
+            )
+            if pcd and (pcd.pk, elegibilidade.vaga_id) not in usados:
+                usados.add((pcd.pk, elegibilidade.vaga_id))
+                pares.append((pcd, elegibilidade.vaga))
+            if len(pares) == iteracoes:
+                break
+        return [lambda pcd=pcd, vaga=vaga: candidatar_pcd(pcd, vaga, "Benchmark") for pcd, vaga in pares]
+
+    def aprovar_vaga_medico(self, iteracoes):
+        medico = _usuario('medico', self.tag)
+        vagas = list(vagas_na_fila().filter(revisao_medico__isnull=True).order_by('criado_em')[:iteracoes])
+        deficiencias = [categoria.pk for categoria in referencias(CategoriaDeficiencia)[:2]]
+
+        def executar(vaga):
+            reservar_vaga(vaga, medico)
+            aprovar_vaga_medico(vaga, medico, deficiencias, observacoes="Benchmark")
+        return [lambda vaga=vaga: executar(vaga) for vaga in vagas]
+
+    def detalhe_vaga_pcd(self, iteracoes):
+        cliente = _cliente(_usuario('pcd', self.tag))
+        vagas = Vaga.objects.filter(status='aberta').order_by('?').values_list('pk', flat=True)[:iteracoes]
+        return [_get(cliente, reverse('job_vacancies:vaga_detail', args=[pk])) for pk in vagas]
+
+    def detalhe_vaga_empresa(self, iteracoes):
+        # Vaga com mais candidaturas: o pior caso da página da empresa
+        vaga = (
+            Candidatura.objects.values('vaga_id', 'vaga__empresa_id')
+            .annotate(total=Count('pk')).order_by('-total').first()
+        )
+        if vaga is None:
+            raise DadosInsuficientes("Nenhuma candidatura gerada")
+        cliente = _cliente(User.objects.get(pk=vaga['vaga__empresa_id']))
+        return [_get(cliente, reverse('job_vacancies:vaga_detail', args=[vaga['vaga_id']]))] * iteracoes
+
+    def fila_medica(self, iteracoes):
+        cliente = _cliente(_usuario('medico', self.tag))
+        return [_get(cliente, reverse('doctor:fila'))] * iteracoes
+
+    def dashboard_medico(self, iteracoes):
+        cliente = _cliente(_usuario('medico', self.tag))
+        return [_get(cliente, reverse('doctor:dashboard'))] * iteracoes
+
+    def cenarios(self):
+        return [
+            Cenario('candidatar_pcd', self.candidatar_pcd, escreve=True),
+            Cenario('aprovar_vaga_medico', self.aprovar_vaga_medico, escreve=True),
+            Cenario('detalhe_vaga_pcd', self.detalhe_vaga_pcd),
+            Cenario('detalhe_vaga_empresa', self.detalhe_vaga_empresa),
+            Cenario('fila_medica', self.fila_medica),
+            Cenario('dashboard_medico', self.dashboard_medico),
+        ]
+
+
+def medir(execucoes):
+    tempos, consultas = [], []
+    for executar in execucoes:
+        with RegistroConsultas() as registro:
+            inicio = time.perf_counter()
+            executar()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(registro.total)
+    return {
+        'iteracoes': len(tempos),
+        'media_ms': round(statistics.mean(tempos), 3),
+        'p50_ms': round(_percentil(tempos, 50), 3),
+        'p95_ms': round(_percentil(tempos, 95), 3),
+        'max_ms': round(max(tempos), 3),
+        'consultas': round(statistics.mean(consultas), 1),
+    }
+
+
+def rodar_cenario(cenario, iteracoes):
+    if not cenario.escreve:
+        execucoes = cenario.preparar(iteracoes)
+        return medir(execucoes) if execucoes else None
+    with transaction.atomic():
+        execucoes = cenario.preparar(iteracoes)
+        resultado = medir(execucoes) if execucoes else None
+        transaction.set_rollback(True)
+    return resultado
+
+
+def commit_atual():
+    try:
+        saida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    return saida.stdout.strip()
+
+
+def volumes():
+    return {
+        'usuarios': User.objects.count(),
+        'vagas': Vaga.objects.count(),
+        'candidaturas': Candidatura.objects.count(),
+    }
+
+
+def registrar(resultados, arquivo=None):
+    arquivo = arquivo or settings.BENCHMARK_RESULTADOS
+    registro = {
+        'commit': commit_atual(),
+        'data': timezone.now().isoformat(),
+        'banco': connection.vendor,
+        'volumes': volumes(),
+        'resultados': resultados,
+    }
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, 'a', encoding='utf-8') as saida:
+        saida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+    return registro
+
+
+def execucao_anterior(commit=None, arquivo=None):
+    """Última execução registrada do commit (ou de qualquer commit diferente do atual)."""
+    arquivo = arquivo or settings.BENCHMARK_RESULTADOS
+    if not arquivo.exists():
+        return None
+    atual = commit_atual()
+    escolhida = None
+    with open(arquivo, encoding='utf-8') as entrada:
+        for linha in entrada:
+            registro = json.loads(linha)
+            if commit and registro['commit'].startswith(commit):
+                escolhida = registro
+            elif not commit and registro['commit'] != atual:
+                escolhida = registro
+    return escolhida
@@ -0,0 +1,139 @@
+"""
+Cache de páginas, fragmentos e consultas com chaves versionadas.
+
+Cada namespace ('vagas', 'fila_aprovacao', ...) tem uma versão, opcionalmente
+por objeto ('vaga', 42). Invalidar é só trocar a versão: as chaves antigas
+ficam inalcançáveis e expiram sozinhas. As versões são trocadas pelos sinais
+de Vaga, Candidatura e AvaliacaoVagaMedica (job_vacancies/signals.py) e pelos
+serviços que alteram linhas com UPDATE direto.
+
+Acertos e falhas são contados por namespace em estatisticas_cache(); o backend
+vem de settings.CACHES (locmem, arquivo ou Redis, via CACHE_BACKEND). Fora do
+DEBUG o settings exige arquivo ou Redis: com locmem a troca de versão ficaria
+no processo que a fez.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+
+TIMEOUT_PADRAO = 60 * 5
+PREFIXO = 'cache'
+STATS_NAMESPACES_KEY = f'{PREFIXO}:stats:namespaces'
+
+
+def _versao_key(namespace, escopo):
+    return ':'.join([PREFIXO, 'versao', namespace, *map(str, escopo)])
+
+
+def versao(namespace, *escopo):
+    key = _versao_key(namespace, escopo)
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def invalidar(namespace, *escopo):
+    cache.set(_versao_key(namespace, escopo), time.time_ns(), None)
+
+
+def chave(namespace, escopo=(), partes=()):
+    bruto = ':'.join(map(str, partes))
+    resumo = hashlib.md5(bruto.encode()).hexdigest()
+    return ':'.join([PREFIXO, namespace, *map(str, escopo), str(versao(namespace, *escopo)), resumo])
+
+
+def _contar(namespace, evento):
+    key = f'{PREFIXO}:stats:{namespace}:{evento}'
+    if cache.add(key, 1, None):
+        namespaces = cache.get(STATS_NAMESPACES_KEY) or set()
+        if namespace not in namespaces:
+            cache.set(STATS_NAMESPACES_KEY, namespaces | {namespace}, None)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def obter_ou_calcular(namespace, funcao, escopo=(), partes=(), timeout=TIMEOUT_PADRAO):
+    key = chave(namespace, escopo, partes)
+    valor = cache.get(key)
+    if valor is not None:
+        _contar(namespace, 'hit')
+        return valor
+    _contar(namespace, 'miss')
+    valor = funcao()
+    cache.set(key, valor, timeout)
+    return valor
+
+
+def _pagina_compartilhavel(request):
+    """
+    A chave é só a URL: a página só pode ir para o cache, ou sair dele, se não
+    depender de quem pediu. Quem tem sessão pode ter mensagens pendentes, que o
+    base.html renderiza; as mensagens e o cookie de CSRF só são gravados pelos
+    middlewares depois que a view retorna.
+    """
+    return request.method == 'GET' and not request.user.is_authenticated and \
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def _resposta_compartilhavel(request, resposta):
+    return (
+        resposta.status_code == 200
+        and not resposta.cookies
+        and not getattr(get_messages(request), 'added_new', False)
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def cache_pagina(namespace, timeout=TIMEOUT_PADRAO):
+    """
+    Decorator de método de View: guarda a resposta de GETs anônimos e sem
+    sessão pela URL completa. Os demais recebem a página renderizada na hora,
+    já que o layout muda por usuário e pelas mensagens da sessão.
+    """
+    def decorator(metodo):
+        @wraps(metodo)
+        def wrapper(view, request, *args, **kwargs):
+            if not _pagina_compartilhavel(request):
+                return metodo(view, request, *args, **kwargs)
+
+            key = chave(namespace, partes=('pagina', request.get_full_path()))
+            resposta = cache.get(key)
+            if resposta is not None:
+                _contar(namespace, 'hit')
+                return resposta
+
+            _contar(namespace, 'miss')
+            resposta = metodo(view, request, *args, **kwargs)
+            if hasattr(resposta, 'render') and callable(resposta.render):
+                resposta = resposta.render()
+            if _resposta_compartilhavel(request, resposta):
+                cache.set(key, resposta, timeout)
+            return resposta
+        return wrapper
+    return decorator
+
+
+def estatisticas_cache():
+    resultado = {}
+    for namespace in sorted(cache.get(STATS_NAMESPACES_KEY) or ()):
+        hit = cache.get(f'{PREFIXO}:stats:{namespace}:hit') or 0
+        miss = cache.get(f'{PREFIXO}:stats:{namespace}:miss') or 0
+        total = hit + miss
+        resultado[namespace] = {
+            'hit': hit,
+            'miss': miss,
+            'taxa_acerto': round(hit / total * 100, 1) if total else None,
+        }
+    return resultado
+
+
+def zerar_estatisticas_cache():
+    namespaces = cache.get(STATS_NAMESPACES_KEY) or ()
+    cache.delete_many([f'{PREFIXO}:stats:{ns}:{evento}' for ns in namespaces for evento in ('hit', 'miss')])
+    cache.delete(STATS_NAMESPACES_KEY)
@@ -0,0 +1,433 @@
+"""
+Teste de carga em processo sobre as rotas reais.
+
+Usuários virtuais (PCD, empresa, médico) fazem login pelo formulário e
+percorrem o fluxo pelas URLs de verdade, chamando diretamente a aplicação
+de src/wsgi.py (uma thread por usuário) ou de src/asgi.py (uma corrotina
+por usuário), sem servidor HTTP no meio. Rode sobre dados de
+gerar_dados_sinteticos: candidaturas e avaliações feitas aqui ficam no banco.
+
+Cada jornada é um gerador que devolve Pedidos e recebe Respostas, então a
+mesma jornada serve aos dois modelos. As consultas por requisição vêm do
+cabeçalho X-Consultas (src/consultas.py), que só existe com
+QUERY_ORCAMENTO_MODO diferente de 'desligado'.
+"""
+import asyncio
+import importlib
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import reverse
+
+from account.models import CategoriaDeficiencia, PerfilPCD, User
+from account.referencias import referencias
+
+from .benchmarks import DadosInsuficientes, _percentil
+from .dados_sinteticos import DOMINIO, SENHA_PADRAO
+from .fila_aprovacao import vagas_na_fila
+from .models import Candidatura, Vaga, VagaElegibilidade
+
+HOST = 'localhost'
+PAPEIS = ('pcd', 'empresa', 'medico')
+MIX_PADRAO = 'pcd=0.7,empresa=0.1,medico=0.2'
+# Vagas elegíveis guardadas por candidato; o resto nunca seria usado
+VAGAS_POR_CANDIDATO = 200
+
+_CSRF_FORMULARIO = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class FalhaJornada(Exception):
+    pass
+
+
+@dataclass
+class Pedido:
+    endpoint: str
+    metodo: str
+    caminho: str
+    dados: dict = field(default_factory=dict)
+
+
+@dataclass
+class Resposta:
+    status: int
+    headers: list
+    corpo: bytes
+
+    def header(self, nome):
+        nome = nome.lower()
+        return [valor for chave, valor in self.headers if chave.lower() == nome]
+
+
+class Navegador:
+    """Cookies e token CSRF de um usuário virtual."""
+
+    def __init__(self):
+        self.cookies = {}
+        self.csrf = ''
+
+    def headers(self, pedido):
+        headers = {'Host': HOST}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{nome}={valor}' for nome, valor in self.cookies.items())
+        corpo = b''
+        if pedido.metodo == 'POST':
+            corpo = urlencode({'csrfmiddlewaretoken': self.csrf, **pedido.dados}, doseq=True).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.csrf
+        return headers, corpo
+
+    def receber(self, resposta):
+        for valor in resposta.header('Set-Cookie'):
+            for nome, morsel in SimpleCookie(valor).items():
+                self.cookies[nome] = morsel.value
+        encontrado = _CSRF_FORMULARIO.search(resposta.corpo.decode(errors='ignore'))
+        if encontrado:
+            self.csrf = encontrado.group(1)
+        elif settings.CSRF_COOKIE_NAME in self.cookies:
+            self.csrf = self.cookies[settings.CSRF_COOKIE_NAME]
+
+
+@dataclass
+class Dados:
+    """Objetos sorteados antes da carga, para nada disso entrar na medição."""
+    usuarios: dict
+    vagas_abertas: list
+    vagas_por_empresa: dict
+    elegiveis: dict
+    fila: deque
+    deficiencias: list
+
+
+def _usuarios(papel, tag, quantidade):
+    ids = list(
+        User.objects.filter(email__startswith=papel, email__endswith=f'.{tag}@{DOMINIO}')
+        .order_by('?').values_list('pk', 'email')[:quantidade]
+    )
+    if quantidade and not ids:
+        raise DadosInsuficientes(f"Nenhum usuário '{papel}' com a tag '{tag}'; rode gerar_dados_sinteticos")
+    return ids
+
+
+def preparar(tag, quantidades):
+    usuarios = {papel: _usuarios(papel, tag, quantidades.get(papel, 0)) for papel in PAPEIS}
+
+    vagas_por_empresa = defaultdict(list)
+    for pk, empresa_id in Vaga.objects.filter(
+        empresa__in=[pk for pk, _ in usuarios['empresa']]
+    ).values_list('pk', 'empresa_id'):
+        vagas_por_empresa[empresa_id].append(pk)
+
+    por_categoria = defaultdict(set)
+    for categoria_id, vaga_id in VagaElegibilidade.objects.filter(vaga__status='aberta').values_list(
+        'categoria_id', 'vaga_id'
+    ):
+        por_categoria[categoria_id].add(vaga_id)
+
+    pcds = [pk for pk, _ in usuarios['pcd']]
+    categorias, candidaturas = defaultdict(set), defaultdict(set)
+    for pcd_id, categoria_id in PerfilPCD.deficiencias.through.objects.filter(
+        perfilpcd__user__in=pcds
+    ).values_list('perfilpcd__user_id', 'categoriadeficiencia_id'):
+        categorias[pcd_id].add(categoria_id)
+    for pcd_id, vaga_id in Candidatura.objects.filter(pcd__in=pcds).values_list('pcd_id', 'vaga_id'):
+        candidaturas[pcd_id].add(vaga_id)
+
+    elegiveis = {}
+    for pcd_id in pcds:
+        vagas = set().union(*(por_categoria[c] for c in categorias[pcd_id])) - candidaturas[pcd_id]
+        vagas = list(vagas)
+        random.shuffle(vagas)
+        elegiveis[pcd_id] = vagas[:VAGAS_POR_CANDIDATO]
+
+    return Dados(
+        usuarios=usuarios,
+        vagas_abertas=list(Vaga.objects.filter(status='aberta').values_list('pk', flat=True)),
+        vagas_por_empresa=vagas_por_empresa,
+        elegiveis=elegiveis,
+        fila=deque(vagas_na_fila().filter(revisao_medico__isnull=True).order_by('criado_em').values_list('pk', flat=True)),
+        deficiencias=[categoria.pk for categoria in referencias(CategoriaDeficiencia)[:2]],
+    )
+
+
+def _esperar(resposta, *status):
+    if resposta.status not in status:
+        raise FalhaJornada(f"status {resposta.status}")
+    return resposta
+
+
+def login(email):
+    caminho = reverse('account:login')
+    _esperar((yield Pedido('login_form', 'GET', caminho)), 200)
+    _esperar((yield Pedido('login', 'POST', caminho, {'email': email, 'password': SENHA_PADRAO})), 302)
+
+
+def jornada_pcd(user_id, email, dados):
+    yield from login(email)
+    elegiveis = dados.elegiveis.get(user_id, [])
+    while True:
+        yield Pedido('panel', 'GET', reverse('account:panel'))
+        if dados.vagas_abertas:
+            pk = random.choice(dados.vagas_abertas)
+            yield Pedido('vaga_detail', 'GET', reverse('job_vacancies:vaga_detail', args=[pk]))
+        if elegiveis:
+            pk = elegiveis.pop()
+            yield Pedido('candidatar', 'POST', reverse('job_vacancies:vaga_candidatar', args=[pk]),
+                         {'mensagem': "Teste de carga"})
+
+
+def jornada_empresa(user_id, email, dados):
+    yield from login(email)
+    vagas = dados.vagas_por_empresa.get(user_id, [])
+    while True:
+        yield Pedido('panel', 'GET', reverse('account:panel'))
+        yield Pedido('minhas_vagas', 'GET', reverse('job_vacancies:minhas_vagas'))
+        if vagas:
+            yield Pedido('vaga_detail_empresa', 'GET', reverse('job_vacancies:vaga_detail', args=[random.choice(vagas)]))
+
+
+def jornada_medico(user_id, email, dados):
+    yield from login(email)
+    while True:
+        yield Pedido('dashboard_medico', 'GET', reverse('doctor:dashboard'))
+        yield Pedido('fila', 'GET', reverse('doctor:fila'))
+        try:
+            pk = dados.fila.popleft()
+        except IndexError:
+            continue
+        caminho = reverse('doctor:avaliar_vaga', args=[pk])
+        resposta = yield Pedido('avaliar_form', 'GET', caminho)
+        if resposta.status == 200:
+            yield Pedido('avaliar', 'POST', caminho, {
+                'deficiencias': dados.deficiencias, 'status': 'aprovada', 'observacoes': "Teste de carga",
+            })
+
+
+JORNADAS = {'pcd': jornada_pcd, 'empresa': jornada_empresa, 'medico': jornada_medico}
+
+
+class Medicoes:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.tempos = defaultdict(list)
+        self.consultas = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.falhas = []
+
+    def registrar(self, pedido, resposta, duracao_ms):
+        with self._trava:
+            self.tempos[pedido.endpoint].append(duracao_ms)
+            if resposta.status >= 400:
+                self.erros[pedido.endpoint] += 1
+            consultas = resposta.header('X-Consultas')
+            if consultas:
+                self.consultas[pedido.endpoint].append(int(consultas[0]))
+
+    def falhou(self, papel, erro):
+        with self._trava:
+            self.falhas.append(f"{papel}: {erro}")
+
+    def resumo(self, duracao_s):
+        linhas = {}
+        for endpoint, tempos in sorted(self.tempos.items()):
+            consultas = self.consultas.get(endpoint)
+            linhas[endpoint] = {
+                'requisicoes': len(tempos),
+                'erros': self.erros[endpoint],
+                'p50_ms': round(_percentil(tempos, 50), 2),
+                'p95_ms': round(_percentil(tempos, 95), 2),
+                'p99_ms': round(_percentil(tempos, 99), 2),
+                'por_segundo': round(len(tempos) / duracao_s, 1),
+                'consultas': round(sum(consultas) / len(consultas), 1) if consultas else None,
+            }
+        return linhas
+
+
+def _environ(pedido, headers, corpo):
+    environ = {
+        'REQUEST_METHOD': pedido.metodo,
+        'PATH_INFO': pedido.caminho,
+        'QUERY_STRING': '',
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'CONTENT_LENGTH': str(len(corpo)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(corpo),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for nome, valor in headers.items():
+        if nome == 'Content-Type':
+            environ['CONTENT_TYPE'] = valor
+        else:
+            environ['HTTP_' + nome.upper().replace('-', '_')] = valor
+    return environ
+
+
+def chamar_wsgi(aplicacao, pedido, headers, corpo):
+    inicio = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        inicio['status'], inicio['headers'] = int(status.split()[0]), response_headers
+
+    iteravel = aplicacao(_environ(pedido, headers, corpo), start_response)
+    try:
+        conteudo = b''.join(iteravel)
+    finally:
+        if hasattr(iteravel, 'close'):
+            iteravel.close()
+    return Resposta(inicio['status'], inicio['headers'], conteudo)
+
+
+async def chamar_asgi(aplicacao, pedido, headers, corpo):
+    escopo = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': pedido.metodo,
+        'scheme': 'http',
+        'path': pedido.caminho,
+        'raw_path': pedido.caminho.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(nome.lower().encode(), valor.encode()) for nome, valor in headers.items()],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    terminou = asyncio.Event()
+    enviado = False
+    resposta = {'headers': [], 'corpo': []}
+
+    async def receive():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {'type': 'http.request', 'body': corpo, 'more_body': False}
+        await terminou.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(mensagem):
+        if mensagem['type'] == 'http.response.start':
+            resposta['status'] = mensagem['status']
+            resposta['headers'] = [(k.decode(), v.decode()) for k, v in mensagem.get('headers', [])]
+        elif mensagem['type'] == 'http.response.body':
+            resposta['corpo'].append(mensagem.get('body', b''))
+            if not mensagem.get('more_body'):
+                terminou.set()
+
+    await aplicacao(escopo, receive, send)
+    terminou.set()
+    return Resposta(resposta['status'], resposta['headers'], b''.join(resposta['corpo']))
+
+
+def _usuarios_virtuais(dados, mix, concorrencia):
+    pesos = [mix.get(papel, 0) for papel in PAPEIS]
+    papeis = random.choices(PAPEIS, weights=pesos, k=concorrencia)
+    virtuais = []
+    for i, papel in enumerate(papeis):
+        disponiveis = dados.usuarios[papel]
+        user_id, email = disponiveis[i % len(disponiveis)]
+        virtuais.append((papel, JORNADAS[papel](user_id, email, dados)))
+    return virtuais
+
+
+def _rodar_wsgi(virtuais, fim, medicoes):
+    aplicacao = importlib.import_module('src.wsgi').application
+
+    def executar(papel, jornada):
+        navegador = Navegador()
+        try:
+            resposta = None
+            while time.monotonic() < fim:
+                pedido = jornada.send(resposta)
+                headers, corpo = navegador.headers(pedido)
+                inicio = time.perf_counter()
+                resposta = chamar_wsgi(aplicacao, pedido, headers, corpo)
+                medicoes.registrar(pedido, resposta, (time.perf_counter() - inicio) * 1000)
+                navegador.receber(resposta)
+        except FalhaJornada as e:
+            medicoes.falhou(papel, e)
+        finally:
+            jornada.close()
+            close_old_connections()
+
+    threads = [threading.Thread(target=executar, args=virtual) for virtual in virtuais]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+async def _rodar_asgi(virtuais, fim, medicoes):
+    aplicacao = importlib.import_module('src.asgi').application
+
+    async def executar(papel, jornada):
+        navegador = Navegador()
+        try:
+            resposta = None
+            while time.monotonic() < fim:
+                pedido = jornada.send(resposta)
+                headers, corpo = navegador.headers(pedido)
+                inicio = time.perf_counter()
+                resposta = await chamar_asgi(aplicacao, pedido, headers, corpo)
+                medicoes.registrar(pedido, resposta, (time.perf_counter() - inicio) * 1000)
+                navegador.receber(resposta)
+        except FalhaJornada as e:
+            medicoes.falhou(papel, e)
+        finally:
+            jornada.close()
+
+    await asyncio.gather(*(executar(*virtual) for virtual in virtuais))
+
+
+def teste_carga(tag, servidor='wsgi', concorrencia=10, duracao=30, mix=None, seed=None):
+    """
+    Roda `concorrencia` usuários virtuais por `duracao` segundos contra a
+    aplicação WSGI ou ASGI e devolve as medições por endpoint.
+    """
+    if servidor not in ('wsgi', 'asgi'):
+        raise ValueError(f"Servidor desconhecido: {servidor}")
+    mix = mix or {}
+    if not any(mix.get(papel) for papel in PAPEIS):
+        raise ValueError(f"O mix precisa de ao menos um destes papéis: {', '.join(PAPEIS)}")
+    random.seed(seed)
+
+    quantidades = {papel: concorrencia if mix.get(papel) else 0 for papel in PAPEIS}
+    dados = preparar(tag, quantidades)
+    virtuais = _usuarios_virtuais(dados, mix, concorrencia)
+    medicoes = Medicoes()
+
+    inicio = time.monotonic()
+    fim = inicio + duracao
+    if servidor == 'wsgi':
+        _rodar_wsgi(virtuais, fim, medicoes)
+    else:
+        asyncio.run(_rodar_asgi(virtuais, fim, medicoes))
+    decorrido = time.monotonic() - inicio
+
+    total = sum(len(tempos) for tempos in medicoes.tempos.values())
+    return {
+        'servidor': servidor,
+        'concorrencia': concorrencia,
+        'duracao_s': round(decorrido, 2),
+        'requisicoes': total,
+        'por_segundo': round(total / decorrido, 1),
+        'endpoints': medicoes.resumo(decorrido),
+        'falhas': medicoes.falhas,
+    }
@@ -0,0 +1,131 @@
+"""
+Pub/sub do chat entre empresa e candidato.
+
+O broker só avisa que uma conversa tem mensagem nova; quem está assinando
+busca no banco as mensagens depois do último id entregue. Conversas ociosas
+não geram nenhuma query.
+
+settings.CHAT_PUBSUB escolhe a implementação:
+    job_vacancies.chat.BrokerEmMemoria  um processo só (dev/testes)
+    job_vacancies.chat.BrokerRedis      vários workers ASGI (requer o pacote redis)
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class AssinaturaEmMemoria:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.fila = asyncio.Queue()
+
+    def notificar(self, mensagem_id):
+        self.loop.call_soon_threadsafe(self.fila.put_nowait, mensagem_id)
+
+    async def aguardar(self, timeout):
+        try:
+            await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        # Várias notificações viram uma única busca no banco
+        while not self.fila.empty():
+            self.fila.get_nowait()
+        return True
+
+
+class BrokerEmMemoria:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinaturas = {}
+
+    def publicar(self, conversa_id, mensagem_id):
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(conversa_id, ()))
+        for assinatura in assinaturas:
+            assinatura.notificar(mensagem_id)
+
+    @asynccontextmanager
+    async def assinar(self, conversa_id):
+        assinatura = AssinaturaEmMemoria()
+        with self._lock:
+            self._assinaturas.setdefault(conversa_id, set()).add(assinatura)
+        try:
+            yield assinatura
+        finally:
+            with self._lock:
+                assinaturas = self._assinaturas.get(conversa_id)
+                if assinaturas is not None:
+                    assinaturas.discard(assinatura)
+                    if not assinaturas:
+                        del self._assinaturas[conversa_id]
+
+
+class AssinaturaRedis:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def aguardar(self, timeout):
+        mensagem = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if mensagem is None:
+            return False
+        while await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=0):
+            pass
+        return True
+
+
+class BrokerRedis:
+    def __init__(self):
+        import redis
+
+        self.url = settings.CHAT_REDIS_URL
+        self._cliente = redis.Redis.from_url(self.url)
+
+    def _canal(self, conversa_id):
+        return f'chat:conversa:{conversa_id}'
+
+    def publicar(self, conversa_id, mensagem_id):
+        self._cliente.publish(self._canal(conversa_id), mensagem_id)
+
+    @asynccontextmanager
+    async def assinar(self, conversa_id):
+        import redis.asyncio
+
+        cliente = redis.asyncio.Redis.from_url(self.url)
+        pubsub = cliente.pubsub()
+        await pubsub.subscribe(self._canal(conversa_id))
+        try:
+            yield AssinaturaRedis(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await cliente.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.CHAT_PUBSUB)()
+    return _broker
+
+
+def publicar_mensagem(mensagem):
+    get_broker().publicar(mensagem.conversa_id, mensagem.pk)
+
+
+def serializar_mensagem(mensagem):
+    return {
+        'id': mensagem.pk,
+        'remetente_tipo': mensagem.remetente_tipo,
+        'conteudo': mensagem.conteudo,
+        'anexo': mensagem.anexo.url if mensagem.anexo else None,
+        'enviado_em': mensagem.enviado_em.isoformat(),
+    }
@@ -0,0 +1,372 @@
+"""
+Gerador de dados sintéticos para benchmarks e testes de carga.
+
+Cria empresas, PCDs, médicos, vagas, candidaturas, conversas e mensagens com
+bulk_create em lotes e, no fim, reconstrói as projeções que os save() e os
+sinais mantêm no uso normal: elegibilidade, histórico e tempos por etapa,
+métricas médicas e contadores de não lidas.
+
+Os usuários gerados têm a senha SENHA_PADRAO e e-mails
+<papel><n>.<tag>@exemplo.test (papel: empresa, pcd, medico), para que os
+benchmarks e o teste de carga consigam logar.
+
+A distribuição 'zipf' concentra vagas em poucas empresas e candidaturas em
+poucas vagas, como em produção; 'uniforme' espalha por igual.
+"""
+import itertools
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+
+from account.constants import Grupos
+from account.models import CategoriaDeficiencia, PerfilEmpresa, PerfilMedico, PerfilPCD, User
+
+from .cache import invalidar
+from .historico import reconstruir_tempos_etapa
+from .metricas_medicas import reconstruir_metricas_medicas
+from .models import (
+    AvaliacaoVagaMedica, Candidatura, CandidaturaEvento, Conversa, Mensagem,
+    RecursoAcessibilidade, Vaga, VagaElegibilidade,
+)
+from .services import reconciliar_contadores_nao_lidas
+
+SENHA_PADRAO = 'benchmark-123'
+DOMINIO = 'exemplo.test'
+TAMANHO_LOTE = 2000
+
+CATEGORIAS = ['Física', 'Visual', 'Auditiva', 'Intelectual', 'Psicossocial', 'Múltipla']
+RECURSOS = ['Rampa de acesso', 'Elevador', 'Intérprete de Libras', 'Leitor de tela', 'Banheiro adaptado', 'Piso tátil']
+CARGOS = [
+    'Analista', 'Assistente', 'Desenvolvedor', 'Auxiliar', 'Coordenador', 'Técnico',
+    'Atendente', 'Designer', 'Operador', 'Consultor', 'Especialista', 'Estagiário',
+]
+AREAS = [
+    'Administrativo', 'Financeiro', 'de Suporte', 'de Dados', 'Comercial', 'de Logística',
+    'de RH', 'Backend', 'Frontend', 'de Marketing', 'de Qualidade', 'Jurídico',
+]
+CIDADES = ['São Paulo/SP', 'Rio de Janeiro/RJ', 'Belo Horizonte/MG', 'Curitiba/PR', 'Recife/PE', 'Porto Alegre/RS', 'Remoto']
+
+STATUS_VAGAS = {
+    'aberta': 0.55, 'aguardando_aprovacao': 0.1, 'rascunho': 0.1, 'aprovada': 0.05,
+    'rejeitada': 0.05, 'pausada': 0.05, 'finalizada': 0.1,
+}
+STATUS_CANDIDATURAS = {
+    'pendente': 0.4, 'visualizado': 0.2, 'em_analise': 0.15, 'pre_selecionado': 0.08,
+    'entrevista_agendada': 0.05, 'aprovado': 0.03, 'reprovado': 0.08, 'desistente': 0.01,
+}
+AVALIACAO_POR_STATUS = {
+    'aberta': 'aprovada', 'aprovada': 'aprovada', 'pausada': 'aprovada', 'finalizada': 'aprovada',
+    'rejeitada': 'rejeitada',
+}
+
+
+def parse_mix(texto):
+    """'aberta=0.6,rascunho=0.4' -> {'aberta': 0.6, 'rascunho': 0.4}"""
+    mix = {}
+    for parte in filter(None, texto.split(',')):
+        chave, _, peso = parte.partition('=')
+        mix[chave.strip()] = float(peso)
+    return mix
+
+
+class Amostrador:
+    """Escolhe itens de uma população com pesos uniformes ou de Zipf."""
+
+    def __init__(self, rng, populacao, distribuicao='zipf', expoente=1.1):
+        self.rng = rng
+        self.populacao = list(populacao)
+        # Embaralha para a popularidade não acompanhar a ordem de criação
+        rng.shuffle(self.populacao)
+        if distribuicao == 'zipf':
+            pesos = (1 / (posicao ** expoente) for posicao in range(1, len(self.populacao) + 1))
+            self.acumulados = list(itertools.accumulate(pesos))
+        else:
+            self.acumulados = None
+
+    def escolher(self, quantidade=1):
+        if self.acumulados is None:
+            return self.rng.choices(self.populacao, k=quantidade)
+        return self.rng.choices(self.populacao, cum_weights=self.acumulados, k=quantidade)
+
+
+def _escolher_ponderado(rng, mix):
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+@contextmanager
+def datas_manuais(*campos):
+    """Desliga auto_now/auto_now_add dos campos para gravar datas no passado."""
+    originais = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo, _, _ in originais:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originais:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def _campos(modelo, *nomes):
+    return [modelo._meta.get_field(nome) for nome in nomes]
+
+
+def _lotes(objetos, tamanho):
+    for inicio in range(0, len(objetos), tamanho):
+        yield objetos[inicio:inicio + tamanho]
+
+
+class GeradorDados:
+    def __init__(self, tag, seed=42, distribuicao='zipf', expoente=1.1, dias=180,
+                 status_vagas=None, status_candidaturas=None, tamanho_lote=TAMANHO_LOTE, ao_progresso=None):
+        self.tag = tag
+        self.rng = random.Random(seed)
+        self.distribuicao = distribuicao
+        self.expoente = expoente
+        self.dias = dias
+        self.status_vagas = status_vagas or STATUS_VAGAS
+        self.status_candidaturas = status_candidaturas or STATUS_CANDIDATURAS
+        self.tamanho_lote = tamanho_lote
+        self.ao_progresso = ao_progresso
+        self.agora = timezone.now()
+        self.senha = make_password(SENHA_PADRAO)
+
+    def _progresso(self, etapa, quantidade):
+        if self.ao_progresso:
+            self.ao_progresso(etapa, quantidade)
+
+    def _bulk(self, modelo, objetos, **kwargs):
+        criados = []
+        for lote in _lotes(objetos, self.tamanho_lote):
+            criados.extend(modelo.objects.bulk_create(lote, **kwargs))
+        self._progresso(modelo.__name__, len(objetos))
+        return criados
+
+    def _data_passada(self, maximo_dias=None):
+        return self.agora - timedelta(seconds=self.rng.uniform(0, (maximo_dias or self.dias) * 86400))
+
+    def _data_entre(self, inicio, fim=None):
+        fim = fim or self.agora
+        return inicio + (fim - inicio) * self.rng.random()
+
+    def email(self, papel, numero):
+        return f'{papel}{numero}.{self.tag}@{DOMINIO}'
+
+    def _usuarios(self, papel, quantidade, nome):
+        return self._bulk(User, [
+            User(email=self.email(papel, i), nome_completo=f'{nome} {i} {self.tag}', password=self.senha, is_active=True)
+            for i in range(quantidade)
+        ])
+
+    def referencias(self):
+        for nome in CATEGORIAS:
+            CategoriaDeficiencia.objects.get_or_create(nome=nome)
+        for nome in RECURSOS:
+            RecursoAcessibilidade.objects.get_or_create(nome=nome)
+        self.categorias = list(CategoriaDeficiencia.objects.values_list('pk', flat=True))
+        self.recursos = list(RecursoAcessibilidade.objects.values_list('pk', flat=True))
+
+    def empresas(self, quantidade):
+        usuarios = self._usuarios('empresa', quantidade, 'Empresa')
+        self._bulk(PerfilEmpresa, [
+            PerfilEmpresa(user=user, cnpj=f'{self.tag}-{i}', razao_social=user.nome_completo, telefone_principal='1130000000')
+            for i, user in enumerate(usuarios)
+        ])
+        self.empresa_ids = [user.pk for user in usuarios]
+
+    def pcds(self, quantidade):
+        usuarios = self._usuarios('pcd', quantidade, 'Candidato')
+        perfis = self._bulk(PerfilPCD, [
+            PerfilPCD(
+                user=user, cpf=f'{self.tag}-{i}',
+                modalidade_preferida=self.rng.choice(['presencial', 'remoto', 'hibrido']),
+                localizacao=self.rng.choice(CIDADES),
+            )
+            for i, user in enumerate(usuarios)
+        ])
+        # Cada PCD com 1 ou 2 categorias; guardado por categoria para gerar candidaturas elegíveis
+        self.pcds_por_categoria = defaultdict(list)
+        relacoes = []
+        for perfil in perfis:
+            for categoria_id in self.rng.sample(self.categorias, self.rng.choice([1, 1, 2])):
+                relacoes.append(PerfilPCD.deficiencias.through(perfilpcd_id=perfil.pk, categoriadeficiencia_id=categoria_id))
+                self.pcds_por_categoria[categoria_id].append(perfil.user_id)
+        self._bulk(PerfilPCD.deficiencias.through, relacoes)
+
+    def medicos(self, quantidade):
+        usuarios = self._usuarios('medico', quantidade, 'Médico')
+        self._bulk(PerfilMedico, [
+            PerfilMedico(user=user, crm=f'{self.tag}-{i}', uf_crm='SP') for i, user in enumerate(usuarios)
+        ])
+        grupo, _ = Group.objects.get_or_create(name=Grupos.MEDICO)
+        self._bulk(User.groups.through, [User.groups.through(user_id=user.pk, group_id=grupo.pk) for user in usuarios])
+        self.medico_ids = [user.pk for user in usuarios]
+
+    def vagas(self, quantidade):
+        empresas = Amostrador(self.rng, self.empresa_ids, self.distribuicao, self.expoente)
+        vagas = []
+        for empresa_id in empresas.escolher(quantidade):
+            status = _escolher_ponderado(self.rng, self.status_vagas)
+            salario = Decimal(self.rng.randrange(1500, 15000, 100))
+            criado_em = self._data_passada()
+            vagas.append(Vaga(
+                criado_em=criado_em,
+                atualizado_em=criado_em,
+                empresa_id=empresa_id,
+                titulo=f'{self.rng.choice(CARGOS)} {self.rng.choice(AREAS)}',
+                descricao='Vaga afirmativa para pessoas com deficiência. ' * self.rng.randint(2, 8),
+                tipo='capacitacao' if self.rng.random() < 0.1 else 'emprego',
+                modalidade=self.rng.choice(['presencial', 'remoto', 'hibrido']),
+                localizacao=self.rng.choice(CIDADES),
+                salario_min=salario,
+                salario_max=salario + Decimal(self.rng.randrange(0, 5000, 100)),
+                mostrar_salario=self.rng.random() < 0.6,
+                status=status,
+            ))
+        with datas_manuais(*_campos(Vaga, 'criado_em', 'atualizado_em')):
+            vagas = self._bulk(Vaga, vagas)
+
+        recursos = []
+        for vaga in vagas:
+            for recurso_id in self.rng.sample(self.recursos, self.rng.randint(0, 3)):
+                recursos.append(Vaga.recursos_disponiveis.through(vaga_id=vaga.pk, recursoacessibilidade_id=recurso_id))
+        self._bulk(Vaga.recursos_disponiveis.through, recursos)
+
+        self._avaliacoes(vagas)
+        self.vagas_abertas = [vaga for vaga in vagas if vaga.status == 'aberta']
+
+    def _avaliacoes(self, vagas):
+        avaliacoes, deficiencias, publicadas = [], {}, []
+        for vaga in vagas:
+            if vaga.status == 'aguardando_aprovacao':
+                avaliacoes.append(AvaliacaoVagaMedica(vaga_id=vaga.pk))
+            elif vaga.status in AVALIACAO_POR_STATUS and self.medico_ids:
+                avaliacao = AvaliacaoVagaMedica(
+                    vaga_id=vaga.pk,
+                    medico_id=self.rng.choice(self.medico_ids),
+                    status=AVALIACAO_POR_STATUS[vaga.status],
+                    avaliado_em=min(vaga.criado_em + timedelta(hours=self.rng.uniform(1, 72)), self.agora),
+                )
+                avaliacoes.append(avaliacao)
+                if vaga.status in ('aberta', 'pausada', 'finalizada'):
+                    vaga.publicado_em = self._data_entre(avaliacao.avaliado_em)
+                    publicadas.append(vaga)
+                if avaliacao.status == 'aprovada':
+                    deficiencias[vaga.pk] = self.rng.sample(self.categorias, self.rng.randint(1, 3))
+        avaliacoes = self._bulk(AvaliacaoVagaMedica, avaliacoes)
+        Vaga.objects.bulk_update(publicadas, ['publicado_em'], batch_size=self.tamanho_lote)
+
+        relacoes, elegibilidades = [], []
+        status_por_vaga = {vaga.pk: vaga.status for vaga in vagas}
+        for avaliacao in avaliacoes:
+            for categoria_id in deficiencias.get(avaliacao.vaga_id, ()):
+                relacoes.append(AvaliacaoVagaMedica.deficiencias_elegiveis.through(
+                    avaliacaovagamedica_id=avaliacao.pk, categoriadeficiencia_id=categoria_id
+                ))
+                if status_por_vaga[avaliacao.vaga_id] == 'aberta':
+                    elegibilidades.append(VagaElegibilidade(vaga_id=avaliacao.vaga_id, categoria_id=categoria_id))
+        self._bulk(AvaliacaoVagaMedica.deficiencias_elegiveis.through, relacoes)
+        self._bulk(VagaElegibilidade, elegibilidades)
+        self.categorias_por_vaga = deficiencias
+
+    def candidaturas(self, quantidade):
+        if not self.vagas_abertas or not self.pcds_por_categoria:
+            return
+        vagas = Amostrador(
+            self.rng, [vaga for vaga in self.vagas_abertas if vaga.pk in self.categorias_por_vaga],
+            self.distribuicao, self.expoente,
+        )
+        pares, candidaturas = set(), []
+        tentativas = 0
+        while len(candidaturas) < quantidade and tentativas < quantidade * 3:
+            for vaga in vagas.escolher(min(quantidade - len(candidaturas), self.tamanho_lote)):
+                tentativas += 1
+                categoria_id = self.rng.choice(self.categorias_por_vaga[vaga.pk])
+                candidatos = self.pcds_por_categoria.get(categoria_id)
+                if not candidatos:
+                    continue
+                pcd_id = self.rng.choice(candidatos)
+                if (vaga.pk, pcd_id) in pares:
+                    continue
+                pares.add((vaga.pk, pcd_id))
+                criado_em = self._data_entre(vaga.publicado_em)
+                status = _escolher_ponderado(self.rng, self.status_candidaturas)
+                candidaturas.append(Candidatura(
+                    vaga_id=vaga.pk,
+                    pcd_id=pcd_id,
+                    status=status,
+                    status_desde=criado_em if status == 'pendente' else self._data_entre(criado_em),
+                    mensagem_candidato='Tenho interesse na vaga.',
+                    criado_em=criado_em,
+                    atualizado_em=criado_em,
+                ))
+        with datas_manuais(*_campos(Candidatura, 'criado_em', 'atualizado_em')):
+            candidaturas = self._bulk(Candidatura, candidaturas)
+
+        # Histórico mínimo: entrada como pendente e, se mudou, a transição para o status atual
+        empresa_por_vaga = {vaga.pk: vaga.empresa_id for vaga in self.vagas_abertas}
+        eventos = []
+        for candidatura in candidaturas:
+            entrada = candidatura.criado_em
+            base = dict(candidatura_id=candidatura.pk, vaga_id=candidatura.vaga_id, empresa_id=empresa_por_vaga[candidatura.vaga_id])
+            eventos.append(CandidaturaEvento(status_novo='pendente', ocorrido_em=entrada, **base))
+            if candidatura.status != 'pendente':
+                eventos.append(CandidaturaEvento(
+                    status_anterior='pendente', status_novo=candidatura.status,
+                    duracao_anterior=candidatura.status_desde - entrada, ocorrido_em=candidatura.status_desde, **base
+                ))
+        self._bulk(CandidaturaEvento, eventos)
+        self.conversa_ids = [conversa.pk for conversa in self._bulk(
+            Conversa, [Conversa(candidatura_id=candidatura.pk) for candidatura in candidaturas]
+        )]
+
+    def mensagens(self, quantidade):
+        if not getattr(self, 'conversa_ids', None):
+            return
+        conversas = Amostrador(self.rng, self.conversa_ids, self.distribuicao, self.expoente)
+        with datas_manuais(*_campos(Mensagem, 'enviado_em')):
+            for lote in _lotes(conversas.escolher(quantidade), self.tamanho_lote):
+                Mensagem.objects.bulk_create([
+                    Mensagem(
+                        conversa_id=conversa_id,
+                        remetente_tipo=remetente,
+                        conteudo='Olá! Podemos conversar sobre a vaga?',
+                        enviado_em=self._data_passada(30),
+                        lida_por_empresa=remetente == 'empresa' or self.rng.random() < 0.7,
+                        lida_por_pcd=remetente == 'pcd' or self.rng.random() < 0.7,
+                    )
+                    for conversa_id, remetente in ((c, self.rng.choice(['empresa', 'pcd'])) for c in lote)
+                ])
+        self._progresso(Mensagem.__name__, quantidade)
+
+    def projecoes(self):
+        reconciliar_contadores_nao_lidas()
+        reconstruir_tempos_etapa()
+        reconstruir_metricas_medicas()
+        invalidar('vagas')
+        invalidar('fila_aprovacao')
+        self._progresso('projeções', 0)
+
+
+def gerar_dados(tag, empresas=2000, pcds=100000, medicos=50, vagas=200000, candidaturas=300000,
+                mensagens=300000, **opcoes):
+    if User.objects.filter(email__endswith=f'.{tag}@{DOMINIO}').exists():
+        raise ValueError(f"Já existem dados gerados com a tag '{tag}'")
+
+    gerador = GeradorDados(tag, **opcoes)
+    with transaction.atomic():
+        gerador.referencias()
+        gerador.empresas(empresas)
+        gerador.pcds(pcds)
+        gerador.medicos(medicos)
+        gerador.vagas(vagas)
+        gerador.candidaturas(candidaturas)
+        gerador.mensagens(mensagens)
+        gerador.projecoes()
+    return gerador
@@ -0,0 +1,89 @@
+"""
+Fila de aprovação médica com reserva de vagas.
+
+Cada médico reserva as próximas vagas aguardando aprovação e só ele pode
+avaliá-las enquanto a reserva vale (settings.FILA_MEDICA_RESERVA_MINUTOS).
+Reservas expiradas voltam para a fila sem nenhuma limpeza explícita.
+
+No Postgres as candidatas são travadas com SELECT ... FOR UPDATE SKIP LOCKED,
+então médicos concorrentes recebem vagas diferentes sem esperar uns pelos
+outros. Onde não há SKIP LOCKED (SQLite) vale o UPDATE condicional: só é
+reservada a vaga que ainda estava livre no momento da escrita.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidar
+from .models import Vaga
+
+
+def _prazo():
+    return timedelta(minutes=getattr(settings, 'FILA_MEDICA_RESERVA_MINUTOS', 30))
+
+
+def _livre(agora):
+    return Q(revisao_expira_em__isnull=True) | Q(revisao_expira_em__lte=agora)
+
+
+def disponivel_para(medico_user, agora=None):
+    """Q das vagas que o médico pode avaliar agora: livres ou reservadas por ele."""
+    return _livre(agora or timezone.now()) | Q(revisao_medico=medico_user)
+
+
+def vagas_na_fila():
+    return Vaga.objects.filter(status='aguardando_aprovacao')
+
+
+def reservas_ativas(medico_user, agora=None):
+    return vagas_na_fila().filter(revisao_medico=medico_user, revisao_expira_em__gt=agora or timezone.now())
+
+
+def reservar_vagas(medico_user, quantidade=None):
+    """
+    Completa as reservas do médico até `quantidade` vagas, renovando as que
+    ele já tem. Retorna a lista de vagas reservadas.
+    """
+    quantidade = quantidade or getattr(settings, 'FILA_MEDICA_LOTE', 5)
+    agora = timezone.now()
+    expira_em = agora + _prazo()
+
+    with transaction.atomic():
+        renovadas = reservas_ativas(medico_user, agora).update(revisao_expira_em=expira_em)
+        faltam = quantidade - renovadas
+        if faltam > 0:
+            candidatas = list(
+                vagas_na_fila()
+                .filter(_livre(agora))
+                .order_by('criado_em', 'pk')
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:faltam]
+            )
+            if candidatas:
+                vagas_na_fila().filter(_livre(agora), pk__in=candidatas).update(
+                    revisao_medico=medico_user, revisao_expira_em=expira_em
+                )
+
+    invalidar('fila_aprovacao')
+    return list(reservas_ativas(medico_user, agora).select_related('empresa').order_by('criado_em', 'pk'))
+
+
+def reservar_vaga(vaga, medico_user):
+    """Reserva ou renova uma vaga específica. False se outro médico a detém."""
+    agora = timezone.now()
+    reservada = vagas_na_fila().filter(disponivel_para(medico_user, agora), pk=vaga.pk).update(
+        revisao_medico=medico_user, revisao_expira_em=agora + _prazo()
+    )
+    invalidar('fila_aprovacao')
+    return reservada == 1
+
+
+def liberar_reserva(vaga, medico_user):
+    liberadas = Vaga.objects.filter(pk=vaga.pk, revisao_medico=medico_user).update(
+        revisao_medico=None, revisao_expira_em=None
+    )
+    invalidar('fila_aprovacao')
+    return liberadas
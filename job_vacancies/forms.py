@@ -1,9 +1,31 @@
 from django import forms
+from django.forms.models import ModelChoiceIterator
+from account.referencias import referencias
 from .models import Vaga, RecursoAcessibilidade
 
 
+class ReferenciaChoiceIterator(ModelChoiceIterator):
+    """Monta as opções a partir de account.referencias, sem consultar o banco."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in referencias(self.queryset.model):
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(referencias(self.queryset.model)) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(referencias(self.queryset.model))
+
+
+class ReferenciaMultipleChoiceField(forms.ModelMultipleChoiceField):
+    iterator = ReferenciaChoiceIterator
+
+
 class VagaForm(forms.ModelForm):
-    recursos_disponiveis = forms.ModelMultipleChoiceField(
+    recursos_disponiveis = ReferenciaMultipleChoiceField(
         queryset=RecursoAcessibilidade.objects.all().order_by('nome'),
         widget=forms.CheckboxSelectMultiple,
         required=False,
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import Candidatura, CandidaturaEvento, TempoEtapa
+
+
+def registrar_transicoes(linhas, novo_status, vaga_id, empresa_id, agora):
+    """
+    Grava os eventos de uma transição e soma o tempo de etapa nos agregados.
+    Deve rodar na mesma transação que altera Candidatura.status.
+
+    linhas: [(candidatura_id, status_anterior ou None, status_desde_anterior)]
+    """
+    eventos = []
+    tempos = defaultdict(lambda: [0, timedelta(0)])
+
+    for candidatura_id, status_anterior, entrou_em in linhas:
+        duracao = agora - entrou_em if status_anterior and entrou_em else None
+        eventos.append(CandidaturaEvento(
+            candidatura_id=candidatura_id,
+            vaga_id=vaga_id,
+            empresa_id=empresa_id,
+            status_anterior=status_anterior or '',
+            status_novo=novo_status,
+            duracao_anterior=duracao,
+            ocorrido_em=agora,
+        ))
+        if duracao is not None:
+            tempos[status_anterior][0] += 1
+            tempos[status_anterior][1] += duracao
+
+    CandidaturaEvento.objects.bulk_create(eventos)
+    _somar_tempos(vaga_id, empresa_id, tempos)
+
+
+def _somar_tempos(vaga_id, empresa_id, tempos):
+    if not tempos:
+        return
+    TempoEtapa.objects.bulk_create(
+        [TempoEtapa(vaga_id=vaga_id, empresa_id=empresa_id, status=status) for status in tempos],
+        ignore_conflicts=True,
+    )
+    for status, (quantidade, total) in tempos.items():
+        TempoEtapa.objects.filter(vaga_id=vaga_id, status=status).update(
+            quantidade=F('quantidade') + quantidade,
+            total=F('total') + total,
+        )
+
+
+def tempo_medio_por_etapa(vaga=None, empresa=None):
+    """Tempo médio por status a partir dos agregados, sem reler o histórico."""
+    tempos = TempoEtapa.objects.all()
+    if vaga is not None:
+        tempos = tempos.filter(vaga=vaga)
+    if empresa is not None:
+        tempos = tempos.filter(empresa=empresa)
+
+    agregados = {
+        linha['status']: linha
+        for linha in tempos.values('status').annotate(qtd=Sum('quantidade'), soma=Sum('total'))
+    }
+    resultado = []
+    for status, label in Candidatura.STATUS_CHOICES:
+        linha = agregados.get(status)
+        if linha and linha['qtd']:
+            media = linha['soma'] / linha['qtd']
+            resultado.append({
+                'status': status,
+                'label': label,
+                'quantidade': linha['qtd'],
+                'media': media,
+                'media_dias': round(media.total_seconds() / 86400, 1),
+            })
+    return resultado
+
+
+def reconstruir_tempos_etapa(vaga_ids=None):
+    """Recalcula os agregados a partir do histórico (backfill ou reparo)."""
+    eventos = CandidaturaEvento.objects.filter(duracao_anterior__isnull=False)
+    agregados = TempoEtapa.objects.all()
+    if vaga_ids is not None:
+        eventos = eventos.filter(vaga_id__in=vaga_ids)
+        agregados = agregados.filter(vaga_id__in=vaga_ids)
+
+    linhas = (
+        eventos
+        .values('vaga_id', 'empresa_id', 'status_anterior')
+        .annotate(qtd=Count('pk'), soma=Sum('duracao_anterior'))
+        .order_by()
+    )
+    with transaction.atomic():
+        agregados.delete()
+        TempoEtapa.objects.bulk_create(
+            [
+                TempoEtapa(
+                    vaga_id=linha['vaga_id'],
+                    empresa_id=linha['empresa_id'],
+                    status=linha['status_anterior'],
+                    quantidade=linha['qtd'],
+                    total=linha['soma'],
+                )
+                for linha in linhas.iterator()
+            ],
+            batch_size=1000,
+        )
@@ -0,0 +1,163 @@
+"""
+Importação em massa de vagas a partir de CSV ou JSONL.
+
+O arquivo é lido linha a linha e gravado em lotes de tamanho fixo, então o
+consumo de memória não depende do tamanho do arquivo. Cada linha passa pelas
+regras do VagaForm; linhas inválidas são reportadas sem interromper o lote.
+"""
+import codecs
+import csv
+import json
+import logging
+
+from django import forms
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+
+from account.referencias import referencias
+
+from .forms import VagaForm
+from .models import AvaliacaoVagaMedica, RecursoAcessibilidade, Vaga
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+MAX_ERROS_DETALHADOS = 1000
+FORMATOS = ('csv', 'jsonl')
+
+
+class VagaImportForm(VagaForm):
+    # Escolhas carregadas uma vez por importação, não uma query por linha
+    recursos_disponiveis = forms.TypedMultipleChoiceField(coerce=int, required=False)
+
+    def __init__(self, *args, recursos_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['recursos_disponiveis'].choices = recursos_choices
+
+
+def detectar_formato(nome_arquivo):
+    extensao = nome_arquivo.rsplit('.', 1)[-1].lower()
+    if extensao in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+def _recursos_csv(valor):
+    return [parte.strip() for parte in (valor or '').split(';') if parte.strip()]
+
+
+def ler_linhas(arquivo_binario, formato):
+    """Gera (numero_linha, dados) sem carregar o arquivo inteiro."""
+    texto = codecs.getreader('utf-8-sig')(arquivo_binario)
+
+    if formato == 'jsonl':
+        for numero, linha in enumerate(texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                dados = json.loads(linha)
+            except ValueError as e:
+                yield numero, e
+                continue
+            yield numero, dados if isinstance(dados, dict) else ValueError("Linha não é um objeto JSON")
+        return
+
+    leitor = csv.DictReader(texto)
+    for dados in leitor:
+        dados['recursos_disponiveis'] = _recursos_csv(dados.get('recursos_disponiveis'))
+        yield leitor.line_num, dados
+
+
+class ImportadorVagas:
+    def __init__(self, empresa_user, tamanho_lote=TAMANHO_LOTE, ao_erro=None):
+        if empresa_user.tipo != 'empresa':
+            raise PermissionDenied("Apenas empresas podem importar vagas")
+
+        self.empresa = empresa_user
+        self.tamanho_lote = tamanho_lote
+        self.ao_erro = ao_erro
+
+        recursos = [(recurso.pk, recurso.nome) for recurso in referencias(RecursoAcessibilidade)]
+        self.recursos_choices = [(str(pk), nome) for pk, nome in recursos]
+        self.recursos_por_nome = {nome.casefold(): str(pk) for pk, nome in recursos}
+
+        self.criadas = 0
+        self.total_erros = 0
+        self.erros = []
+
+    def _registrar_erro(self, linha, mensagens):
+        self.total_erros += 1
+        if len(self.erros) < MAX_ERROS_DETALHADOS:
+            self.erros.append({'linha': linha, 'erros': mensagens})
+        if self.ao_erro:
+            self.ao_erro(linha, mensagens)
+
+    def _normalizar_recursos(self, valores):
+        if isinstance(valores, (str, int)):
+            valores = [valores]
+        normalizados = []
+        for valor in valores or []:
+            valor = str(valor).strip()
+            normalizados.append(self.recursos_por_nome.get(valor.casefold(), valor))
+        return normalizados
+
+    def _validar(self, linha, dados):
+        dados = dict(dados)
+        dados['recursos_disponiveis'] = self._normalizar_recursos(dados.get('recursos_disponiveis'))
+
+        form = VagaImportForm(data=dados, recursos_choices=self.recursos_choices)
+        if not form.is_valid():
+            self._registrar_erro(linha, {campo: list(erros) for campo, erros in form.errors.items()})
+            return None
+
+        vaga = form.save(commit=False)
+        vaga.empresa = self.empresa
+        return vaga, form.cleaned_data['recursos_disponiveis']
+
+    def _gravar_lote(self, lote):
+        Recursos = Vaga.recursos_disponiveis.through
+        try:
+            with transaction.atomic():
+                vagas = Vaga.objects.bulk_create([vaga for _, vaga, _ in lote])
+                AvaliacaoVagaMedica.objects.bulk_create([AvaliacaoVagaMedica(vaga=vaga) for vaga in vagas])
+                Recursos.objects.bulk_create([
+                    Recursos(vaga_id=vaga.pk, recursoacessibilidade_id=recurso_id)
+                    for vaga, (_, _, recursos) in zip(vagas, lote)
+                    for recurso_id in set(recursos)
+                ])
+        except Exception as e:
+            logger.error("Falha ao gravar lote de importação de vagas: %s", e, exc_info=True)
+            for linha, _, _ in lote:
+                self._registrar_erro(linha, {'__all__': [f"Erro ao gravar: {e}"]})
+            return
+        self.criadas += len(lote)
+
+    def importar(self, linhas):
+        lote = []
+        for linha, dados in linhas:
+            if isinstance(dados, Exception):
+                self._registrar_erro(linha, {'__all__': [f"Linha inválida: {dados}"]})
+                continue
+
+            validada = self._validar(linha, dados)
+            if validada is None:
+                continue
+            lote.append((linha, *validada))
+
+            if len(lote) >= self.tamanho_lote:
+                self._gravar_lote(lote)
+                lote = []
+
+        if lote:
+            self._gravar_lote(lote)
+
+        return {
+            'criadas': self.criadas,
+            'total_erros': self.total_erros,
+            'erros': self.erros,
+        }
+
+
+def importar_vagas(empresa_user, arquivo_binario, formato='csv', tamanho_lote=TAMANHO_LOTE, ao_erro=None):
+    importador = ImportadorVagas(empresa_user, tamanho_lote=tamanho_lote, ao_erro=ao_erro)
+    return importador.importar(ler_linhas(arquivo_binario, formato))
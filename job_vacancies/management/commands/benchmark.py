@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from job_vacancies.benchmarks import Benchmarks, DadosInsuficientes, execucao_anterior, registrar, rodar_cenario
+
+
+class Command(BaseCommand):
+    help = "Mede os caminhos quentes do fluxo de contratação e registra os resultados por commit"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tag', default='bench', help="Tag usada em gerar_dados_sinteticos")
+        parser.add_argument('--iteracoes', type=int, default=50)
+        parser.add_argument('--cenario', action='append', dest='cenarios', help="Roda só os cenários indicados")
+        parser.add_argument('--comparar', nargs='?', const='', default=None, metavar='COMMIT',
+                            help="Compara com a última execução do commit (padrão: último commit diferente do atual)")
+        parser.add_argument('--nao-registrar', action='store_true')
+
+    def handle(self, *args, **options):
+        benchmarks = Benchmarks(options['tag'])
+        cenarios = benchmarks.cenarios()
+        if options['cenarios']:
+            cenarios = [cenario for cenario in cenarios if cenario.nome in options['cenarios']]
+            if not cenarios:
+                raise CommandError("Nenhum cenário com esse nome")
+
+        resultados = {}
+        for cenario in cenarios:
+            try:
+                resultado = rodar_cenario(cenario, options['iteracoes'])
+            except DadosInsuficientes as e:
+                raise CommandError(str(e))
+            if resultado is None:
+                self.stdout.write(self.style.WARNING(f"{cenario.nome:<22} sem dados para medir"))
+                continue
+            resultados[cenario.nome] = resultado
+            self.stdout.write(
+                f"{cenario.nome:<22} n={resultado['iteracoes']:<4} média={resultado['media_ms']:>8.2f}ms "
+                f"p50={resultado['p50_ms']:>8.2f}ms p95={resultado['p95_ms']:>8.2f}ms consultas={resultado['consultas']}"
+            )
+
+        if options['comparar'] is not None:
+            self._comparar(resultados, execucao_anterior(options['comparar'] or None))
+
+        if not options['nao_registrar'] and resultados:
+            registro = registrar(resultados)
+            self.stdout.write(self.style.SUCCESS(f"Resultados registrados para o commit {registro['commit'] or '?'}"))
+
+    def _comparar(self, resultados, anterior):
+        if anterior is None:
+            self.stdout.write(self.style.WARNING("Nenhuma execução anterior para comparar"))
+            return
+        self.stdout.write(f"\nComparado com {anterior['commit']} ({anterior['data']}):")
+        for nome, resultado in resultados.items():
+            base = anterior['resultados'].get(nome)
+            if not base:
+                continue
+            variacao = (resultado['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100 if base['p50_ms'] else 0
+            estilo = self.style.ERROR if variacao > 10 else self.style.SUCCESS if variacao < -10 else str
+            self.stdout.write(estilo(
+                f"{nome:<22} p50 {base['p50_ms']:.2f} -> {resultado['p50_ms']:.2f}ms ({variacao:+.1f}%), "
+                f"consultas {base['consultas']} -> {resultado['consultas']}"
+            ))
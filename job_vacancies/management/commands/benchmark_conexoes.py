@@ -0,0 +1,70 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+class Command(BaseCommand):
+    help = "Compara abrir uma conexão por requisição com pegar conexões do pool do psycopg"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=200)
+        parser.add_argument('--aquecimento', type=int, default=5, help="Requisições descartadas antes de medir")
+        parser.add_argument('--database', default='default')
+
+    def _medir(self, settings_dict, alias, requisicoes, aquecimento):
+        """Simula o ciclo de uma requisição: conecta, executa SELECT 1 e fecha."""
+        wrapper = connections[self.alias].__class__(settings_dict, alias)
+        tempos = []
+        try:
+            for i in range(aquecimento + requisicoes):
+                inicio = time.perf_counter()
+                wrapper.ensure_connection()
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                wrapper.close()
+                if i >= aquecimento:
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            wrapper.close()
+            if getattr(wrapper, 'pool', None):
+                wrapper.close_pool()
+        return tempos
+
+    def _relatorio(self, nome, tempos):
+        self.stdout.write(
+            f"{nome:<8} média={statistics.mean(tempos):.3f}ms p50={_percentil(tempos, 50):.3f}ms "
+            f"p95={_percentil(tempos, 95):.3f}ms p99={_percentil(tempos, 99):.3f}ms"
+        )
+
+    def handle(self, *args, **options):
+        self.alias = options['database']
+        if self.alias not in connections:
+            raise CommandError(f"Banco desconhecido: {self.alias}")
+        base = connections[self.alias].settings_dict
+
+        direta = copy.deepcopy(base)
+        direta['OPTIONS'].pop('pool', None)
+        direta['CONN_MAX_AGE'] = 0
+        tempos_direta = self._medir(direta, f'{self.alias}_benchmark_direta', options['requisicoes'], options['aquecimento'])
+        self._relatorio('direta', tempos_direta)
+
+        if connections[self.alias].vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING("Pool de conexões só existe no PostgreSQL (DB_ENGINE=postgres)"))
+            return
+
+        pool = copy.deepcopy(base)
+        pool['OPTIONS'].setdefault('pool', True)
+        pool['CONN_MAX_AGE'] = 0
+        tempos_pool = self._medir(pool, f'{self.alias}_benchmark_pool', options['requisicoes'], options['aquecimento'])
+        self._relatorio('pool', tempos_pool)
+
+        ganho = statistics.mean(tempos_direta) / statistics.mean(tempos_pool)
+        self.stdout.write(self.style.SUCCESS(f"Pool {ganho:.1f}x mais rápido por requisição"))
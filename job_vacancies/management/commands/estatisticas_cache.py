@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from job_vacancies.cache import estatisticas_cache, zerar_estatisticas_cache
+
+
+class Command(BaseCommand):
+    help = "Mostra acertos e falhas do cache da aplicação por namespace"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help="Zera os contadores depois de mostrar")
+
+    def handle(self, *args, **options):
+        estatisticas = estatisticas_cache()
+        if not estatisticas:
+            self.stdout.write("Nenhum acesso ao cache registrado")
+        for namespace, dados in estatisticas.items():
+            taxa = '-' if dados['taxa_acerto'] is None else f"{dados['taxa_acerto']}%"
+            self.stdout.write(f"{namespace:<20} acertos={dados['hit']:<8} falhas={dados['miss']:<8} taxa={taxa}")
+        if options['zerar']:
+            zerar_estatisticas_cache()
+            self.stdout.write(self.style.SUCCESS("Contadores zerados"))
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_vacancies.dados_sinteticos import SENHA_PADRAO, TAMANHO_LOTE, gerar_dados, parse_mix
+
+
+class Command(BaseCommand):
+    help = "Popula o banco com empresas, PCDs, vagas, candidaturas e mensagens sintéticas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tag', default='bench', help="Sufixo dos e-mails gerados (até 6 caracteres)")
+        parser.add_argument('--empresas', type=int, default=2000)
+        parser.add_argument('--pcds', type=int, default=100000)
+        parser.add_argument('--medicos', type=int, default=50)
+        parser.add_argument('--vagas', type=int, default=200000)
+        parser.add_argument('--candidaturas', type=int, default=300000)
+        parser.add_argument('--mensagens', type=int, default=300000)
+        parser.add_argument('--distribuicao', choices=['zipf', 'uniforme'], default='zipf')
+        parser.add_argument('--expoente', type=float, default=1.1, help="Expoente da distribuição de Zipf")
+        parser.add_argument('--dias', type=int, default=180, help="Janela de datas de criação das vagas")
+        parser.add_argument('--status-vagas', help="Mistura de status, ex.: aberta=0.7,aguardando_aprovacao=0.3")
+        parser.add_argument('--status-candidaturas', help="Mistura de status, ex.: pendente=0.5,em_analise=0.5")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+
+    def handle(self, *args, **options):
+        if not 0 < len(options['tag']) <= 6:
+            raise CommandError("--tag deve ter de 1 a 6 caracteres")
+
+        inicio = time.perf_counter()
+
+        def ao_progresso(etapa, quantidade):
+            self.stdout.write(f"[{time.perf_counter() - inicio:7.1f}s] {etapa}: {quantidade}")
+
+        try:
+            gerar_dados(
+                options['tag'],
+                empresas=options['empresas'],
+                pcds=options['pcds'],
+                medicos=options['medicos'],
+                vagas=options['vagas'],
+                candidaturas=options['candidaturas'],
+                mensagens=options['mensagens'],
+                seed=options['seed'],
+                distribuicao=options['distribuicao'],
+                expoente=options['expoente'],
+                dias=options['dias'],
+                status_vagas=parse_mix(options['status_vagas'] or ''),
+                status_candidaturas=parse_mix(options['status_candidaturas'] or ''),
+                tamanho_lote=options['lote'],
+                ao_progresso=ao_progresso,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Dados gerados em {time.perf_counter() - inicio:.1f}s; senha dos usuários: {SENHA_PADRAO}"
+        ))
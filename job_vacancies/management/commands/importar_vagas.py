@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import User
+from job_vacancies.importacao import FORMATOS, TAMANHO_LOTE, detectar_formato, importar_vagas
+
+
+class Command(BaseCommand):
+    help = "Importa vagas em massa de um arquivo CSV ou JSONL para uma empresa"
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--empresa', required=True, help="E-mail do usuário da empresa")
+        parser.add_argument('--formato', choices=FORMATOS, help="Padrão: deduzido pela extensão")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+
+    def handle(self, *args, **options):
+        try:
+            empresa = User.objects.get(email=options['empresa'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário {options['empresa']} não encontrado")
+
+        formato = options['formato'] or detectar_formato(options['arquivo'])
+
+        def ao_erro(linha, erros):
+            detalhes = '; '.join(f"{campo}: {' '.join(msgs)}" for campo, msgs in erros.items())
+            self.stderr.write(f"Linha {linha}: {detalhes}")
+
+        with open(options['arquivo'], 'rb') as arquivo:
+            resultado = importar_vagas(
+                empresa, arquivo, formato=formato, tamanho_lote=options['lote'], ao_erro=ao_erro
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['criadas']} vaga(s) importada(s), {resultado['total_erros']} linha(s) com erro"
+        ))
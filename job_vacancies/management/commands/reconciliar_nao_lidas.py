@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from job_vacancies.models import Conversa
+from job_vacancies.services import reconciliar_contadores_nao_lidas
+
+
+class Command(BaseCommand):
+    help = "Recalcula os contadores de mensagens não lidas das conversas que divergirem da tabela de mensagens"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Conversas verificadas por lote")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        corrigidas = 0
+        ultimo_id = 0
+
+        while True:
+            ids = list(
+                Conversa.objects.filter(pk__gt=ultimo_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            corrigidas += reconciliar_contadores_nao_lidas(Conversa.objects.filter(pk__in=ids))
+            ultimo_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"{corrigidas} conversa(s) corrigida(s)"))
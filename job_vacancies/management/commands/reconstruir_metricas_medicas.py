@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from job_vacancies.metricas_medicas import reconstruir_metricas_medicas
+
+
+class Command(BaseCommand):
+    help = "Recalcula os resumos diários de avaliações médicas e o contador de vagas na fila"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medico', type=int, action='append', dest='medicos', help="Restringe a um ou mais médicos")
+
+    def handle(self, *args, **options):
+        reconstruir_metricas_medicas(options['medicos'])
+        self.stdout.write(self.style.SUCCESS("Métricas médicas reconstruídas"))
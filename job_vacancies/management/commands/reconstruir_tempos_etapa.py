@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from job_vacancies.historico import reconstruir_tempos_etapa
+
+
+class Command(BaseCommand):
+    help = "Recalcula os agregados de tempo por etapa a partir do histórico de candidaturas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vaga', type=int, action='append', dest='vagas', help="Restringe a uma ou mais vagas")
+
+    def handle(self, *args, **options):
+        reconstruir_tempos_etapa(options['vagas'])
+        self.stdout.write(self.style.SUCCESS("Agregados de tempo por etapa reconstruídos"))
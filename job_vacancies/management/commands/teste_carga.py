@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from job_vacancies.benchmarks import DadosInsuficientes
+from job_vacancies.carga import MIX_PADRAO, teste_carga
+from job_vacancies.dados_sinteticos import parse_mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga em processo: usuários virtuais percorrem as rotas reais via src/wsgi.py "
+        "e/ou src/asgi.py. Grava candidaturas e avaliações no banco; use sobre dados sintéticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tag', default='bench', help="Tag usada em gerar_dados_sinteticos")
+        parser.add_argument('--servidor', choices=['wsgi', 'asgi', 'ambos'], default='ambos')
+        parser.add_argument('--concorrencia', type=int, default=10, help="Usuários virtuais simultâneos")
+        parser.add_argument('--duracao', type=float, default=30, help="Segundos por servidor")
+        parser.add_argument('--mix', default=MIX_PADRAO, help="Proporção de papéis, ex.: pcd=0.7,medico=0.3")
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'QUERY_ORCAMENTO_MODO', 'desligado') == 'desligado':
+            self.stdout.write(self.style.WARNING(
+                "QUERY_ORCAMENTO_MODO=desligado: sem cabeçalho X-Consultas, as consultas não serão contadas"
+            ))
+
+        servidores = ['wsgi', 'asgi'] if options['servidor'] == 'ambos' else [options['servidor']]
+        for servidor in servidores:
+            try:
+                resultado = teste_carga(
+                    options['tag'], servidor, options['concorrencia'], options['duracao'],
+                    parse_mix(options['mix']), options['seed'],
+                )
+            except (DadosInsuficientes, ValueError) as e:
+                raise CommandError(str(e))
+            self._imprimir(resultado)
+
+    def _imprimir(self, resultado):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{resultado['servidor'].upper()}: {resultado['concorrencia']} usuários, "
+            f"{resultado['requisicoes']} requisições em {resultado['duracao_s']}s "
+            f"({resultado['por_segundo']} req/s)"
+        ))
+        self.stdout.write(
+            f"{'endpoint':<22}{'n':>7}{'erros':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'consultas':>11}"
+        )
+        for endpoint, linha in resultado['endpoints'].items():
+            consultas = '-' if linha['consultas'] is None else linha['consultas']
+            texto = (
+                f"{endpoint:<22}{linha['requisicoes']:>7}{linha['erros']:>7}{linha['p50_ms']:>10}"
+                f"{linha['p95_ms']:>10}{linha['p99_ms']:>10}{linha['por_segundo']:>9}{consultas:>11}"
+            )
+            self.stdout.write(self.style.ERROR(texto) if linha['erros'] else texto)
+        for falha in resultado['falhas']:
+            self.stdout.write(self.style.WARNING(f"Jornada interrompida ({falha})"))
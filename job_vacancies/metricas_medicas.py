@@ -0,0 +1,104 @@
+"""
+Métricas do painel médico a partir de resumos mantidos incrementalmente.
+
+Cada avaliação soma uma linha em AvaliacaoMedicaDiaria (médico, dia) e cada
+mudança de status de vaga ajusta o contador de vagas na fila, então o painel
+lê no máximo ~30 linhas pequenas em vez de agregar AvaliacaoVagaMedica.
+reconstruir_metricas_medicas() recalcula tudo a partir das tabelas de origem.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AvaliacaoMedicaDiaria, AvaliacaoVagaMedica, Contador, Vaga
+
+FILA_APROVACAO = 'vagas_aguardando_aprovacao'
+
+_CAMPO_POR_STATUS = {
+    'aprovada': 'aprovadas',
+    'rejeitada': 'rejeitadas',
+    'ajustes_necessarios': 'ajustes',
+}
+
+
+def incrementar_contador(nome, delta=1):
+    if not Contador.objects.filter(nome=nome).update(valor=F('valor') + delta):
+        Contador.objects.bulk_create([Contador(nome=nome)], ignore_conflicts=True)
+        Contador.objects.filter(nome=nome).update(valor=F('valor') + delta)
+
+
+def ler_contador(nome):
+    return Contador.objects.filter(nome=nome).values_list('valor', flat=True).first() or 0
+
+
+def vagas_pendentes():
+    return ler_contador(FILA_APROVACAO)
+
+
+def registrar_avaliacao(avaliacao, vaga):
+    dia = timezone.localdate(avaliacao.avaliado_em)
+    incrementos = {
+        'total': F('total') + 1,
+        'tempo_total': F('tempo_total') + (avaliacao.avaliado_em - vaga.criado_em),
+    }
+    campo = _CAMPO_POR_STATUS.get(avaliacao.status)
+    if campo:
+        incrementos[campo] = F(campo) + 1
+
+    AvaliacaoMedicaDiaria.objects.bulk_create(
+        [AvaliacaoMedicaDiaria(medico_id=avaliacao.medico_id, dia=dia)], ignore_conflicts=True
+    )
+    AvaliacaoMedicaDiaria.objects.filter(medico_id=avaliacao.medico_id, dia=dia).update(**incrementos)
+
+
+def metricas_do_medico(medico_user, dias=30):
+    inicio = timezone.localdate() - timedelta(days=dias)
+    resumo = AvaliacaoMedicaDiaria.objects.filter(medico=medico_user, dia__gte=inicio).aggregate(
+        total=Sum('total'),
+        aprovadas=Sum('aprovadas'),
+        rejeitadas=Sum('rejeitadas'),
+        ajustes=Sum('ajustes'),
+        tempo_total=Sum('tempo_total'),
+    )
+    total = resumo['total'] or 0
+    return {
+        'total': total,
+        'aprovadas': resumo['aprovadas'] or 0,
+        'rejeitadas': resumo['rejeitadas'] or 0,
+        'ajustes': resumo['ajustes'] or 0,
+        'taxa_aprovacao': round((resumo['aprovadas'] or 0) / max(total, 1) * 100, 1),
+        'tempo_medio': resumo['tempo_total'] / total if total else None,
+    }
+
+
+def reconstruir_metricas_medicas(medico_ids=None):
+    avaliacoes = AvaliacaoVagaMedica.objects.filter(medico__isnull=False, avaliado_em__isnull=False)
+    resumos = AvaliacaoMedicaDiaria.objects.all()
+    if medico_ids is not None:
+        avaliacoes = avaliacoes.filter(medico_id__in=medico_ids)
+        resumos = resumos.filter(medico_id__in=medico_ids)
+
+    linhas = (
+        avaliacoes
+        .annotate(dia=TruncDate('avaliado_em', tzinfo=timezone.get_current_timezone()))
+        .values('medico_id', 'dia')
+        .annotate(
+            total=Count('id'),
+            aprovadas=Count('id', filter=Q(status='aprovada')),
+            rejeitadas=Count('id', filter=Q(status='rejeitada')),
+            ajustes=Count('id', filter=Q(status='ajustes_necessarios')),
+            tempo_total=Sum(ExpressionWrapper(F('avaliado_em') - F('vaga__criado_em'), output_field=DurationField())),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        resumos.delete()
+        AvaliacaoMedicaDiaria.objects.bulk_create(
+            [AvaliacaoMedicaDiaria(**linha) for linha in linhas.iterator()],
+            batch_size=1000,
+        )
+        pendentes = Vaga.objects.filter(status='aguardando_aprovacao').count()
+        Contador.objects.update_or_create(nome=FILA_APROVACAO, defaults={'valor': pendentes})
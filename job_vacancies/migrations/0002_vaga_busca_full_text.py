@@ -0,0 +1,120 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+POSTGRES_FORWARD = """
+CREATE OR REPLACE FUNCTION job_vacancies_vaga_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('portuguese', unaccent(coalesce(NEW.titulo, ''))), 'A') ||
+        setweight(to_tsvector('portuguese', unaccent(coalesce(NEW.descricao, ''))), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER job_vacancies_vaga_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF titulo, descricao ON job_vacancies_vaga
+    FOR EACH ROW EXECUTE FUNCTION job_vacancies_vaga_search_vector_update();
+
+UPDATE job_vacancies_vaga SET search_vector =
+    setweight(to_tsvector('portuguese', unaccent(coalesce(titulo, ''))), 'A') ||
+    setweight(to_tsvector('portuguese', unaccent(coalesce(descricao, ''))), 'B');
+"""
+
+POSTGRES_REVERSE = """
+DROP TRIGGER IF EXISTS job_vacancies_vaga_search_vector_trigger ON job_vacancies_vaga;
+DROP FUNCTION IF EXISTS job_vacancies_vaga_search_vector_update();
+"""
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS job_vacancies_vaga_fts USING fts5(
+        titulo, descricao,
+        content='job_vacancies_vaga', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_vacancies_vaga_fts_ai AFTER INSERT ON job_vacancies_vaga BEGIN
+        INSERT INTO job_vacancies_vaga_fts(rowid, titulo, descricao)
+        VALUES (new.id, new.titulo, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_vacancies_vaga_fts_ad AFTER DELETE ON job_vacancies_vaga BEGIN
+        INSERT INTO job_vacancies_vaga_fts(job_vacancies_vaga_fts, rowid, titulo, descricao)
+        VALUES ('delete', old.id, old.titulo, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_vacancies_vaga_fts_au
+    AFTER UPDATE OF titulo, descricao ON job_vacancies_vaga BEGIN
+        INSERT INTO job_vacancies_vaga_fts(job_vacancies_vaga_fts, rowid, titulo, descricao)
+        VALUES ('delete', old.id, old.titulo, old.descricao);
+        INSERT INTO job_vacancies_vaga_fts(rowid, titulo, descricao)
+        VALUES (new.id, new.titulo, new.descricao);
+    END
+    """,
+    "INSERT INTO job_vacancies_vaga_fts(job_vacancies_vaga_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS job_vacancies_vaga_fts_ai",
+    "DROP TRIGGER IF EXISTS job_vacancies_vaga_fts_ad",
+    "DROP TRIGGER IF EXISTS job_vacancies_vaga_fts_au",
+    "DROP TABLE IF EXISTS job_vacancies_vaga_fts",
+]
+
+
+def _executar(schema_editor, statements):
+    if isinstance(statements, str):
+        statements = [statements]
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def criar_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_FORWARD)
+
+
+def remover_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RemoveIndex(
+            model_name='vaga',
+            name='job_vacanci_titulo_874ae9_gin',
+        ),
+        migrations.AddField(
+            model_name='vaga',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vaga_search_vector_gin'),
+        ),
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_elegibilidade(apps, schema_editor):
+    AvaliacaoVagaMedica = apps.get_model('job_vacancies', 'AvaliacaoVagaMedica')
+    VagaElegibilidade = apps.get_model('job_vacancies', 'VagaElegibilidade')
+    Elegiveis = AvaliacaoVagaMedica.deficiencias_elegiveis.through
+
+    # Como em aprovar_vaga_medico: valem as categorias da última avaliação
+    # concluída da vaga, se ela aprovou, qualquer que seja o status da vaga
+    ultima_por_vaga = {}
+    avaliadas = (
+        AvaliacaoVagaMedica.objects
+        .filter(avaliado_em__isnull=False)
+        .order_by('vaga_id', 'avaliado_em', 'id')
+        .values_list('vaga_id', 'id', 'status')
+    )
+    for vaga_id, avaliacao_id, status in avaliadas.iterator():
+        ultima_por_vaga[vaga_id] = avaliacao_id if status == 'aprovada' else None
+
+    avaliacao_para_vaga = {a: v for v, a in ultima_por_vaga.items() if a is not None}
+    linhas = (
+        Elegiveis.objects
+        .filter(avaliacaovagamedica_id__in=list(avaliacao_para_vaga))
+        .values_list('avaliacaovagamedica_id', 'categoriadeficiencia_id')
+    )
+    VagaElegibilidade.objects.bulk_create(
+        [
+            VagaElegibilidade(vaga_id=avaliacao_para_vaga[avaliacao_id], categoria_id=categoria_id)
+            for avaliacao_id, categoria_id in linhas.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_perfilpcd_deficiencias'),
+        ('job_vacancies', '0002_vaga_busca_full_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VagaElegibilidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vagas_elegiveis', to='account.categoriadeficiencia')),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elegibilidades', to='job_vacancies.vaga')),
+            ],
+            options={
+                'verbose_name': 'Elegibilidade da Vaga',
+                'verbose_name_plural': 'Elegibilidades das Vagas',
+                'indexes': [models.Index(fields=['categoria', 'vaga'], name='job_vacanci_categor_3481d2_idx')],
+                'unique_together': {('vaga', 'categoria')},
+            },
+        ),
+        migrations.RunPython(preencher_elegibilidade, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:31
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    Conversa = apps.get_model('job_vacancies', 'Conversa')
+    Mensagem = apps.get_model('job_vacancies', 'Mensagem')
+
+    def nao_lidas(lado):
+        total = (
+            Mensagem.objects
+            .filter(conversa=OuterRef('pk'), **{f'lida_por_{lado}': False})
+            .values('conversa')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+    Conversa.objects.update(nao_lidas_empresa=nao_lidas('empresa'), nao_lidas_pcd=nao_lidas('pcd'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0003_vagaelegibilidade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversa',
+            name='nao_lidas_empresa',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conversa',
+            name='nao_lidas_pcd',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0004_conversa_contadores_nao_lidas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidatura',
+            index=models.Index(fields=['vaga', '-criado_em', '-id'], name='candidatura_vaga_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(fields=['empresa', '-criado_em', '-id'], name='vaga_empresa_criado_idx'),
+        ),
+    ]
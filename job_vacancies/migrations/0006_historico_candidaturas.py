@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:36
+
+import datetime
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def preencher_status_desde(apps, schema_editor):
+    # Sem histórico anterior, a última alteração é a melhor estimativa
+    Candidatura = apps.get_model('job_vacancies', 'Candidatura')
+    Candidatura.objects.update(status_desde=F('atualizado_em'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0005_indices_paginacao_keyset'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatura',
+            name='status_desde',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='CandidaturaEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_anterior', models.CharField(blank=True, max_length=30)),
+                ('status_novo', models.CharField(max_length=30)),
+                ('duracao_anterior', models.DurationField(blank=True, null=True)),
+                ('ocorrido_em', models.DateTimeField()),
+                ('candidatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='job_vacancies.candidatura')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_candidaturas', to=settings.AUTH_USER_MODEL)),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_candidaturas', to='job_vacancies.vaga')),
+            ],
+            options={
+                'verbose_name': 'Evento de Candidatura',
+                'verbose_name_plural': 'Eventos de Candidaturas',
+                'ordering': ['ocorrido_em'],
+                'indexes': [models.Index(fields=['vaga', 'ocorrido_em'], name='job_vacanci_vaga_id_1b6992_idx'), models.Index(fields=['empresa', 'ocorrido_em'], name='job_vacanci_empresa_70f176_idx'), models.Index(fields=['candidatura', 'ocorrido_em'], name='job_vacanci_candida_8a119d_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TempoEtapa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('visualizado', 'Visualizado'), ('em_analise', 'Em Análise'), ('pre_selecionado', 'Pré-selecionado'), ('entrevista_agendada', 'Entrevista Agendada'), ('aprovado', 'Aprovado'), ('reprovado', 'Reprovado'), ('desistente', 'Desistente')], max_length=30)),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+                ('total', models.DurationField(default=datetime.timedelta(0))),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tempos_etapa', to=settings.AUTH_USER_MODEL)),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tempos_etapa', to='job_vacancies.vaga')),
+            ],
+            options={
+                'verbose_name': 'Tempo por Etapa',
+                'verbose_name_plural': 'Tempos por Etapa',
+                'indexes': [models.Index(fields=['empresa', 'status'], name='job_vacanci_empresa_9b138a_idx')],
+                'unique_together': {('vaga', 'status')},
+            },
+        ),
+        migrations.RunPython(preencher_status_desde, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0006_historico_candidaturas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vaga',
+            name='revisao_expira_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='vaga',
+            name='revisao_medico',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vagas_em_revisao', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(condition=models.Q(('status', 'aguardando_aprovacao')), fields=['criado_em', 'id'], name='vaga_fila_aprovacao_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:40
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def preencher_metricas(apps, schema_editor):
+    AvaliacaoVagaMedica = apps.get_model('job_vacancies', 'AvaliacaoVagaMedica')
+    AvaliacaoMedicaDiaria = apps.get_model('job_vacancies', 'AvaliacaoMedicaDiaria')
+    Contador = apps.get_model('job_vacancies', 'Contador')
+    Vaga = apps.get_model('job_vacancies', 'Vaga')
+
+    linhas = (
+        AvaliacaoVagaMedica.objects
+        .filter(medico__isnull=False, avaliado_em__isnull=False)
+        .annotate(dia=TruncDate('avaliado_em', tzinfo=timezone.get_current_timezone()))
+        .values('medico_id', 'dia')
+        .annotate(
+            total=Count('id'),
+            aprovadas=Count('id', filter=Q(status='aprovada')),
+            rejeitadas=Count('id', filter=Q(status='rejeitada')),
+            ajustes=Count('id', filter=Q(status='ajustes_necessarios')),
+            tempo_total=Sum(ExpressionWrapper(F('avaliado_em') - F('vaga__criado_em'), output_field=DurationField())),
+        )
+        .order_by()
+    )
+    AvaliacaoMedicaDiaria.objects.bulk_create([AvaliacaoMedicaDiaria(**linha) for linha in linhas], batch_size=1000)
+    Contador.objects.create(
+        nome='vagas_aguardando_aprovacao',
+        valor=Vaga.objects.filter(status='aguardando_aprovacao').count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0007_fila_aprovacao_reserva'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contador',
+            fields=[
+                ('nome', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AvaliacaoMedicaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('aprovadas', models.PositiveIntegerField(default=0)),
+                ('rejeitadas', models.PositiveIntegerField(default=0)),
+                ('ajustes', models.PositiveIntegerField(default=0)),
+                ('tempo_total', models.DurationField(default=datetime.timedelta(0))),
+                ('medico', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avaliacoes_diarias', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resumo Diário de Avaliações',
+                'verbose_name_plural': 'Resumos Diários de Avaliações',
+                'unique_together': {('medico', 'dia')},
+            },
+        ),
+        migrations.RunPython(preencher_metricas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0008_metricas_medicas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidatura',
+            name='pcd',
+            field=models.ForeignKey(limit_choices_to={'perfil_pcd__isnull': False}, on_delete=django.db.models.deletion.CASCADE, related_name='candidaturas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='vaga',
+            name='empresa',
+            field=models.ForeignKey(limit_choices_to={'perfil_empresa__isnull': False}, on_delete=django.db.models.deletion.CASCADE, related_name='vagas', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from importlib import import_module
+
+from django.db import migrations
+
+
+def preencher_elegibilidade(apps, schema_editor):
+    # A 0003 só preenchia vagas aprovadas ou abertas; bancos que já a rodaram
+    # ficaram sem as linhas das vagas pausadas. ignore_conflicts mantém as demais
+    import_module('job_vacancies.migrations.0003_vagaelegibilidade').preencher_elegibilidade(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_vacancies', '0009_limit_choices_por_perfil'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_elegibilidade, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DEFERRED, Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
+from datetime import timedelta
 from account.models import User, CategoriaDeficiencia
+from .signals import vaga_status_alterado
 
 
 class RecursoAcessibilidade(models.Model):
@@ -36,7 +40,7 @@ class Vaga(models.Model):
     ]
 
     empresa = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='vagas', limit_choices_to={'tipo': 'empresa'}
+        User, on_delete=models.CASCADE, related_name='vagas', limit_choices_to={'perfil_empresa__isnull': False}
     )
     titulo = models.CharField("Título da Vaga", max_length=200)
     descricao = models.TextField()
@@ -50,6 +54,13 @@ class Vaga(models.Model):
 
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='rascunho', db_index=True)
     visualizacoes = models.PositiveIntegerField(default=0, editable=False)
+    # Reserva na fila de aprovação médica (job_vacancies/fila_aprovacao.py)
+    revisao_medico = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='vagas_em_revisao'
+    )
+    revisao_expira_em = models.DateTimeField(null=True, blank=True, editable=False)
+    # Mantido por trigger no banco (Postgres); no SQLite a busca usa a tabela FTS5
+    search_vector = SearchVectorField(null=True, editable=False)
 
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
@@ -62,12 +73,31 @@ class Vaga(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['empresa', 'status']),
-            GinIndex(fields=['titulo', 'descricao']),  # para busca full-text futura
+            models.Index(fields=['empresa', '-criado_em', '-id'], name='vaga_empresa_criado_idx'),
+            models.Index(
+                fields=['criado_em', 'id'], condition=Q(status='aguardando_aprovacao'), name='vaga_fila_aprovacao_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='vaga_search_vector_gin'),
         ]
 
     def __str__(self):
         return f"[{self.get_status_display()}] {self.titulo} - {self.empresa}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._status_anterior = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        status_anterior = getattr(self, '_status_anterior', None)
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if status_anterior != self.status and (update_fields is None or 'status' in update_fields):
+            self._status_anterior = self.status
+            vaga_status_alterado.send(sender=Vaga, vaga=self, status_anterior=status_anterior)
+
     def pode_ser_editada(self):
         return self.status in ['rascunho', 'rejeitada', 'pausada']
 
@@ -103,6 +133,53 @@ class AvaliacaoVagaMedica(models.Model):
         return f"Avaliação de {self.vaga} por {self.medico}"
 
 
+class AvaliacaoMedicaDiaria(models.Model):
+    """Resumo por médico e dia, atualizado na mesma transação de aprovar_vaga_medico."""
+    medico = models.ForeignKey(User, on_delete=models.CASCADE, related_name='avaliacoes_diarias')
+    dia = models.DateField()
+    total = models.PositiveIntegerField(default=0)
+    aprovadas = models.PositiveIntegerField(default=0)
+    rejeitadas = models.PositiveIntegerField(default=0)
+    ajustes = models.PositiveIntegerField(default=0)
+    # Soma de (avaliado_em - vaga.criado_em) das avaliações do dia
+    tempo_total = models.DurationField(default=timedelta(0))
+
+    class Meta:
+        verbose_name = "Resumo Diário de Avaliações"
+        verbose_name_plural = "Resumos Diários de Avaliações"
+        unique_together = ('medico', 'dia')
+
+
+class Contador(models.Model):
+    """Contadores globais mantidos incrementalmente, para não contar tabelas a cada página."""
+    nome = models.CharField(max_length=50, primary_key=True)
+    valor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nome}: {self.valor}"
+
+
+class VagaElegibilidade(models.Model):
+    """
+    Projeção das deficiências elegíveis da última avaliação médica aprovada.
+    Reconstruída em aprovar_vaga_medico; sobrevive a pausas e reaberturas da
+    vaga, então quem consulta filtra por vaga.status.
+    """
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='elegibilidades')
+    categoria = models.ForeignKey(CategoriaDeficiencia, on_delete=models.CASCADE, related_name='vagas_elegiveis')
+
+    class Meta:
+        verbose_name = "Elegibilidade da Vaga"
+        verbose_name_plural = "Elegibilidades das Vagas"
+        unique_together = ('vaga', 'categoria')
+        indexes = [
+            models.Index(fields=['categoria', 'vaga']),
+        ]
+
+    def __str__(self):
+        return f"{self.vaga_id} ↔ {self.categoria_id}"
+
+
 class Candidatura(models.Model):
     STATUS_CHOICES = [
         ('pendente', 'Pendente'),
@@ -115,9 +192,22 @@ class Candidatura(models.Model):
         ('desistente', 'Desistente'),
     ]
 
+    # status atual -> status para os quais a empresa pode mover a candidatura
+    TRANSICOES_EMPRESA = {
+        'pendente': ['visualizado', 'em_analise', 'pre_selecionado', 'reprovado'],
+        'visualizado': ['em_analise', 'pre_selecionado', 'reprovado'],
+        'em_analise': ['pre_selecionado', 'reprovado'],
+        'pre_selecionado': ['em_analise', 'entrevista_agendada', 'reprovado'],
+        'entrevista_agendada': ['aprovado', 'reprovado'],
+        'aprovado': [],
+        'reprovado': [],
+        'desistente': [],
+    }
+
     vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='candidaturas')
-    pcd = models.ForeignKey(User, on_delete=models.CASCADE, related_name='candidaturas', limit_choices_to={'tipo': 'pcd'})
+    pcd = models.ForeignKey(User, on_delete=models.CASCADE, related_name='candidaturas', limit_choices_to={'perfil_pcd__isnull': False})
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pendente', db_index=True)
+    status_desde = models.DateTimeField(default=timezone.now, editable=False)
     mensagem_candidato = models.TextField(blank=True)
     avaliacao_empresa = models.PositiveSmallIntegerField(null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(5)])
     observacoes_empresa = models.TextField(blank=True)
@@ -130,20 +220,124 @@ class Candidatura(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['vaga', 'status']),
+            models.Index(fields=['vaga', '-criado_em', '-id'], name='candidatura_vaga_criado_idx'),
         ]
 
     def __str__(self):
         return f"{self.pcd} → {self.vaga.titulo}"
 
+    @classmethod
+    def status_de_origem(cls, novo_status):
+        return [origem for origem, destinos in cls.TRANSICOES_EMPRESA.items() if novo_status in destinos]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # DEFERRED quando a consulta usou .only()/.defer() sem o status
+        instance._status_anterior = instance.__dict__.get('status', DEFERRED)
+        instance._status_desde_anterior = instance.__dict__.get('status_desde', DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .historico import registrar_transicoes
+
+        nova = self._state.adding
+        status_anterior = getattr(self, '_status_anterior', None)
+        entrou_em = getattr(self, '_status_desde_anterior', None)
+        update_fields = kwargs.get('update_fields')
+        # Com update_fields sem 'status', ou com o status ainda adiado, a coluna
+        # não é gravada: não há transição
+        grava_status = (update_fields is None or 'status' in update_fields) and \
+            'status' not in self.get_deferred_fields()
+        if not nova and not grava_status:
+            return super().save(*args, **kwargs)
+        if not nova and status_anterior is DEFERRED:
+            # Carregado ou atribuído depois da consulta: o anterior vem do banco
+            status_anterior, entrou_em = (
+                Candidatura.objects.filter(pk=self.pk).values_list('status', 'status_desde').get()
+            )
+        if not nova and status_anterior == self.status:
+            return super().save(*args, **kwargs)
+
+        agora = timezone.now()
+        self.status_desde = agora
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'status_desde'}
+
+        if Candidatura.vaga.is_cached(self):
+            empresa_id = self.vaga.empresa_id
+        else:
+            empresa_id = Vaga.objects.filter(pk=self.vaga_id).values_list('empresa_id', flat=True).get()
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            registrar_transicoes(
+                [(self.pk, None if nova else status_anterior, entrou_em)],
+                self.status, self.vaga_id, empresa_id, agora,
+            )
+        self._status_anterior = self.status
+        self._status_desde_anterior = agora
+
+
+class CandidaturaEvento(models.Model):
+    """Histórico append-only das mudanças de status de candidaturas."""
+    candidatura = models.ForeignKey(Candidatura, on_delete=models.CASCADE, related_name='eventos')
+    # Desnormalizados para varreduras por vaga/empresa sem join
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='eventos_candidaturas')
+    empresa = models.ForeignKey(User, on_delete=models.CASCADE, related_name='eventos_candidaturas')
+    status_anterior = models.CharField(max_length=30, blank=True)
+    status_novo = models.CharField(max_length=30)
+    # Tempo que a candidatura passou em status_anterior
+    duracao_anterior = models.DurationField(null=True, blank=True)
+    ocorrido_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Evento de Candidatura"
+        verbose_name_plural = "Eventos de Candidaturas"
+        ordering = ['ocorrido_em']
+        indexes = [
+            models.Index(fields=['vaga', 'ocorrido_em']),
+            models.Index(fields=['empresa', 'ocorrido_em']),
+            models.Index(fields=['candidatura', 'ocorrido_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.candidatura_id}: {self.status_anterior or '∅'} → {self.status_novo}"
+
+
+class TempoEtapa(models.Model):
+    """Agregado incremental do tempo gasto em cada status, por vaga."""
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='tempos_etapa')
+    empresa = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tempos_etapa')
+    status = models.CharField(max_length=30, choices=Candidatura.STATUS_CHOICES)
+    quantidade = models.PositiveIntegerField(default=0)
+    total = models.DurationField(default=timedelta(0))
+
+    class Meta:
+        verbose_name = "Tempo por Etapa"
+        verbose_name_plural = "Tempos por Etapa"
+        unique_together = ('vaga', 'status')
+        indexes = [
+            models.Index(fields=['empresa', 'status']),
+        ]
+
+    @property
+    def media(self):
+        return self.total / self.quantidade if self.quantidade else None
+
 
 class Conversa(models.Model):
     candidatura = models.OneToOneField(Candidatura, on_delete=models.CASCADE, related_name='conversa')
+    # Espelham COUNT(*) de mensagens com lida_por_<lado>=False; mantidos em
+    # Mensagem.save() e marcar_conversa_lida(), reparados por reconciliar_nao_lidas
+    nao_lidas_empresa = models.PositiveIntegerField(default=0, editable=False)
+    nao_lidas_pcd = models.PositiveIntegerField(default=0, editable=False)
 
     def mensagens_nao_lidas_empresa(self):
-        return self.mensagens.filter(lida_por_empresa=False).count()
+        return self.nao_lidas_empresa
 
     def mensagens_nao_lidas_pcd(self):
-        return self.mensagens.filter(lida_por_pcd=False).count()
+        return self.nao_lidas_pcd
 
 
 class Mensagem(models.Model):
@@ -161,4 +355,19 @@ class Mensagem(models.Model):
     lida_por_pcd = models.BooleanField(default=False)
 
     class Meta:
-        ordering = ['enviado_em']
\ No newline at end of file
+        ordering = ['enviado_em']
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+
+        incrementos = {}
+        if not self.lida_por_empresa:
+            incrementos['nao_lidas_empresa'] = models.F('nao_lidas_empresa') + 1
+        if not self.lida_por_pcd:
+            incrementos['nao_lidas_pcd'] = models.F('nao_lidas_pcd') + 1
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if incrementos:
+                Conversa.objects.filter(pk=self.conversa_id).update(**incrementos)
\ No newline at end of file
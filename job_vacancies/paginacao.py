@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+TAMANHO_PAGINA = 20
+
+
+def encode_cursor(*valores):
+    raw = json.dumps(valores).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        return None
+    return valores if isinstance(valores, list) else None
+
+
+def paginar_por_criacao(queryset, cursor=None, limite=TAMANHO_PAGINA):
+    """
+    Paginação keyset em (-criado_em, -id): a página N custa o mesmo que a
+    primeira, desde que exista índice terminando em (criado_em, id).
+    Retorna (itens, proximo_cursor).
+    """
+    queryset = queryset.order_by('-criado_em', '-pk')
+
+    posicao = decode_cursor(cursor)
+    if posicao and len(posicao) == 2:
+        try:
+            criado_em, pk = datetime.fromisoformat(posicao[0]), int(posicao[1])
+        except (TypeError, ValueError):
+            pass
+        else:
+            queryset = queryset.filter(Q(criado_em__lt=criado_em) | Q(criado_em=criado_em, pk__lt=pk))
+
+    itens = list(queryset[:limite + 1])
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        ultimo = itens[-1]
+        proximo_cursor = encode_cursor(ultimo.criado_em.isoformat(), ultimo.pk)
+    return itens, proximo_cursor
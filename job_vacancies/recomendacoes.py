@@ -0,0 +1,109 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from account.models import PerfilPCD
+from .models import Vaga
+from .services import vagas_compativeis
+
+PESO_MODALIDADE = 40.0
+PESO_LOCALIZACAO = 25.0
+PESO_RECURSOS = 35.0
+
+LIMITE_PADRAO = 10
+TIMEOUT = 60 * 15
+
+VERSAO_KEY = 'recomendacoes:versao'
+
+_MODALIDADES = dict(Vaga._meta.get_field('modalidade').choices)
+
+
+def _versao_global():
+    cache.add(VERSAO_KEY, time.time_ns(), None)
+    return cache.get(VERSAO_KEY)
+
+
+def _cache_key(user_id, versao):
+    return f'recomendacoes:pcd:{user_id}:{versao}'
+
+
+def invalidar_recomendacoes(user_id):
+    cache.delete(_cache_key(user_id, _versao_global()))
+
+
+def invalidar_todas_recomendacoes():
+    # Trocar a versão torna todas as chaves por usuário inalcançáveis de uma vez
+    cache.set(VERSAO_KEY, time.time_ns(), None)
+
+
+def _pontuacao(perfil, recursos_ids):
+    """
+    Expressão SQL com a pontuação de cada vaga para o perfil, avaliada
+    pelo banco sobre todo o conjunto de vagas compatíveis numa única query.
+    """
+    zero = Value(0.0)
+    modalidade = zero
+    if perfil.modalidade_preferida:
+        modalidade = Case(
+            When(modalidade=perfil.modalidade_preferida, then=Value(PESO_MODALIDADE)),
+            default=zero,
+        )
+
+    localizacao = zero
+    if perfil.localizacao:
+        localizacao = Case(
+            When(Q(modalidade='remoto') | Q(localizacao__iexact=perfil.localizacao), then=Value(PESO_LOCALIZACAO)),
+            default=zero,
+        )
+
+    recursos = zero
+    if recursos_ids:
+        Recursos = Vaga.recursos_disponiveis.through
+        cobertos = (
+            Recursos.objects
+            .filter(vaga_id=OuterRef('pk'), recursoacessibilidade_id__in=recursos_ids)
+            .values('vaga_id')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        recursos = Coalesce(Subquery(cobertos), 0) * Value(PESO_RECURSOS / len(recursos_ids))
+
+    return modalidade + localizacao + recursos
+
+
+def calcular_recomendacoes(pcd_user, limite=LIMITE_PADRAO):
+    try:
+        perfil = pcd_user.perfil_pcd
+    except PerfilPCD.DoesNotExist:
+        return []
+
+    recursos_ids = list(perfil.recursos_necessarios.values_list('id', flat=True))
+    vagas = (
+        vagas_compativeis(pcd_user)
+        .annotate(pontuacao=_pontuacao(perfil, recursos_ids))
+        .order_by(F('pontuacao').desc(), F('publicado_em').desc(nulls_last=True), '-pk')
+        .values('pk', 'titulo', 'modalidade', 'localizacao', 'empresa__nome_completo', 'pontuacao')
+    )[:limite]
+
+    return [
+        {
+            'pk': vaga['pk'],
+            'titulo': vaga['titulo'],
+            'modalidade': _MODALIDADES.get(vaga['modalidade'], vaga['modalidade']),
+            'localizacao': vaga['localizacao'],
+            'empresa': vaga['empresa__nome_completo'],
+            'pontuacao': round(float(vaga['pontuacao']), 1),
+        }
+        for vaga in vagas
+    ]
+
+
+def recomendar_vagas(pcd_user):
+    key = _cache_key(pcd_user.pk, _versao_global())
+    recomendacoes = cache.get(key)
+    if recomendacoes is None:
+        recomendacoes = calcular_recomendacoes(pcd_user)
+        cache.set(key, recomendacoes, TIMEOUT)
+    return recomendacoes
@@ -0,0 +1,115 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import CharField, F, Func, Q, Value
+
+from .models import Vaga
+from .paginacao import TAMANHO_PAGINA, decode_cursor, encode_cursor
+
+FTS_TABLE = 'job_vacancies_vaga_fts'
+
+# Pesos do bm25 por coluna da tabela FTS5 (titulo, descricao)
+PESO_TITULO = 10.0
+PESO_DESCRICAO = 1.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _posicao(cursor):
+    valores = decode_cursor(cursor)
+    try:
+        rank, pk = valores
+        return float(rank), int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def buscar_vagas(termo, cursor=None, limite=TAMANHO_PAGINA):
+    """
+    Busca vagas abertas por relevância, paginando por (rank, id).
+
+    Retorna (vagas, proximo_cursor); proximo_cursor é None na última página.
+    """
+    termo = (termo or '').strip()
+    if not termo:
+        return [], None
+
+    posicao = _posicao(cursor)
+    # O SQL do FTS5 é cru: o banco (réplica ou primário) vem do router, como no ORM
+    banco = router.db_for_read(Vaga) or DEFAULT_DB_ALIAS
+    if connections[banco].vendor == 'postgresql':
+        resultados = _buscar_postgres(banco, termo, posicao, limite + 1)
+    else:
+        resultados = _buscar_sqlite(banco, termo, posicao, limite + 1)
+
+    proximo_cursor = None
+    if len(resultados) > limite:
+        resultados = resultados[:limite]
+        ultima = resultados[-1]
+        proximo_cursor = encode_cursor(ultima.rank, ultima.pk)
+    return resultados, proximo_cursor
+
+
+def _buscar_postgres(banco, termo, posicao, limite):
+    query = SearchQuery(
+        Func(Value(termo), function='unaccent', output_field=CharField()),
+        config='portuguese',
+        search_type='websearch',
+    )
+    vagas = (
+        Vaga.objects.using(banco)
+        .filter(status='aberta', search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .select_related('empresa')
+    )
+    if posicao:
+        rank, pk = posicao
+        vagas = vagas.filter(Q(rank__lt=rank) | Q(rank=rank, pk__lt=pk))
+    return list(vagas.order_by('-rank', '-pk')[:limite])
+
+
+def _fts_match(termo):
+    tokens = _TOKEN_RE.findall(termo.lower())
+    # Sem stemmer português no FTS5: cada termo vira busca por prefixo
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _buscar_sqlite(banco, termo, posicao, limite):
+    match = _fts_match(termo)
+    if not match:
+        return []
+
+    sql = f"""
+        SELECT rowid AS vaga_id, -bm25({FTS_TABLE}, %s, %s) AS rank
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+    """
+    params = [PESO_TITULO, PESO_DESCRICAO, match]
+    where_pagina = ''
+    if posicao:
+        where_pagina = 'WHERE fts.rank < %s OR (fts.rank = %s AND fts.vaga_id < %s)'
+        params += [posicao[0], posicao[0], posicao[1]]
+
+    with connections[banco].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT fts.vaga_id, fts.rank
+            FROM ({sql}) fts
+            JOIN job_vacancies_vaga v ON v.id = fts.vaga_id AND v.status = 'aberta'
+            {where_pagina}
+            ORDER BY fts.rank DESC, fts.vaga_id DESC
+            LIMIT %s
+            """,
+            params + [limite],
+        )
+        ranks = cursor.fetchall()
+
+    vagas = Vaga.objects.using(banco).select_related('empresa').in_bulk([pk for pk, _ in ranks])
+    resultados = []
+    for pk, rank in ranks:
+        vaga = vagas.get(pk)
+        if vaga is not None:
+            vaga.rank = rank
+            resultados.append(vaga)
+    return resultados
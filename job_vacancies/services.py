@@ -2,9 +2,17 @@ from django.db import transaction
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, render, redirect, get_object_or_404
 from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from account.models import User
-from .models import Vaga, AvaliacaoVagaMedica, Candidatura, Conversa
-from datetime import timezone
+from account.constants import Grupos
+from .models import Vaga, AvaliacaoVagaMedica, Candidatura, Conversa, Mensagem, VagaElegibilidade
+from .chat import publicar_mensagem
+from .historico import registrar_transicoes
+from .fila_aprovacao import disponivel_para, vagas_na_fila
+from .metricas_medicas import registrar_avaliacao
+from .cache import invalidar
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
@@ -44,10 +52,18 @@ def submeter_para_aprovacao(vaga: Vaga, empresa_user: User):
 
 
 def aprovar_vaga_medico(vaga, medico_user, deficiencias_ids, observacoes="", ajustes="", status_avaliacao='aprovada'):
-    if not medico_user.groups.filter(name='Médico').exists():
+    if not medico_user.pertence_ao_grupo(Grupos.MEDICO):
         raise PermissionDenied("Apenas médicos podem avaliar vagas")
 
     with transaction.atomic():
+        # Tira a vaga da fila; o UPDATE trava a linha, então outro médico
+        # avaliando a mesma vaga ao mesmo tempo não encontra mais nada aqui
+        tomada = vagas_na_fila().filter(disponivel_para(medico_user), pk=vaga.pk).update(
+            revisao_medico=None, revisao_expira_em=None
+        )
+        if not tomada:
+            raise ValidationError("Vaga não está mais disponível para sua avaliação")
+        vaga.revisao_medico, vaga.revisao_expira_em = None, None
 
         avaliacao = vaga.avaliacoes_medicas.latest('id')
         avaliacao.medico = medico_user
@@ -57,6 +73,7 @@ def aprovar_vaga_medico(vaga, medico_user, deficiencias_ids, observacoes="", aju
         avaliacao.ajustes_recomendados = ajustes
         avaliacao.avaliado_em = timezone.now()
         avaliacao.save()
+        registrar_avaliacao(avaliacao, vaga)
 
         if status_avaliacao == 'aprovada':
             vaga.status = 'aprovada'
@@ -67,6 +84,107 @@ def aprovar_vaga_medico(vaga, medico_user, deficiencias_ids, observacoes="", aju
 
         vaga.save(update_fields=['status'])
 
+        if status_avaliacao == 'aprovada':
+            reconstruir_elegibilidade(vaga, deficiencias_ids)
+        else:
+            vaga.elegibilidades.all().delete()
+
+
+def reconstruir_elegibilidade(vaga: Vaga, deficiencias_ids):
+    vaga.elegibilidades.all().delete()
+    VagaElegibilidade.objects.bulk_create([
+        VagaElegibilidade(vaga=vaga, categoria_id=categoria_id)
+        for categoria_id in set(deficiencias_ids)
+    ])
+
+
+def _elegibilidades_do_pcd(pcd_user: User):
+    return VagaElegibilidade.objects.filter(categoria__perfilpcd__user=pcd_user)
+
+
+def pcd_elegivel(pcd_user: User, vaga: Vaga) -> bool:
+    return vaga.status == 'aberta' and _elegibilidades_do_pcd(pcd_user).filter(vaga=vaga).exists()
+
+
+def vagas_compativeis(pcd_user: User):
+    return Vaga.objects.filter(status='aberta').filter(
+        Exists(_elegibilidades_do_pcd(pcd_user).filter(vaga=OuterRef('pk')))
+    )
+
+
+def anotar_contagem_candidaturas(vagas):
+    """Anota total e contagem por status das candidaturas na mesma query das vagas."""
+    contagens = {
+        f'candidaturas_{status}': Count('candidaturas', filter=Q(candidaturas__status=status))
+        for status, _ in Candidatura.STATUS_CHOICES
+    }
+    return vagas.annotate(candidaturas_total=Count('candidaturas'), **contagens)
+
+
+def contagem_por_status(vaga):
+    return [
+        (status, label, getattr(vaga, f'candidaturas_{status}', 0))
+        for status, label in Candidatura.STATUS_CHOICES
+    ]
+
+
+def transicionar_candidaturas(empresa_user: User, vaga: Vaga, transicoes: dict) -> dict:
+    """
+    Aplica {novo_status: [ids de candidatura]} em lote: um UPDATE condicional
+    por status de destino, restrito às candidaturas da vaga cujo status atual
+    permite a transição. O histórico sai das linhas que o UPDATE de fato
+    alterou. Retorna {'alteradas': {status: [ids]}, 'ignoradas': [ids]}.
+    """
+    if vaga.empresa_id != empresa_user.pk:
+        raise PermissionDenied()
+
+    status_validos = dict(Candidatura.STATUS_CHOICES)
+    for novo_status in transicoes:
+        if novo_status not in status_validos:
+            raise ValidationError(f"Status inválido: {novo_status}")
+
+    alteradas = {}
+    ignoradas = set()
+    agora = timezone.now()
+
+    with transaction.atomic():
+        for novo_status, ids in transicoes.items():
+            ids = set(ids)
+            origem = Candidatura.status_de_origem(novo_status)
+            candidatas = Candidatura.objects.filter(vaga=vaga, pk__in=ids, status__in=origem)
+            # Status e início da etapa anteriores, para o histórico
+            anteriores = {
+                pk: (status, desde)
+                for pk, status, desde in candidatas.select_for_update().values_list('pk', 'status', 'status_desde')
+            }
+            mudar = set()
+            if anteriores:
+                # A condição de origem vale no próprio UPDATE: uma transição concorrente
+                # entre a leitura e a escrita (SQLite ignora o FOR UPDATE) não é sobrescrita
+                total = candidatas.filter(pk__in=anteriores).update(
+                    status=novo_status, status_desde=agora, atualizado_em=agora
+                )
+                mudar = set(anteriores)
+                if total != len(anteriores):
+                    mudar = set(
+                        Candidatura.objects.filter(pk__in=anteriores, status=novo_status, status_desde=agora)
+                        .values_list('pk', flat=True)
+                    )
+            if mudar:
+                registrar_transicoes(
+                    [(pk, *anteriores[pk]) for pk in sorted(mudar)], novo_status, vaga.pk, vaga.empresa_id, agora
+                )
+            alteradas[novo_status] = sorted(mudar)
+            ignoradas |= ids - mudar
+
+    # Um id pedido em dois destinos pode ter mudado num e sido recusado no outro
+    for mudadas in alteradas.values():
+        ignoradas -= set(mudadas)
+
+    if any(alteradas.values()):
+        invalidar('vaga', vaga.pk)
+    return {'alteradas': alteradas, 'ignoradas': sorted(ignoradas)}
+
 
 def candidatar_pcd(pcd_user: User, vaga: Vaga, mensagem: str = ""):
     if pcd_user.tipo != 'pcd':
@@ -75,11 +193,7 @@ def candidatar_pcd(pcd_user: User, vaga: Vaga, mensagem: str = ""):
     if vaga.status != 'aberta':
         raise ValidationError("Vaga não está aberta")
 
-    avaliacao = vaga.avaliacoes_medicas.filter(status='aprovada').latest('avaliado_em')
-    deficiencias_pcd = set(pcd_user.perfil_pcd.deficiencias.values_list('id', flat=True))
-    elegiveis = set(avaliacao.deficiencias_elegiveis.values_list('id', flat=True))
-
-    if not deficiencias_pcd.intersection(elegiveis):
+    if not pcd_elegivel(pcd_user, vaga):
         raise ValidationError("Você não possui deficiência compatível com esta vaga")
 
     with transaction.atomic():
@@ -91,4 +205,81 @@ def candidatar_pcd(pcd_user: User, vaga: Vaga, mensagem: str = ""):
 
         Conversa.objects.create(candidatura=candidatura)
    
-    return candidatura
\ No newline at end of file
+    return candidatura
+
+
+LADOS_CONVERSA = ('empresa', 'pcd')
+
+
+def lado_na_conversa(conversa: Conversa, user: User) -> str:
+    candidatura = conversa.candidatura
+    if candidatura.pcd_id == user.pk:
+        return 'pcd'
+    if candidatura.vaga.empresa_id == user.pk:
+        return 'empresa'
+    raise PermissionDenied("Você não participa desta conversa")
+
+
+def enviar_mensagem(conversa: Conversa, remetente_tipo: str, conteudo: str, anexo=None) -> Mensagem:
+    if remetente_tipo not in LADOS_CONVERSA:
+        raise ValidationError("Remetente inválido")
+
+    with transaction.atomic():
+        # Quem envia já leu a própria mensagem
+        mensagem = Mensagem.objects.create(
+            conversa=conversa,
+            remetente_tipo=remetente_tipo,
+            conteudo=conteudo,
+            anexo=anexo,
+            **{f'lida_por_{remetente_tipo}': True},
+        )
+        transaction.on_commit(lambda: publicar_mensagem(mensagem))
+    return mensagem
+
+
+def marcar_conversa_lida(conversa: Conversa, lado: str, ate_mensagem_id=None) -> int:
+    if lado not in LADOS_CONVERSA:
+        raise ValidationError("Lado da conversa inválido")
+
+    campo_lida = f'lida_por_{lado}'
+    contador = f'nao_lidas_{lado}'
+
+    with transaction.atomic():
+        mensagens = Mensagem.objects.filter(conversa=conversa, **{campo_lida: False})
+        if ate_mensagem_id is not None:
+            mensagens = mensagens.filter(pk__lte=ate_mensagem_id)
+        lidas = mensagens.update(**{campo_lida: True})
+
+        if lidas:
+            Conversa.objects.filter(pk=conversa.pk).update(
+                **{contador: Greatest(F(contador) - lidas, Value(0))}
+            )
+    return lidas
+
+
+def _contagem_nao_lidas(lado):
+    nao_lidas = (
+        Mensagem.objects
+        .filter(conversa=OuterRef('pk'), **{f'lida_por_{lado}': False})
+        .values('conversa')
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(nao_lidas, output_field=IntegerField()), Value(0))
+
+
+def reconciliar_contadores_nao_lidas(conversas=None) -> int:
+    conversas = Conversa.objects.all() if conversas is None else conversas
+    divergentes = (
+        conversas
+        .annotate(real_empresa=_contagem_nao_lidas('empresa'), real_pcd=_contagem_nao_lidas('pcd'))
+        .filter(~Q(nao_lidas_empresa=F('real_empresa')) | ~Q(nao_lidas_pcd=F('real_pcd')))
+        .values_list('pk', flat=True)
+    )
+    ids = list(divergentes)
+    if ids:
+        Conversa.objects.filter(pk__in=ids).update(
+            nao_lidas_empresa=_contagem_nao_lidas('empresa'),
+            nao_lidas_pcd=_contagem_nao_lidas('pcd'),
+        )
+    return len(ids)
@@ -0,0 +1,89 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+# Enviado por Vaga.save() sempre que o status persistido muda.
+# Argumentos: vaga, status_anterior (None para vagas novas)
+vaga_status_alterado = Signal()
+
+
+@receiver(vaga_status_alterado)
+def invalidar_recomendacoes_por_vaga(sender, vaga, status_anterior, **kwargs):
+    if 'aberta' in (status_anterior, vaga.status):
+        from .recomendacoes import invalidar_todas_recomendacoes
+        invalidar_todas_recomendacoes()
+
+
+@receiver(vaga_status_alterado)
+def atualizar_contador_fila_aprovacao(sender, vaga, status_anterior, **kwargs):
+    delta = (vaga.status == 'aguardando_aprovacao') - (status_anterior == 'aguardando_aprovacao')
+    if delta:
+        from .metricas_medicas import FILA_APROVACAO, incrementar_contador
+        incrementar_contador(FILA_APROVACAO, delta)
+
+
+@receiver(post_delete, sender='job_vacancies.Vaga')
+def descontar_vaga_removida_da_fila(sender, instance, **kwargs):
+    if instance.status == 'aguardando_aprovacao':
+        from .metricas_medicas import FILA_APROVACAO, incrementar_contador
+        incrementar_contador(FILA_APROVACAO, -1)
+
+
+@receiver(vaga_status_alterado)
+def invalidar_cache_fila_aprovacao(sender, vaga, status_anterior, **kwargs):
+    if 'aguardando_aprovacao' in (status_anterior, vaga.status):
+        from .cache import invalidar
+        invalidar('fila_aprovacao')
+
+
+@receiver(post_save, sender='job_vacancies.Vaga')
+@receiver(post_delete, sender='job_vacancies.Vaga')
+def invalidar_cache_vaga(sender, instance, **kwargs):
+    from .cache import invalidar
+    invalidar('vaga', instance.pk)
+    invalidar('vagas')
+
+
+@receiver(post_save, sender='job_vacancies.Candidatura')
+@receiver(post_delete, sender='job_vacancies.Candidatura')
+def invalidar_cache_candidatura(sender, instance, **kwargs):
+    from .cache import invalidar
+    invalidar('vaga', instance.vaga_id)
+
+
+@receiver(post_save, sender='job_vacancies.AvaliacaoVagaMedica')
+def invalidar_cache_avaliacao(sender, instance, **kwargs):
+    from .cache import invalidar
+    invalidar('vaga', instance.vaga_id)
+    invalidar('fila_aprovacao')
+
+
+@receiver(post_save, sender='account.PerfilPCD')
+def invalidar_recomendacoes_por_perfil(sender, instance, **kwargs):
+    from .recomendacoes import invalidar_recomendacoes
+    invalidar_recomendacoes(instance.user_id)
+
+
+@receiver(m2m_changed, sender='account.PerfilPCD_deficiencias')
+@receiver(m2m_changed, sender='account.PerfilPCD_recursos_necessarios')
+def invalidar_recomendacoes_por_preferencias(sender, instance, action, reverse, pk_set, **kwargs):
+    from .recomendacoes import invalidar_recomendacoes
+    if not reverse:
+        if action.startswith('post_'):
+            invalidar_recomendacoes(instance.user_id)
+        return
+
+    # Alteração feita pelo lado da categoria/recurso: atinge vários perfis. No
+    # clear pk_set vem None, então os perfis são lidos antes de o vínculo sumir
+    if action == 'pre_clear':
+        vinculos = sender.objects.filter(**{instance._meta.model_name: instance})
+        instance._usuarios_do_clear = set(vinculos.values_list('perfilpcd__user_id', flat=True))
+        return
+    if action == 'post_clear':
+        usuarios = instance.__dict__.pop('_usuarios_do_clear', ())
+    elif action.startswith('post_'):
+        from account.models import PerfilPCD
+        usuarios = PerfilPCD.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+    else:
+        return
+    for user_id in usuarios:
+        invalidar_recomendacoes(user_id)
@@ -0,0 +1,12 @@
+from celery import shared_task
+from django.conf import settings
+
+from .visualizacoes import flush_visualizacoes
+
+
+@shared_task(ignore_result=True)
+def flush_visualizacoes_task():
+    # O buffer 'local' só existe no processo web que o encheu
+    if getattr(settings, 'VISUALIZACOES_BUFFER', 'local') != 'cache':
+        return None
+    return flush_visualizacoes()
@@ -0,0 +1,55 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from job_vacancies.cache import obter_ou_calcular
+
+register = template.Library()
+
+
+class CacheVersionadoNode(template.Node):
+    def __init__(self, nodelist, timeout, namespace, escopo, partes):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.namespace = namespace
+        self.escopo = escopo
+        self.partes = partes
+
+    def render(self, context):
+        html = obter_ou_calcular(
+            self.namespace.resolve(context),
+            lambda: self.nodelist.render(context),
+            escopo=[valor.resolve(context) for valor in self.escopo],
+            partes=[valor.resolve(context) for valor in self.partes],
+            timeout=self.timeout.resolve(context),
+        )
+        return mark_safe(html)
+
+
+@register.tag('cache_versionado')
+def do_cache_versionado(parser, token):
+    """
+    {% cache_versionado <timeout> <namespace> [escopo...] [por <variação>...] %}
+        ...
+    {% endcache_versionado %}
+
+    O fragmento é invalidado junto com a versão de (namespace, *escopo);
+    os valores depois de `por` só diferenciam chaves dentro da mesma versão.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' requer timeout e namespace")
+    nodelist = parser.parse(('endcache_versionado',))
+    parser.delete_first_token()
+
+    resto = bits[3:]
+    escopo, partes = resto, []
+    if 'por' in resto:
+        indice = resto.index('por')
+        escopo, partes = resto[:indice], resto[indice + 1:]
+    return CacheVersionadoNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in escopo],
+        [parser.compile_filter(bit) for bit in partes],
+    )
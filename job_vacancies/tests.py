@@ -1,3 +1,806 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Count, Q
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from account.constants import Grupos, Messages
+from account.models import CategoriaDeficiencia, PerfilEmpresa, PerfilMedico, PerfilPCD, User
+
+from . import fila_aprovacao
+from .benchmarks import Benchmarks
+from .carga import PAPEIS, teste_carga
+from .fila_aprovacao import (
+    disponivel_para,
+    liberar_reserva,
+    reservar_vaga,
+    reservar_vagas,
+    reservas_ativas,
+    vagas_na_fila,
+)
+from .historico import reconstruir_tempos_etapa, tempo_medio_por_etapa
+from .importacao import importar_vagas
+from .metricas_medicas import metricas_do_medico, reconstruir_metricas_medicas, vagas_pendentes
+from .models import (
+    AvaliacaoMedicaDiaria,
+    AvaliacaoVagaMedica,
+    Candidatura,
+    CandidaturaEvento,
+    Contador,
+    Conversa,
+    RecursoAcessibilidade,
+    TempoEtapa,
+    Vaga,
+    VagaElegibilidade,
+)
+from .services import (
+    anotar_contagem_candidaturas,
+    aprovar_vaga_medico,
+    candidatar_pcd,
+    criar_vaga,
+    enviar_mensagem,
+    marcar_conversa_lida,
+    pcd_elegivel,
+    reconciliar_contadores_nao_lidas,
+    submeter_para_aprovacao,
+    transicionar_candidaturas,
+)
+from .paginacao import paginar_por_criacao
+from .recomendacoes import calcular_recomendacoes, recomendar_vagas
+from .search import buscar_vagas
+from .tasks import flush_visualizacoes_task
+from .visualizacoes import BufferLocal
+
+SENHA = 'senha-de-teste'
+
+# Para as classes que fazem requisições: os buffers do processo descarregariam
+# depois de o banco de teste sumir, e estourar o orçamento de consultas falha
+ambiente_de_teste = override_settings(
+    VISUALIZACOES_FLUSH_SINCRONO=True, ATIVIDADE_FLUSH_SINCRONO=True, QUERY_ORCAMENTO_MODO='falhar',
+)
+
+
+def criar_empresa(n=1):
+    user = User.objects.create_user(f'empresa{n}@teste.com', SENHA, nome_completo=f"Empresa {n}")
+    PerfilEmpresa.objects.create(user=user, cnpj=f'{n:014d}', razao_social=f"Empresa {n} LTDA", telefone_principal='1')
+    return user
+
+
+def criar_pcd(n=1, deficiencias=()):
+    user = User.objects.create_user(f'pcd{n}@teste.com', SENHA, nome_completo=f"Candidato {n}")
+    perfil = PerfilPCD.objects.create(user=user, cpf=f'{n:011d}')
+    perfil.deficiencias.set(deficiencias)
+    return user
+
+
+def criar_medico(n=1):
+    user = User.objects.create_user(f'medico{n}@teste.com', SENHA, nome_completo=f"Médico {n}")
+    PerfilMedico.objects.create(user=user, crm=f'{n:06d}', uf_crm='SP')
+    user.groups.add(Group.objects.get_or_create(name=Grupos.MEDICO)[0])
+    return user
+
+
+def nova_vaga(empresa, titulo="Analista", **campos):
+    return criar_vaga(empresa, {'titulo': titulo, 'descricao': "Descrição", 'modalidade': 'remoto', **campos})
+
+
+def vaga_aberta(empresa, medico, categorias, titulo="Analista", **campos):
+    """Vaga pelo fluxo completo: rascunho, avaliação médica aprovada e publicação."""
+    vaga = nova_vaga(empresa, titulo, **campos)
+    submeter_para_aprovacao(vaga, empresa)
+    aprovar_vaga_medico(vaga, medico, [categoria.pk for categoria in categorias])
+    vaga.refresh_from_db()
+    vaga.publicar()
+    return vaga
+
+
+def publicar_direto(*vagas):
+    """Abre as vagas sem o fluxo de avaliação, para testes que só leem."""
+    Vaga.objects.filter(pk__in=[vaga.pk for vaga in vagas]).update(status='aberta')
+
+
+class BuscaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = criar_empresa()
+
+    def test_titulo_pesa_mais_que_a_descricao(self):
+        no_titulo = nova_vaga(self.empresa, "Desenvolvedor Python")
+        na_descricao = nova_vaga(self.empresa, "Analista de Dados", descricao="Dia a dia com Python e SQL")
+        rascunho = nova_vaga(self.empresa, "Python Júnior")
+        outra = nova_vaga(self.empresa, "Contador")
+        publicar_direto(no_titulo, na_descricao, outra)
+
+        vagas, proximo_cursor = buscar_vagas("pyth")
+        self.assertEqual([vaga.pk for vaga in vagas], [no_titulo.pk, na_descricao.pk])
+        self.assertGreater(vagas[0].rank, vagas[1].rank)
+        self.assertIsNone(proximo_cursor)
+        self.assertNotIn(rascunho.pk, [vaga.pk for vaga in vagas])
+
+    def test_paginas_sem_lacunas_nem_repeticoes(self):
+        # Ranks repetidos de três em três: o desempate pelo id também é paginado
+        vagas = [
+            nova_vaga(self.empresa, f"Suporte {n}", descricao=" ".join(["Suporte técnico"] * (n % 3 + 1)))
+            for n in range(7)
+        ]
+        publicar_direto(*vagas)
+        todas, _ = buscar_vagas("suporte", limite=20)
+
+        paginas, cursor = [], None
+        while True:
+            pagina, cursor = buscar_vagas("suporte", cursor=cursor, limite=3)
+            paginas.append([vaga.pk for vaga in pagina])
+            if cursor is None:
+                break
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 1])
+        self.assertEqual(sum(paginas, []), [vaga.pk for vaga in todas])
+
+
+class PaginacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = criar_empresa()
+        cls.vagas = [nova_vaga(cls.empresa, f"Vaga {n}") for n in range(7)]
+        # Metade com o mesmo criado_em: o desempate pelo id atravessa as páginas
+        Vaga.objects.filter(pk__in=[vaga.pk for vaga in cls.vagas[:4]]).update(criado_em=cls.vagas[0].criado_em)
+
+    def test_paginas_sem_lacunas_nem_repeticoes(self):
+        vagas = Vaga.objects.filter(empresa=self.empresa)
+        paginas, cursor = [], None
+        while True:
+            pagina, cursor = paginar_por_criacao(vagas, cursor, limite=3)
+            paginas.append([vaga.pk for vaga in pagina])
+            if cursor is None:
+                break
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 1])
+        self.assertEqual(sum(paginas, []), list(vagas.order_by('-criado_em', '-pk').values_list('pk', flat=True)))
+
+    def test_cursor_invalido_volta_para_a_primeira_pagina(self):
+        primeira, _ = paginar_por_criacao(Vaga.objects.all(), limite=3)
+        pagina, _ = paginar_por_criacao(Vaga.objects.all(), "lixo", limite=3)
+        self.assertEqual(pagina, primeira)
+
+    def test_contagem_por_status_na_mesma_query(self):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        vaga = vaga_aberta(self.empresa, criar_medico(), [visual])
+        _, segunda = (candidatar_pcd(criar_pcd(n, deficiencias=[visual]), vaga) for n in (1, 2))
+        Candidatura.objects.filter(pk=segunda.pk).update(status='em_analise')
+
+        with self.assertNumQueries(1):
+            vaga = anotar_contagem_candidaturas(Vaga.objects.filter(pk=vaga.pk)).get()
+        self.assertEqual((vaga.candidaturas_total, vaga.candidaturas_pendente, vaga.candidaturas_em_analise), (2, 1, 1))
+
+
+class ImportacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = criar_empresa()
+        cls.rampa = RecursoAcessibilidade.objects.create(nome="Rampa")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_linha_invalida_nao_impede_as_demais(self):
+        arquivo = io.BytesIO(
+            "titulo,descricao,tipo,modalidade,localizacao,recursos_disponiveis\n"
+            "Analista,Descrição,emprego,remoto,,rampa\n"
+            ",Sem título,emprego,teletransporte,,\n"
+            f"Assistente,Descrição,capacitacao,presencial,Recife,{self.rampa.pk}\n".encode()
+        )
+        resultado = importar_vagas(self.empresa, arquivo, tamanho_lote=1)
+
+        self.assertEqual((resultado['criadas'], resultado['total_erros']), (2, 1))
+        self.assertEqual(resultado['erros'][0]['linha'], 3)
+        self.assertEqual(set(resultado['erros'][0]['erros']), {'titulo', 'modalidade'})
+
+        vagas = Vaga.objects.filter(empresa=self.empresa).order_by('titulo')
+        self.assertEqual([vaga.titulo for vaga in vagas], ["Analista", "Assistente"])
+        self.assertEqual({vaga.status for vaga in vagas}, {'rascunho'})
+        self.assertEqual([list(vaga.recursos_disponiveis.all()) for vaga in vagas], [[self.rampa], [self.rampa]])
+        self.assertEqual(AvaliacaoVagaMedica.objects.filter(vaga__in=vagas).count(), 2)
+
+    def test_jsonl_com_linha_quebrada(self):
+        arquivo = io.BytesIO(
+            b'{"titulo": "Analista", "descricao": "D", "tipo": "emprego", "modalidade": "remoto"}\n'
+            b'{"titulo": \n'
+            b'\n'
+            b'["lista"]\n'
+        )
+        erros = []
+        resultado = importar_vagas(self.empresa, arquivo, formato='jsonl', ao_erro=lambda linha, _: erros.append(linha))
+
+        self.assertEqual((resultado['criadas'], resultado['total_erros']), (1, 2))
+        self.assertEqual(erros, [2, 4])
+
+
+class ElegibilidadeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        cls.empresa = criar_empresa()
+        cls.medico = criar_medico()
+        cls.pcd = criar_pcd(deficiencias=[cls.visual])
+
+    def test_vaga_reaberta_continua_elegivel(self):
+        vaga = vaga_aberta(self.empresa, self.medico, [self.visual])
+        self.assertTrue(pcd_elegivel(self.pcd, vaga))
+
+        vaga.status = 'pausada'
+        vaga.save(update_fields=['status'])
+        self.assertFalse(pcd_elegivel(self.pcd, vaga))
+
+        vaga.status = 'aberta'
+        vaga.save(update_fields=['status'])
+        self.assertTrue(pcd_elegivel(self.pcd, vaga))
+        self.assertEqual(candidatar_pcd(self.pcd, vaga).vaga, vaga)
+
+    def test_migracao_preenche_vagas_pausadas(self):
+        pausada = vaga_aberta(self.empresa, self.medico, [self.visual])
+        pausada.status = 'pausada'
+        pausada.save(update_fields=['status'])
+        VagaElegibilidade.objects.all().delete()
+
+        migracao = import_module('job_vacancies.migrations.0003_vagaelegibilidade')
+        migracao.preencher_elegibilidade(apps, None)
+        self.assertEqual(list(pausada.elegibilidades.values_list('categoria', flat=True)), [self.visual.pk])
+
+
+class RecomendacoesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        rampa, libras = RecursoAcessibilidade.objects.bulk_create(
+            [RecursoAcessibilidade(nome=nome) for nome in ("Rampa", "Libras")]
+        )
+        empresa, medico = criar_empresa(), criar_medico()
+        cls.completa = vaga_aberta(empresa, medico, [cls.visual], "Completa", modalidade='presencial',
+                                   localizacao="São Paulo")
+        cls.completa.recursos_disponiveis.set([rampa, libras])
+        cls.remota = vaga_aberta(empresa, medico, [cls.visual], "Remota", modalidade='remoto')
+        cls.remota.recursos_disponiveis.set([rampa])
+        cls.sem_pontos = vaga_aberta(empresa, medico, [cls.visual], "Sem pontos", modalidade='hibrido',
+                                     localizacao="Recife")
+        vaga_aberta(empresa, medico, [CategoriaDeficiencia.objects.create(nome="Auditiva")], "Incompatível")
+
+        cls.pcd = criar_pcd(deficiencias=[cls.visual])
+        perfil = cls.pcd.perfil_pcd
+        perfil.modalidade_preferida, perfil.localizacao = 'presencial', "são paulo"
+        perfil.save()
+        perfil.recursos_necessarios.set([rampa, libras])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pontuacao_e_ordem(self):
+        recomendacoes = calcular_recomendacoes(self.pcd)
+        self.assertEqual(
+            [(vaga['pk'], vaga['pontuacao']) for vaga in recomendacoes],
+            [(self.completa.pk, 100.0), (self.remota.pk, 42.5), (self.sem_pontos.pk, 0.0)],
+        )
+
+    def test_cache_invalidado_pelo_perfil_e_pelas_vagas(self):
+        self.assertEqual(recomendar_vagas(self.pcd)[0]['pk'], self.completa.pk)
+        with self.assertNumQueries(0):
+            recomendar_vagas(self.pcd)
+
+        perfil = self.pcd.perfil_pcd
+        perfil.modalidade_preferida = 'remoto'
+        perfil.save()
+        self.assertEqual(recomendar_vagas(self.pcd)[0]['pk'], self.remota.pk)
+
+        self.remota.status = 'pausada'
+        self.remota.save(update_fields=['status'])
+        self.assertNotIn(self.remota.pk, [vaga['pk'] for vaga in recomendar_vagas(self.pcd)])
+
+    def test_clear_pelo_lado_da_categoria_invalida(self):
+        self.assertEqual(len(recomendar_vagas(self.pcd)), 3)
+        self.visual.perfilpcd_set.clear()
+        self.assertEqual(recomendar_vagas(self.pcd), [])
+
+
+class BufferLocalTests(SimpleTestCase):
+    def test_flush_sem_novas_visualizacoes(self):
+        descarregado = threading.Event()
+        contagens = {}
+
+        def flush(recebidas):
+            contagens.update(recebidas)
+            descarregado.set()
+
+        with mock.patch('job_vacancies.visualizacoes._flush', side_effect=flush):
+            buffer = BufferLocal(intervalo=0.05)
+            buffer.registrar(1)
+            buffer.registrar(1)
+            buffer.registrar(2)
+            self.assertTrue(descarregado.wait(2))
+        self.assertEqual(contagens, {1: 2, 2: 1})
+        self.assertEqual(buffer.tamanho(), {'vagas': 0, 'visualizacoes': 0})
+
+    @override_settings(VISUALIZACOES_BUFFER='local')
+    def test_task_do_beat_ignora_o_buffer_local(self):
+        with mock.patch('job_vacancies.tasks.flush_visualizacoes') as flush:
+            flush_visualizacoes_task.apply()
+        flush.assert_not_called()
+
+
+@override_settings(CHAT_PUBSUB='job_vacancies.chat.BrokerEmMemoria', CHAT_HEARTBEAT=5)
+@ambiente_de_teste
+class ChatStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        cls.pcd = criar_pcd(deficiencias=[visual])
+        vaga = vaga_aberta(criar_empresa(), criar_medico(), [visual])
+        cls.conversa = candidatar_pcd(cls.pcd, vaga).conversa
+
+    def enviar(self, conteudo):
+        with self.captureOnCommitCallbacks(execute=True):
+            return enviar_mensagem(self.conversa, 'empresa', conteudo)
+
+    async def abrir_stream(self, ultimo_id):
+        client = AsyncClient()
+        await client.aforce_login(self.pcd)
+        response = await client.get(
+            reverse('job_vacancies:chat_stream', args=[self.conversa.pk]), headers={'Last-Event-ID': str(ultimo_id)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        # O gerador da view, e não o invólucro de streaming_content: fechá-lo
+        # encerra a assinatura no broker ainda dentro do loop do teste
+        return response._iterator
+
+    async def proximo_evento(self, stream):
+        evento = await asyncio.wait_for(anext(stream), 2)
+        return evento.decode() if isinstance(evento, bytes) else evento
+
+    async def test_retoma_depois_do_last_event_id(self):
+        primeira = await sync_to_async(self.enviar)("Primeira")
+        segunda = await sync_to_async(self.enviar)("Segunda")
+
+        stream = await self.abrir_stream(primeira.pk)
+        try:
+            evento = await self.proximo_evento(stream)
+        finally:
+            await stream.aclose()
+        self.assertTrue(evento.startswith(f"id: {segunda.pk}\nevent: mensagem\n"))
+        self.assertIn("Segunda", evento)
+        self.assertNotIn("Primeira", evento)
+
+    async def test_entrega_mensagem_publicada(self):
+        anterior = await sync_to_async(self.enviar)("Anterior")
+        stream = await self.abrir_stream(anterior.pk)
+        try:
+            pendente = asyncio.ensure_future(self.proximo_evento(stream))
+            await asyncio.sleep(0.1)
+            self.assertFalse(pendente.done())
+            nova = await sync_to_async(self.enviar)("Nova")
+            evento = await pendente
+        finally:
+            await stream.aclose()
+        self.assertTrue(evento.startswith(f"id: {nova.pk}\n"))
+        self.assertIn("Nova", evento)
+
+
+class MensagensNaoLidasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        vaga = vaga_aberta(criar_empresa(), criar_medico(), [visual])
+        cls.conversa = candidatar_pcd(criar_pcd(deficiencias=[visual]), vaga).conversa
+
+    def contadores(self):
+        self.conversa.refresh_from_db()
+        return self.conversa.mensagens_nao_lidas_empresa(), self.conversa.mensagens_nao_lidas_pcd()
+
+    def test_envio_conta_so_para_o_outro_lado(self):
+        enviar_mensagem(self.conversa, 'empresa', "Olá")
+        enviar_mensagem(self.conversa, 'empresa', "Tudo bem?")
+        enviar_mensagem(self.conversa, 'pcd', "Tudo")
+        self.assertEqual(self.contadores(), (1, 2))
+
+    def test_marcar_lida_ate_uma_mensagem(self):
+        primeira = enviar_mensagem(self.conversa, 'empresa', "Primeira")
+        enviar_mensagem(self.conversa, 'empresa', "Segunda")
+
+        self.assertEqual(marcar_conversa_lida(self.conversa, 'pcd', ate_mensagem_id=primeira.pk), 1)
+        self.assertEqual(self.contadores(), (0, 1))
+        self.assertEqual(marcar_conversa_lida(self.conversa, 'pcd'), 1)
+        self.assertEqual(marcar_conversa_lida(self.conversa, 'pcd'), 0)
+        self.assertEqual(self.contadores(), (0, 0))
+
+    def test_reconciliacao_corrige_contador_divergente(self):
+        enviar_mensagem(self.conversa, 'pcd', "Oi")
+        Conversa.objects.filter(pk=self.conversa.pk).update(nao_lidas_empresa=7, nao_lidas_pcd=3)
+
+        self.assertEqual(reconciliar_contadores_nao_lidas(), 1)
+        self.assertEqual(self.contadores(), (1, 0))
+        self.assertEqual(reconciliar_contadores_nao_lidas(), 0)
+
+
+@override_settings(FILA_MEDICA_LOTE=2, FILA_MEDICA_RESERVA_MINUTOS=30)
+class FilaAprovacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = criar_empresa()
+        cls.medico, cls.outro = criar_medico(1), criar_medico(2)
+        cls.visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        cls.vagas = [nova_vaga(empresa, f"Vaga {n}") for n in range(3)]
+        for vaga in cls.vagas:
+            submeter_para_aprovacao(vaga, empresa)
+
+    def pks(self, vagas):
+        return [vaga.pk for vaga in vagas]
+
+    def test_medicos_reservam_vagas_diferentes(self):
+        primeira, segunda, terceira = self.vagas
+        self.assertEqual(self.pks(reservar_vagas(self.medico)), [primeira.pk, segunda.pk])
+        self.assertEqual(self.pks(reservar_vagas(self.outro)), [terceira.pk])
+        # Pedir de novo só renova o que já é dele
+        self.assertEqual(self.pks(reservar_vagas(self.medico)), [primeira.pk, segunda.pk])
+
+        self.assertFalse(reservar_vaga(primeira, self.outro))
+        with self.assertRaises(ValidationError):
+            aprovar_vaga_medico(primeira, self.outro, [self.visual.pk])
+
+        aprovar_vaga_medico(primeira, self.medico, [self.visual.pk])
+        with self.assertRaises(ValidationError):
+            aprovar_vaga_medico(primeira, self.outro, [self.visual.pk])
+        self.assertEqual(Vaga.objects.get(pk=primeira.pk).status, 'aprovada')
+
+    def test_vaga_tomada_entre_a_leitura_e_a_reserva_fica_com_quem_chegou_antes(self):
+        primeira, segunda, _ = self.vagas
+        livre = fila_aprovacao._livre
+        chamadas = []
+
+        def outro_medico_chega_antes(agora):
+            chamadas.append(agora)
+            # Segunda chamada: candidatas já lidas, UPDATE ainda não executado
+            if len(chamadas) == 2:
+                self.assertTrue(reservar_vaga(primeira, self.outro))
+            return livre(agora)
+
+        with mock.patch.object(fila_aprovacao, '_livre', outro_medico_chega_antes):
+            reservadas = reservar_vagas(self.medico)
+
+        self.assertEqual(self.pks(reservadas), [segunda.pk])
+        self.assertEqual(self.pks(reservas_ativas(self.outro)), [primeira.pk])
+
+    def test_reserva_expirada_volta_para_a_fila(self):
+        primeira, segunda, _ = self.vagas
+        reservar_vagas(self.medico)
+        Vaga.objects.filter(pk=primeira.pk).update(revisao_expira_em=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(self.pks(reservas_ativas(self.medico)), [segunda.pk])
+        self.assertTrue(vagas_na_fila().filter(disponivel_para(self.outro), pk=primeira.pk).exists())
+        self.assertEqual(self.pks(reservar_vagas(self.outro)), [primeira.pk, self.vagas[2].pk])
+
+    def test_liberar_reserva(self):
+        primeira = self.vagas[0]
+        self.assertTrue(reservar_vaga(primeira, self.medico))
+        self.assertEqual(liberar_reserva(primeira, self.outro), 0)
+        self.assertEqual(liberar_reserva(primeira, self.medico), 1)
+        self.assertTrue(reservar_vaga(primeira, self.outro))
+
+
+class MetricasMedicasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = criar_empresa()
+        cls.medico = criar_medico()
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        vagas = [nova_vaga(empresa, f"Vaga {n}") for n in range(5)]
+        for vaga in vagas:
+            submeter_para_aprovacao(vaga, empresa)
+        for vaga, resultado in zip(vagas, ['aprovada', 'aprovada', 'rejeitada', 'ajustes_necessarios']):
+            aprovar_vaga_medico(vaga, cls.medico, [visual.pk], status_avaliacao=resultado)
+
+    def metricas_ao_vivo(self):
+        avaliacoes = AvaliacaoVagaMedica.objects.filter(medico=self.medico, avaliado_em__isnull=False)
+        resumo = avaliacoes.aggregate(
+            total=Count('id'),
+            aprovadas=Count('id', filter=Q(status='aprovada')),
+            rejeitadas=Count('id', filter=Q(status='rejeitada')),
+            ajustes=Count('id', filter=Q(status='ajustes_necessarios')),
+        )
+        tempos = [avaliacao.avaliado_em - avaliacao.vaga.criado_em for avaliacao in avaliacoes.select_related('vaga')]
+        resumo['tempo_medio'] = sum(tempos, timedelta(0)) / len(tempos)
+        return resumo
+
+    def comparar(self):
+        metricas, ao_vivo = metricas_do_medico(self.medico), self.metricas_ao_vivo()
+        self.assertEqual({chave: metricas[chave] for chave in ao_vivo}, ao_vivo)
+        self.assertEqual(metricas['taxa_aprovacao'], 50.0)
+        self.assertEqual(vagas_pendentes(), Vaga.objects.filter(status='aguardando_aprovacao').count())
+
+    def test_resumo_bate_com_os_agregados(self):
+        self.assertEqual((self.metricas_ao_vivo()['total'], vagas_pendentes()), (4, 1))
+        self.comparar()
+
+    def test_reconstrucao_repara_resumos_divergentes(self):
+        AvaliacaoMedicaDiaria.objects.update(total=99, aprovadas=0)
+        Contador.objects.update(valor=42)
+        reconstruir_metricas_medicas()
+        self.comparar()
+
+
+class TransicaoCandidaturasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        cls.empresa = criar_empresa()
+        cls.vaga = vaga_aberta(cls.empresa, criar_medico(), [visual])
+        cls.candidaturas = [
+            candidatar_pcd(criar_pcd(n, deficiencias=[visual]), cls.vaga).pk for n in range(1, 4)
+        ]
+
+    def test_transicao_em_lote_registra_historico(self):
+        primeira, segunda, terceira = self.candidaturas
+        Candidatura.objects.filter(pk=terceira).update(status='reprovado')
+
+        resultado = transicionar_candidaturas(self.empresa, self.vaga, {'em_analise': [primeira, segunda, terceira]})
+
+        self.assertEqual(resultado, {'alteradas': {'em_analise': [primeira, segunda]}, 'ignoradas': [terceira]})
+        self.assertEqual(
+            set(CandidaturaEvento.objects.filter(status_novo='em_analise').values_list('candidatura_id', flat=True)),
+            {primeira, segunda},
+        )
+
+    def test_tempo_medio_por_etapa_soma_as_duracoes(self):
+        primeira, segunda, terceira = self.candidaturas
+        agora = timezone.now()
+        for pk, dias in ((primeira, 2), (segunda, 4), (terceira, 1)):
+            Candidatura.objects.filter(pk=pk).update(status_desde=agora - timedelta(days=dias))
+
+        transicionar_candidaturas(self.empresa, self.vaga, {'em_analise': [primeira, segunda]})
+        candidatura = Candidatura.objects.get(pk=terceira)
+        candidatura.status = 'reprovado'
+        candidatura.save()
+
+        duracoes = CandidaturaEvento.objects.filter(status_anterior='pendente').values_list('duracao_anterior', flat=True)
+        self.assertEqual(sorted(duracao.days for duracao in duracoes), [1, 2, 4])
+        [etapa] = tempo_medio_por_etapa(vaga=self.vaga)
+        self.assertEqual((etapa['status'], etapa['quantidade'], etapa['media_dias']), ('pendente', 3, 2.3))
+
+        TempoEtapa.objects.all().delete()
+        reconstruir_tempos_etapa()
+        self.assertEqual(tempo_medio_por_etapa(empresa=self.empresa), [etapa])
+
+    def test_id_em_dois_destinos_nao_fica_ignorado(self):
+        primeira = self.candidaturas[0]
+        resultado = transicionar_candidaturas(
+            self.empresa, self.vaga, {'em_analise': [primeira], 'entrevista_agendada': [primeira]}
+        )
+        self.assertEqual(resultado['alteradas']['em_analise'], [primeira])
+        self.assertEqual(resultado['ignoradas'], [])
+
+    def test_save_sem_status_em_update_fields_nao_registra_transicao(self):
+        candidatura = Candidatura.objects.get(pk=self.candidaturas[0])
+        desde = candidatura.status_desde
+        candidatura.status = 'em_analise'
+        candidatura.mensagem_candidato = "Atualizada"
+        candidatura.save(update_fields=['mensagem_candidato'])
+
+        candidatura.refresh_from_db()
+        self.assertEqual((candidatura.status, candidatura.status_desde), ('pendente', desde))
+        self.assertFalse(CandidaturaEvento.objects.filter(candidatura=candidatura, status_novo='em_analise').exists())
+
+    def test_save_com_status_adiado_nao_inventa_transicao(self):
+        candidatura = Candidatura.objects.defer('status').get(pk=self.candidaturas[0])
+        candidatura.mensagem_candidato = "Atualizada"
+        candidatura.save()
+        self.assertFalse(CandidaturaEvento.objects.filter(candidatura=candidatura).exclude(status_anterior='').exists())
+
+        candidatura = Candidatura.objects.only('pk', 'vaga').get(pk=self.candidaturas[0])
+        candidatura.status = 'em_analise'
+        candidatura.save()
+        evento = CandidaturaEvento.objects.get(candidatura=candidatura, status_novo='em_analise')
+        self.assertEqual(evento.status_anterior, 'pendente')
+
+    def test_save_com_vaga_carregada_nao_busca_a_vaga(self):
+        candidatura = Candidatura.objects.select_related('vaga').get(pk=self.candidaturas[0])
+        candidatura.status = 'em_analise'
+        # Savepoint, UPDATE, evento, agregado de tempo (2) e release; nenhum SELECT da vaga
+        with self.assertNumQueries(6):
+            candidatura.save()
+
+
+@ambiente_de_teste
+class CachePaginaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_mensagem_da_sessao_nao_vai_para_o_cache(self):
+        self.client.force_login(criar_pcd())
+        self.client.get(reverse('account:logout'))
+
+        # Anônimo de novo, mas com a mensagem do logout ainda pendente na sessão
+        com_mensagem = self.client.get(reverse('job_vacancies:busca'))
+        self.assertContains(com_mensagem, Messages.LOGOUT_INFO)
+
+        outro = Client().get(reverse('job_vacancies:busca'))
+        self.assertNotContains(outro, Messages.LOGOUT_INFO)
+
+    def test_anonimo_sem_sessao_usa_o_cache(self):
+        Client().get(reverse('job_vacancies:busca'))
+        with self.assertNumQueries(0):
+            Client().get(reverse('job_vacancies:busca'))
+
+
+@ambiente_de_teste
+class VagaViewsTests(TestCase):
+    """Cada rota passa pelo OrcamentoConsultasMiddleware, que na suíte falha acima do orçamento."""
+
+    @classmethod
+    def setUpTestData(cls):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        RecursoAcessibilidade.objects.bulk_create([RecursoAcessibilidade(nome=nome) for nome in ("Rampa", "Libras")])
+        cls.empresa = criar_empresa()
+        medico = criar_medico()
+        cls.pcds = [criar_pcd(n, deficiencias=[visual]) for n in range(1, 4)]
+        cls.vagas = [vaga_aberta(cls.empresa, medico, [visual], f"Analista {n}") for n in range(1, 4)]
+        cls.candidaturas = [candidatar_pcd(pcd, cls.vagas[0]) for pcd in cls.pcds]
+        candidatar_pcd(cls.pcds[0], cls.vagas[1])
+
+        cls.rascunho = nova_vaga(cls.empresa, "Rascunho")
+        cls.aprovada = nova_vaga(cls.empresa, "Aprovada")
+        submeter_para_aprovacao(cls.aprovada, cls.empresa)
+        aprovar_vaga_medico(cls.aprovada, medico, [visual.pk])
+
+        cls.conversa = cls.candidaturas[0].conversa
+        for conteudo in ("Olá", "Tudo bem?", "Podemos conversar?"):
+            enviar_mensagem(cls.conversa, 'empresa', conteudo)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_busca(self):
+        self.client.force_login(self.pcds[0])
+        for client in (Client(), self.client):
+            response = client.get(reverse('job_vacancies:busca'), {'q': "Analista"})
+            self.assertEqual(len(response.context['vagas']), 3)
+
+    def test_minhas_vagas(self):
+        self.client.force_login(self.empresa)
+        response = self.client.get(reverse('job_vacancies:minhas_vagas'))
+        self.assertEqual(len(response.context['vagas']), 5)
+
+    def test_nova_vaga(self):
+        self.client.force_login(self.empresa)
+        self.assertEqual(self.client.get(reverse('job_vacancies:vaga_create')).status_code, 200)
+
+    def test_importar(self):
+        self.client.force_login(self.empresa)
+        self.assertEqual(self.client.get(reverse('job_vacancies:vaga_importar')).status_code, 200)
+
+        linhas = ["titulo,descricao,tipo,modalidade,recursos_disponiveis"]
+        linhas += [f"Importada {n},Descrição,emprego,remoto,Rampa;Libras" for n in range(1, 4)]
+        arquivo = SimpleUploadedFile('vagas.csv', "\n".join(linhas).encode(), content_type='text/csv')
+        response = self.client.post(reverse('job_vacancies:vaga_importar'), {'arquivo': arquivo})
+        self.assertEqual(response.context['resultado']['criadas'], 3)
+
+    def test_detalhe_para_a_empresa(self):
+        self.client.force_login(self.empresa)
+        response = self.client.get(reverse('job_vacancies:vaga_detail', args=[self.vagas[0].pk]))
+        self.assertEqual(len(response.context['candidaturas']), 3)
+
+    def test_vaga_presencial_sem_local_nao_aparece_como_remota(self):
+        vaga = nova_vaga(self.empresa, "Caixa", modalidade='presencial')
+        self.client.force_login(self.empresa)
+        response = self.client.get(reverse('job_vacancies:vaga_detail', args=[vaga.pk]))
+        self.assertContains(response, "Presencial")
+        self.assertNotContains(response, "Remoto")
+
+    def test_detalhe_para_o_candidato(self):
+        self.client.force_login(self.pcds[1])
+        response = self.client.get(reverse('job_vacancies:vaga_detail', args=[self.vagas[0].pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_candidatar(self):
+        self.client.force_login(self.pcds[1])
+        response = self.client.post(reverse('job_vacancies:vaga_candidatar', args=[self.vagas[1].pk]))
+        self.assertRedirects(response, reverse('job_vacancies:vaga_detail', args=[self.vagas[1].pk]),
+                             fetch_redirect_response=False)
+        self.assertTrue(Candidatura.objects.filter(vaga=self.vagas[1], pcd=self.pcds[1]).exists())
+
+    def test_submeter_e_publicar(self):
+        self.client.force_login(self.empresa)
+        self.client.post(reverse('job_vacancies:vaga_submeter', args=[self.rascunho.pk]))
+        self.client.post(reverse('job_vacancies:vaga_publicar', args=[self.aprovada.pk]))
+
+        self.rascunho.refresh_from_db()
+        self.aprovada.refresh_from_db()
+        self.assertEqual((self.rascunho.status, self.aprovada.status), ('aguardando_aprovacao', 'aberta'))
+
+    def test_status_das_candidaturas(self):
+        self.client.force_login(self.empresa)
+        self.client.post(reverse('job_vacancies:candidaturas_status', args=[self.vagas[0].pk]), {
+            'candidaturas': [candidatura.pk for candidatura in self.candidaturas], 'status': 'em_analise',
+        })
+        self.assertEqual(Candidatura.objects.filter(vaga=self.vagas[0], status='em_analise').count(), 3)
+
+    def test_chat(self):
+        self.client.force_login(self.pcds[0])
+        url = reverse('job_vacancies:chat_mensagens', args=[self.conversa.pk])
+        self.assertEqual(len(self.client.get(url).json()['mensagens']), 3)
+
+        response = self.client.post(url, {'conteudo': "Sim"})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(reverse('job_vacancies:chat_marcar_lida', args=[self.conversa.pk]))
+        self.assertEqual(response.json(), {'lidas': 3})
+
+
+# Os clientes dos benchmarks usam o host do DEBUG
+@override_settings(ALLOWED_HOSTS=['localhost'])
+@ambiente_de_teste
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'gerar_dados_sinteticos', tag='teste', empresas=2, pcds=6, medicos=2, vagas=12, candidaturas=8,
+            mensagens=8, stdout=io.StringIO(),
+        )
+
+    def test_roda_todos_os_cenarios_e_compara_com_o_commit_anterior(self):
+        candidaturas = Candidatura.objects.count()
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = Path(pasta) / 'resultados.jsonl'
+            with override_settings(BENCHMARK_RESULTADOS=arquivo):
+                with mock.patch('job_vacancies.benchmarks.commit_atual', return_value='antigo'):
+                    call_command('benchmark', tag='teste', iteracoes=2, stdout=io.StringIO())
+                saida = io.StringIO()
+                call_command('benchmark', tag='teste', iteracoes=2, comparar='antigo', stdout=saida)
+            registros = [json.loads(linha) for linha in arquivo.read_text().splitlines()]
+
+        self.assertEqual(len(registros), 2)
+        nomes = [cenario.nome for cenario in Benchmarks('teste').cenarios()]
+        self.assertEqual(list(registros[0]['resultados']), nomes)
+        self.assertEqual({resultado['iteracoes'] for resultado in registros[0]['resultados'].values()}, {2})
+        self.assertIn("Comparado com antigo", saida.getvalue())
+        # Cenários que escrevem são desfeitos
+        self.assertEqual(Candidatura.objects.count(), candidaturas)
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+@ambiente_de_teste
+class TesteCargaTests(TransactionTestCase):
+    def setUp(self):
+        call_command(
+            'gerar_dados_sinteticos', tag='teste', empresas=2, pcds=6, medicos=2, vagas=12, candidaturas=8,
+            mensagens=8, stdout=io.StringIO(),
+        )
+
+    def rodar(self, servidor):
+        endpoints = set()
+        # Um usuário virtual por vez: o SQLite em memória dos testes não espera
+        # por travas (DB_SQLITE_TIMEOUT), e aqui só interessa que as jornadas rodem
+        for papel in PAPEIS:
+            resultado = teste_carga('teste', servidor, concorrencia=1, duracao=1, mix={papel: 1}, seed=1)
+            self.assertEqual(resultado['falhas'], [])
+            for endpoint, linha in resultado['endpoints'].items():
+                self.assertEqual(linha['erros'], 0, endpoint)
+                self.assertIsNotNone(linha['consultas'], endpoint)
+            endpoints.update(resultado['endpoints'])
+        self.assertTrue({'login', 'panel', 'candidatar', 'minhas_vagas', 'fila', 'avaliar'} <= endpoints, endpoints)
+
+    def test_wsgi(self):
+        self.rodar('wsgi')
+
+    def test_asgi(self):
+        self.rodar('asgi')
 
-# Create your tests here.
@@ -5,5 +5,16 @@ from . import views
 app_name = "job_vacancies"
 
 urlpatterns = [
- 
-]
\ No newline at end of file
+    path("busca/", views.VagaBuscaView.as_view(), name="busca"),
+    path("minhas/", views.MinhasVagasListView.as_view(), name="minhas_vagas"),
+    path("nova/", views.VagaCreateView.as_view(), name="vaga_create"),
+    path("importar/", views.VagaImportarView.as_view(), name="vaga_importar"),
+    path("<int:pk>/", views.VagaDetailView.as_view(), name="vaga_detail"),
+    path("<int:pk>/candidatar/", views.VagaCandidatarView.as_view(), name="vaga_candidatar"),
+    path("<int:pk>/submeter/", views.VagaSubmeterAprovacaoView.as_view(), name="vaga_submeter"),
+    path("<int:pk>/publicar/", views.VagaPublicarView.as_view(), name="vaga_publicar"),
+    path("<int:pk>/candidaturas/status/", views.CandidaturasStatusView.as_view(), name="candidaturas_status"),
+    path("conversas/<int:pk>/mensagens/", views.ChatMensagensView.as_view(), name="chat_mensagens"),
+    path("conversas/<int:pk>/lida/", views.ChatMarcarLidaView.as_view(), name="chat_marcar_lida"),
+    path("conversas/<int:pk>/stream/", views.ChatStreamView.as_view(), name="chat_stream"),
+]
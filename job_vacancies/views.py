@@ -1,28 +1,74 @@
+import json
+
+from django.conf import settings
 from django.views import View
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db.models import Q
-from .models import Vaga, Candidatura
+from src.replicas import ReplicaLeituraMixin
+from .models import Vaga, Candidatura, Conversa, Mensagem
 from .forms import VagaForm
-from .services import criar_vaga, submeter_para_aprovacao
+from .services import (
+    criar_vaga,
+    submeter_para_aprovacao,
+    lado_na_conversa,
+    enviar_mensagem,
+    marcar_conversa_lida,
+    anotar_contagem_candidaturas,
+    contagem_por_status,
+    transicionar_candidaturas,
+    candidatar_pcd,
+)
+from .paginacao import paginar_por_criacao
+from .importacao import detectar_formato, importar_vagas
+from .chat import get_broker, serializar_mensagem
+from .search import buscar_vagas
+from .visualizacoes import registrar_visualizacao
+from .historico import tempo_medio_por_etapa
+from .cache import cache_pagina
+
 
 
+class VagaBuscaView(ReplicaLeituraMixin, View):
+    template_name = "job_vacancies/busca.html"
+    orcamento_consultas = 6
 
-class MinhasVagasListView(LoginRequiredMixin, View):
+    @cache_pagina('vagas', timeout=120)
+    def get(self, request):
+        termo = request.GET.get('q', '').strip()
+        vagas, proximo_cursor = buscar_vagas(termo, cursor=request.GET.get('cursor'))
+        return render(request, self.template_name, {
+            "termo": termo,
+            "vagas": vagas,
+            "proximo_cursor": proximo_cursor,
+        })
+
+
+class MinhasVagasListView(ReplicaLeituraMixin, LoginRequiredMixin, View):
     template_name = "job_vacancies/minhas_vagas.html"
+    orcamento_consultas = 6
 
     def get(self, request):
         if request.user.tipo != 'empresa':
             messages.error(request, "Acesso restrito a empresas.")
             return redirect("account:panel")
 
-        vagas = Vaga.objects.filter(empresa=request.user).order_by('-criado_em')
-        return render(request, self.template_name, {"vagas": vagas})
+        vagas = anotar_contagem_candidaturas(
+            Vaga.objects.filter(empresa=request.user).prefetch_related('recursos_disponiveis')
+        )
+        vagas, proximo_cursor = paginar_por_criacao(vagas, cursor=request.GET.get('cursor'))
+        return render(request, self.template_name, {
+            "vagas": vagas,
+            "proximo_cursor": proximo_cursor,
+        })
 
 
 class VagaCreateView(LoginRequiredMixin, View):
     template_name = "job_vacancies/vaga_form.html"
+    orcamento_consultas = 6
 
     def get(self, request):
         return render(request, self.template_name, {"form": VagaForm(), "title": "Nova Vaga"})
@@ -36,26 +82,116 @@ class VagaCreateView(LoginRequiredMixin, View):
         return render(request, self.template_name, {"form": form, "title": "Nova Vaga"})
 
 
+class VagaImportarView(LoginRequiredMixin, View):
+    template_name = "job_vacancies/importar_vagas.html"
+    orcamento_consultas = 10
+
+    def get(self, request):
+        if request.user.tipo != 'empresa':
+            messages.error(request, "Acesso restrito a empresas.")
+            return redirect("account:panel")
+        return render(request, self.template_name)
+
+    def post(self, request):
+        if request.user.tipo != 'empresa':
+            messages.error(request, "Acesso restrito a empresas.")
+            return redirect("account:panel")
+
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            messages.error(request, "Selecione um arquivo CSV ou JSONL.")
+            return render(request, self.template_name)
+
+        formato = request.POST.get('formato') or detectar_formato(arquivo.name)
+        resultado = importar_vagas(request.user, arquivo, formato=formato)
+
+        if resultado['criadas']:
+            messages.success(request, f"{resultado['criadas']} vaga(s) importada(s) como rascunho.")
+        if resultado['total_erros']:
+            messages.warning(request, f"{resultado['total_erros']} linha(s) não foram importadas.")
+        return render(request, self.template_name, {"resultado": resultado})
+
+
 class VagaDetailView(LoginRequiredMixin, View):
     template_name = "job_vacancies/vaga_detail.html"
+    orcamento_consultas = 10
 
     def get(self, request, pk):
-        vaga = get_object_or_404(Vaga, pk=pk)
+        eh_empresa = request.user.tipo == 'empresa'
+        vagas = Vaga.objects.select_related('empresa')
+        if eh_empresa:
+            vagas = anotar_contagem_candidaturas(vagas)
+        vaga = get_object_or_404(vagas, pk=pk)
 
-        if request.user.tipo == 'empresa' and vaga.empresa != request.user:
+        if eh_empresa and vaga.empresa_id != request.user.pk:
             messages.error(request, "Você não autorizado.")
             return redirect("account:panel")
 
-        candidaturas = vaga.candidaturas.select_related('pcd').prefetch_related('pcd__perfil_pcd__deficiencias') if request.user.tipo == 'empresa' else None
+        if vaga.empresa_id != request.user.pk:
+            registrar_visualizacao(vaga.pk)
+
+        candidaturas, proximo_cursor, contagem, tempos = None, None, None, None
+        if eh_empresa:
+            candidaturas, proximo_cursor = paginar_por_criacao(
+                vaga.candidaturas.select_related('pcd').prefetch_related('pcd__perfil_pcd__deficiencias'),
+                cursor=request.GET.get('cursor'),
+            )
+            contagem = contagem_por_status(vaga)
+            tempos = tempo_medio_por_etapa(vaga=vaga)
 
         return render(request, self.template_name, {
             "vaga": vaga,
             "candidaturas": candidaturas,
+            "proximo_cursor": proximo_cursor,
+            "contagem_por_status": contagem,
+            "tempo_por_etapa": tempos,
             "pode_editar": vaga.pode_ser_editada(),
         })
 
 
+class CandidaturasStatusView(LoginRequiredMixin, View):
+    orcamento_consultas = 16
+
+    def post(self, request, pk):
+        vaga = get_object_or_404(Vaga, pk=pk, empresa=request.user)
+        ids = [int(i) for i in request.POST.getlist('candidaturas') if i.isdigit()]
+        novo_status = request.POST.get('status', '')
+
+        try:
+            resultado = transicionar_candidaturas(request.user, vaga, {novo_status: ids})
+        except ValidationError as e:
+            messages.error(request, " ".join(e.messages))
+            return redirect("job_vacancies:vaga_detail", pk)
+
+        alteradas = len(resultado['alteradas'][novo_status])
+        if alteradas:
+            messages.success(request, f"{alteradas} candidatura(s) atualizada(s).")
+        if resultado['ignoradas']:
+            messages.warning(
+                request,
+                f"{len(resultado['ignoradas'])} candidatura(s) não permitem essa mudança de status.",
+            )
+        return redirect("job_vacancies:vaga_detail", pk)
+
+
+class VagaCandidatarView(LoginRequiredMixin, View):
+    orcamento_consultas = 20
+
+    def post(self, request, pk):
+        vaga = get_object_or_404(Vaga, pk=pk, status='aberta')
+        try:
+            candidatar_pcd(request.user, vaga, request.POST.get('mensagem', ''))
+            messages.success(request, "Candidatura enviada!")
+        except PermissionDenied:
+            messages.error(request, "Apenas candidatos PCD podem se candidatar.")
+        except ValidationError as e:
+            messages.error(request, " ".join(e.messages))
+        return redirect("job_vacancies:vaga_detail", pk)
+
+
 class VagaSubmeterAprovacaoView(LoginRequiredMixin, View):
+    orcamento_consultas = 12
+
     def post(self, request, pk):
         vaga = get_object_or_404(Vaga, pk=pk, empresa=request.user)
         try:
@@ -67,8 +203,113 @@ class VagaSubmeterAprovacaoView(LoginRequiredMixin, View):
 
 
 class VagaPublicarView(LoginRequiredMixin, View):
+    orcamento_consultas = 10
+
     def post(self, request, pk):
         vaga = get_object_or_404(Vaga, pk=pk, empresa=request.user, status='aprovada')
         vaga.publicar()
         messages.success(request, "Vaga publicada com sucesso!")
-        return redirect("job_vacancies:minhas_vagas")
\ No newline at end of file
+        return redirect("job_vacancies:minhas_vagas")
+
+
+LIMITE_MENSAGENS = 100
+
+
+def _cursor_mensagem(valor):
+    try:
+        return max(int(valor), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _conversa_do_usuario(user, pk):
+    conversa = get_object_or_404(Conversa.objects.select_related('candidatura__vaga'), pk=pk)
+    return conversa, lado_na_conversa(conversa, user)
+
+
+class ChatMensagensView(LoginRequiredMixin, View):
+    orcamento_consultas = 10
+
+    def get(self, request, pk):
+        conversa, _ = _conversa_do_usuario(request.user, pk)
+        depois_de = _cursor_mensagem(request.GET.get('depois_de'))
+
+        mensagens = list(
+            Mensagem.objects.filter(conversa=conversa, pk__gt=depois_de).order_by('pk')[:LIMITE_MENSAGENS]
+        )
+        return JsonResponse({
+            "mensagens": [serializar_mensagem(m) for m in mensagens],
+            "cursor": mensagens[-1].pk if mensagens else depois_de,
+        })
+
+    def post(self, request, pk):
+        conversa, lado = _conversa_do_usuario(request.user, pk)
+        conteudo = request.POST.get('conteudo', '').strip()
+        if not conteudo and not request.FILES.get('anexo'):
+            return JsonResponse({"erro": "Mensagem vazia"}, status=400)
+
+        mensagem = enviar_mensagem(conversa, lado, conteudo, anexo=request.FILES.get('anexo'))
+        return JsonResponse(serializar_mensagem(mensagem), status=201)
+
+
+class ChatMarcarLidaView(LoginRequiredMixin, View):
+    orcamento_consultas = 8
+
+    def post(self, request, pk):
+        conversa, lado = _conversa_do_usuario(request.user, pk)
+        ate = request.POST.get('ate')
+        lidas = marcar_conversa_lida(conversa, lado, ate_mensagem_id=_cursor_mensagem(ate) if ate else None)
+        return JsonResponse({"lidas": lidas})
+
+
+class ChatStreamView(View):
+    """
+    Server-sent events com as mensagens novas da conversa. Retoma a partir
+    de Last-Event-ID (reconexão automática do EventSource) ou ?depois_de=.
+    Precisa ser servida via ASGI (src/asgi.py) para não prender um worker.
+    """
+    # Só a abertura; as consultas do stream rodam depois que o middleware mede
+    orcamento_consultas = 6
+
+    async def get(self, request, pk):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return HttpResponse(status=401)
+
+        conversa = await aget_object_or_404(Conversa.objects.select_related('candidatura__vaga'), pk=pk)
+        lado_na_conversa(conversa, user)
+
+        depois_de = _cursor_mensagem(request.headers.get('Last-Event-ID') or request.GET.get('depois_de'))
+        response = StreamingHttpResponse(
+            self._eventos(conversa.pk, depois_de), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def _eventos(self, conversa_id, ultimo_id):
+        # Assina antes da primeira leitura para não perder mensagens no intervalo
+        async with get_broker().assinar(conversa_id) as assinatura:
+            novas = True
+            while True:
+                if novas:
+                    async for mensagem in self._mensagens_depois(conversa_id, ultimo_id):
+                        ultimo_id = mensagem.pk
+                        dados = json.dumps(serializar_mensagem(mensagem))
+                        yield f"id: {mensagem.pk}\nevent: mensagem\ndata: {dados}\n\n"
+                else:
+                    yield ": ping\n\n"
+                novas = await assinatura.aguardar(settings.CHAT_HEARTBEAT)
+
+    async def _mensagens_depois(self, conversa_id, ultimo_id):
+        while True:
+            lote = [
+                m async for m in Mensagem.objects.filter(
+                    conversa_id=conversa_id, pk__gt=ultimo_id
+                ).order_by('pk')[:LIMITE_MENSAGENS]
+            ]
+            for mensagem in lote:
+                yield mensagem
+            if len(lote) < LIMITE_MENSAGENS:
+                return
+            ultimo_id = lote[-1].pk
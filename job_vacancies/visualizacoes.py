@@ -0,0 +1,223 @@
+"""
+Contador de visualizações de vagas com escrita agrupada.
+
+Os incrementos são acumulados num buffer e aplicados em lote com um único
+UPDATE ... CASE por bloco de vagas, em vez de um UPDATE por visualização.
+
+Backends (settings.VISUALIZACOES_BUFFER):
+    'local'  buffer em memória do processo, descarregado pelo próprio processo
+             (src/flush.py) quando o intervalo expira, o buffer enche ou o
+             processo termina
+    'cache'  buffer no cache compartilhado (Redis em produção), descarregado
+             periodicamente pela task job_vacancies.tasks.flush_visualizacoes_task
+
+Com settings.VISUALIZACOES_FLUSH_SINCRONO = True cada visualização é aplicada
+na hora (útil em testes).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, Value, When
+
+from src.flush import FlushPeriodico
+
+from .models import Vaga
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+LIMITE_BUFFER_LOCAL = 1000
+PREFIXO = 'visualizacoes'
+METRICAS_KEY = f'{PREFIXO}:metricas'
+
+
+def aplicar_incrementos(contagens):
+    """Aplica {vaga_id: incremento} com um UPDATE ... CASE por lote."""
+    ids = [vaga_id for vaga_id, total in contagens.items() if total]
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        lote = ids[inicio:inicio + TAMANHO_LOTE]
+        incremento = Case(
+            *[When(pk=vaga_id, then=Value(contagens[vaga_id])) for vaga_id in lote],
+            default=Value(0),
+        )
+        Vaga.objects.filter(pk__in=lote).update(visualizacoes=F('visualizacoes') + incremento)
+    return len(ids)
+
+
+def _registrar_metricas(pendentes, vagas, duracao):
+    metricas = cache.get(METRICAS_KEY) or {'flushes': 0, 'visualizacoes': 0}
+    metricas['flushes'] += 1
+    metricas['visualizacoes'] += pendentes
+    metricas['ultimo_flush'] = {
+        'visualizacoes': pendentes,
+        'vagas': vagas,
+        'duracao_ms': round(duracao * 1000, 2),
+        'em': time.time(),
+    }
+    cache.set(METRICAS_KEY, metricas, None)
+    logger.info(
+        "Flush de visualizações: %s visualizações em %s vagas (%.2f ms)",
+        pendentes, vagas, duracao * 1000,
+    )
+
+
+def _flush(contagens):
+    if not contagens:
+        return 0
+    inicio = time.perf_counter()
+    vagas = aplicar_incrementos(contagens)
+    _registrar_metricas(sum(contagens.values()), vagas, time.perf_counter() - inicio)
+    return vagas
+
+
+class BufferLocal:
+    def __init__(self, intervalo, limite=LIMITE_BUFFER_LOCAL):
+        self.intervalo = intervalo
+        self.limite = limite
+        self._lock = threading.Lock()
+        self._contagens = {}
+        self._ultimo_flush = time.monotonic()
+        self._periodico = FlushPeriodico(intervalo, self.flush, 'visualizações')
+
+    def registrar(self, vaga_id):
+        with self._lock:
+            self._contagens[vaga_id] = self._contagens.get(vaga_id, 0) + 1
+            vencido = time.monotonic() - self._ultimo_flush >= self.intervalo
+            if not (vencido or len(self._contagens) >= self.limite):
+                self._periodico.agendar()
+                return
+        self.flush()
+
+    def _drenar(self):
+        with self._lock:
+            contagens, self._contagens = self._contagens, {}
+            self._ultimo_flush = time.monotonic()
+        return contagens
+
+    def flush(self):
+        contagens = self._drenar()
+        try:
+            return _flush(contagens)
+        except Exception:
+            # Devolve ao buffer para a próxima tentativa
+            with self._lock:
+                for vaga_id, total in contagens.items():
+                    self._contagens[vaga_id] = self._contagens.get(vaga_id, 0) + total
+            raise
+
+    def tamanho(self):
+        with self._lock:
+            return {'vagas': len(self._contagens), 'visualizacoes': sum(self._contagens.values())}
+
+
+class BufferCache:
+    """
+    Buffer no cache compartilhado, particionado em janelas de `intervalo`
+    segundos. Só janelas já encerradas são descarregadas, então o flush
+    nunca disputa chaves com processos que ainda estão incrementando.
+    Usa apenas add/incr/get_many, que são atômicos nos backends do Django.
+    """
+    JANELAS_RETROATIVAS = 120
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.ttl = intervalo * (self.JANELAS_RETROATIVAS + 2)
+
+    def _janela(self):
+        return int(time.time() // self.intervalo)
+
+    def _key(self, janela, *partes):
+        return ':'.join([PREFIXO, str(janela), *map(str, partes)])
+
+    def registrar(self, vaga_id):
+        janela = self._janela()
+        if cache.add(self._key(janela, 'vaga', vaga_id), 1, self.ttl):
+            slots = self._key(janela, 'slots')
+            cache.add(slots, 0, self.ttl)
+            slot = cache.incr(slots)
+            cache.set(self._key(janela, 'slot', slot), vaga_id, self.ttl)
+        else:
+            cache.incr(self._key(janela, 'vaga', vaga_id))
+
+    def _ler_janela(self, janela):
+        total_slots = cache.get(self._key(janela, 'slots')) or 0
+        if not total_slots:
+            return {}, []
+        slot_keys = [self._key(janela, 'slot', n) for n in range(1, total_slots + 1)]
+        vaga_ids = list(cache.get_many(slot_keys).values())
+        vaga_keys = {self._key(janela, 'vaga', vaga_id): vaga_id for vaga_id in vaga_ids}
+        contagens = {
+            vaga_keys[key]: total for key, total in cache.get_many(list(vaga_keys)).items()
+        }
+        return contagens, [self._key(janela, 'slots'), *slot_keys, *vaga_keys]
+
+    def flush(self):
+        atual = self._janela()
+        ultima_key = f'{PREFIXO}:ultima_janela'
+        ultima = cache.get(ultima_key) or atual - self.JANELAS_RETROATIVAS
+
+        contagens, keys, travas = {}, [], []
+        for janela in range(ultima + 1, atual):
+            # Garante um único flush por janela mesmo com vários workers
+            trava = self._key(janela, 'flush')
+            if not cache.add(trava, 1, self.ttl):
+                continue
+            travas.append(trava)
+            parcial, keys_janela = self._ler_janela(janela)
+            for vaga_id, total in parcial.items():
+                contagens[vaga_id] = contagens.get(vaga_id, 0) + total
+            keys.extend(keys_janela)
+
+        try:
+            vagas = _flush(contagens)
+        except Exception:
+            cache.delete_many(travas)
+            raise
+        cache.delete_many(keys)
+        cache.set(ultima_key, atual - 1, None)
+        return vagas
+
+    def tamanho(self):
+        janela = self._janela()
+        return {'janela_atual': cache.get(self._key(janela, 'slots')) or 0}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                intervalo = getattr(settings, 'VISUALIZACOES_FLUSH_INTERVALO', 30)
+                if getattr(settings, 'VISUALIZACOES_BUFFER', 'local') == 'cache':
+                    _buffer = BufferCache(intervalo)
+                else:
+                    _buffer = BufferLocal(intervalo)
+    return _buffer
+
+
+def registrar_visualizacao(vaga_id):
+    if getattr(settings, 'VISUALIZACOES_FLUSH_SINCRONO', False):
+        _flush({vaga_id: 1})
+        return
+    try:
+        get_buffer().registrar(vaga_id)
+    except Exception:
+        # Contagem de visualização nunca deve derrubar a página da vaga
+        logger.warning("Falha ao registrar visualização da vaga %s", vaga_id, exc_info=True)
+
+
+def flush_visualizacoes():
+    return get_buffer().flush()
+
+
+def metricas_visualizacoes():
+    metricas = dict(cache.get(METRICAS_KEY) or {'flushes': 0, 'visualizacoes': 0})
+    metricas['buffer'] = get_buffer().tamanho()
+    return metricas
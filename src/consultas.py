@@ -0,0 +1,166 @@
+"""
+Orçamento de consultas SQL por requisição e detector de N+1.
+
+RegistroConsultas grava toda consulta executada (em todos os bancos) via
+execute_wrapper, sem depender de DEBUG. Consultas com o mesmo formato,
+diferindo só nos parâmetros, repetidas settings.QUERY_REPETICAO_LIMITE
+vezes ou mais são apontadas como N+1.
+
+O orçamento de cada view vem, nesta ordem, de:
+    atributo `orcamento_consultas` da view (classe ou função, ver @orcamento)
+    settings.QUERY_ORCAMENTOS[<nome da url>]
+    settings.QUERY_ORCAMENTO_PADRAO
+
+settings.QUERY_ORCAMENTO_MODO: 'desligado', 'avisar' (log + cabeçalho
+X-Consultas, para desenvolvimento) ou 'falhar' (levanta
+OrcamentoConsultasExcedido; os testes de views ligam com override_settings).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRINGS = re.compile(r"'(?:''|[^'])*'")
+_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LISTAS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_CONTROLE = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT', 'ROLLBACK')
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    pass
+
+
+def formato(sql):
+    """SQL sem os valores: duas consultas com o mesmo formato só diferem nos parâmetros."""
+    sql = _NUMEROS.sub('?', _STRINGS.sub('?', sql))
+    return ' '.join(_LISTAS.sub('(...)', sql).split())
+
+
+@dataclass
+class Consulta:
+    banco: str
+    sql: str
+    duracao_ms: float
+
+
+class RegistroConsultas:
+    def __init__(self):
+        self.consultas = []
+        self._pilha = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append(
+                Consulta(context['connection'].alias, sql, (time.perf_counter() - inicio) * 1000)
+            )
+
+    def __enter__(self):
+        self._pilha = ExitStack()
+        for conexao in connections.all():
+            self._pilha.enter_context(conexao.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._pilha.close()
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+    @property
+    def duracao_ms(self):
+        return sum(consulta.duracao_ms for consulta in self.consultas)
+
+    def repetidas(self, limite=None):
+        """[(formato, vezes)] das consultas repetidas `limite` vezes ou mais."""
+        limite = limite or getattr(settings, 'QUERY_REPETICAO_LIMITE', 3)
+        contagem = Counter(
+            formato(consulta.sql) for consulta in self.consultas
+            if not consulta.sql.lstrip().upper().startswith(_CONTROLE)
+        )
+        return [(sql, vezes) for sql, vezes in contagem.most_common() if vezes >= limite]
+
+    def problemas(self, maximo=None, limite_repeticao=None):
+        problemas = []
+        if maximo is not None and self.total > maximo:
+            problemas.append(f"{self.total} consultas, orçamento de {maximo}")
+        for sql, vezes in self.repetidas(limite_repeticao):
+            problemas.append(f"N+1: {vezes}x {sql[:300]}")
+        return problemas
+
+    def relatorio(self, titulo, problemas):
+        linhas = [f"{titulo}: {self.total} consultas em {self.duracao_ms:.1f}ms", *problemas]
+        return '\n  '.join(linhas)
+
+
+def orcamento(maximo):
+    """Declara o orçamento de consultas de uma view baseada em função."""
+    def decorator(view):
+        view.orcamento_consultas = maximo
+        return view
+    return decorator
+
+
+def orcamento_da_view(view_func, nome_url=None):
+    for alvo in (view_func, getattr(view_func, 'view_class', None)):
+        maximo = getattr(alvo, 'orcamento_consultas', None)
+        if maximo is not None:
+            return maximo
+    orcamentos = getattr(settings, 'QUERY_ORCAMENTOS', {})
+    if nome_url in orcamentos:
+        return orcamentos[nome_url]
+    return getattr(settings, 'QUERY_ORCAMENTO_PADRAO', None)
+
+
+@contextmanager
+def orcamento_consultas(maximo=None, limite_repeticao=None):
+    """
+    Para testes: falha se o bloco passar de `maximo` consultas ou repetir
+    uma consulta com o mesmo formato (N+1).
+
+        with orcamento_consultas(6):
+            client.get(url)
+    """
+    with RegistroConsultas() as registro:
+        yield registro
+    problemas = registro.problemas(maximo, limite_repeticao)
+    if problemas:
+        raise OrcamentoConsultasExcedido(registro.relatorio("Orçamento de consultas excedido", problemas))
+
+
+class OrcamentoConsultasMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Lido a cada requisição para valer o override_settings dos testes
+        modo = getattr(settings, 'QUERY_ORCAMENTO_MODO', 'desligado')
+        if modo == 'desligado':
+            return self.get_response(request)
+
+        with RegistroConsultas() as registro:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        maximo = orcamento_da_view(match.func, match.view_name)
+        response['X-Consultas'] = str(registro.total)
+
+        problemas = registro.problemas(maximo)
+        if problemas:
+            relatorio = registro.relatorio(f"{request.method} {request.path} ({match.view_name})", problemas)
+            if modo == 'falhar':
+                raise OrcamentoConsultasExcedido(relatorio)
+            logger.warning(relatorio)
+        return response
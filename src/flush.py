@@ -0,0 +1,54 @@
+"""
+Descarga periódica de buffers em memória do processo.
+
+Um buffer local só existe no processo que o encheu: uma task do Celery roda
+no worker e veria o buffer sempre vazio. FlushPeriodico dispara o flush no
+próprio processo, numa thread, `intervalo` segundos depois da primeira
+escrita pendente, e mais uma vez na saída do interpretador.
+"""
+import atexit
+import logging
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class FlushPeriodico:
+    def __init__(self, intervalo, flush, nome):
+        self.intervalo = intervalo
+        self.nome = nome
+        self._flush = flush
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self._executar)
+
+    def agendar(self):
+        """Chamado a cada escrita; só arma um timer se não houver outro pendente."""
+        if self._timer is not None:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.intervalo, self._disparar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _disparar(self):
+        with self._lock:
+            self._timer = None
+        try:
+            if not self._executar():
+                # O buffer devolveu o que não conseguiu gravar; tenta no próximo intervalo
+                self.agendar()
+        finally:
+            connections.close_all()
+
+    def _executar(self):
+        try:
+            self._flush()
+        except Exception:
+            logger.warning("Falha no flush de %s", self.nome, exc_info=True)
+            return False
+        return True
@@ -0,0 +1,144 @@
+"""
+Roteamento de leituras para réplicas.
+
+Só vai para réplica o que foi marcado: views com ReplicaLeituraMixin e
+blocos `with usar_replica():`, ou querysets com `.using(alias_leitura())`.
+O resto continua no primário.
+
+Depois de uma escrita o usuário fica preso ao primário por
+settings.DB_REPLICA_FIXO_SEGUNDOS (cookie gravado pelo ReplicaMiddleware),
+para ler o que acabou de gravar. Réplicas atrasadas mais que
+settings.DB_REPLICA_MAX_ATRASO segundos, ou que não respondem, são puladas;
+sem réplica saudável a leitura cai no primário.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+COOKIE_PRIMARIO = 'primario_ate'
+# Sessão atrasada derrubaria o login recém-feito
+APPS_SO_NO_PRIMARIO = {'sessions'}
+
+ATRASO_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_leitura_replica = ContextVar('leitura_replica', default=False)
+# Estado da requisição atual: {'fixo': bool, 'escreveu': bool}
+_requisicao = ContextVar('requisicao_replica', default=None)
+_atrasos = {}
+
+
+def replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def _atraso(alias):
+    intervalo = getattr(settings, 'DB_REPLICA_VERIFICACAO', 5)
+    verificado = _atrasos.get(alias)
+    if verificado and time.monotonic() - verificado[0] < intervalo:
+        return verificado[1]
+
+    conexao = connections[alias]
+    try:
+        if conexao.vendor == 'postgresql':
+            with conexao.cursor() as cursor:
+                cursor.execute(ATRASO_SQL)
+                atraso = float(cursor.fetchone()[0] or 0)
+        else:
+            atraso = 0.0
+    except Exception:
+        logger.warning("Réplica %s indisponível; lendo do primário", alias, exc_info=True)
+        atraso = float('inf')
+    _atrasos[alias] = (time.monotonic(), atraso)
+    return atraso
+
+
+def alias_leitura():
+    """Banco para uma leitura agora: uma réplica saudável ou o primário."""
+    estado = _requisicao.get()
+    if estado and (estado['fixo'] or estado['escreveu']):
+        return DEFAULT_DB_ALIAS
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+
+    limite = getattr(settings, 'DB_REPLICA_MAX_ATRASO', 5)
+    saudaveis = [alias for alias in replicas() if _atraso(alias) <= limite]
+    return random.choice(saudaveis) if saudaveis else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def usar_replica():
+    token = _leitura_replica.set(True)
+    try:
+        yield
+    finally:
+        _leitura_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _leitura_replica.get() or model._meta.app_label in APPS_SO_NO_PRIMARIO:
+            return None
+        return alias_leitura()
+
+    def db_for_write(self, model, **hints):
+        estado = _requisicao.get()
+        if estado is not None:
+            estado['escreveu'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaLeituraMixin:
+    """Para views que só leem: as consultas da view vão para uma réplica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with usar_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaMiddleware:
+    """Prende ao primário, por alguns segundos, quem acabou de escrever."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            fixo = float(request.COOKIES.get(COOKIE_PRIMARIO, 0)) > time.time()
+        except ValueError:
+            fixo = False
+        estado = {'fixo': fixo, 'escreveu': False}
+        token = _requisicao.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _requisicao.reset(token)
+
+        if estado['escreveu'] and replicas():
+            janela = getattr(settings, 'DB_REPLICA_FIXO_SEGUNDOS', 10)
+            response.set_cookie(
+                COOKIE_PRIMARIO, str(time.time() + janela), max_age=janela, httponly=True, samesite='Lax'
+            )
+        return response
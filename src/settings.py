@@ -31,15 +31,26 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'src.consultas.OrcamentoConsultasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'account.middleware.AtividadeSessaoMiddleware',
+    'src.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+AUTHENTICATION_BACKENDS = [
+    # Traz os perfis junto com o usuário da sessão (account/papeis.py)
+    'account.backends.PerfilBackend',
+    # Sessões abertas antes do PerfilBackend guardam este caminho; sem ele na
+    # lista o usuário seria deslogado. Pode sair depois de SESSION_COOKIE_AGE.
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 ROOT_URLCONF = 'src.urls'
 
 TEMPLATES = [
@@ -59,12 +70,78 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'src.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Banco de dados: DB_ENGINE=postgres usa PostgreSQL com o pool nativo do
+# psycopg 3 (psycopg-pool); sem a variável fica o SQLite local.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+
+def _postgres(prefixo='DB'):
+    """Configuração PostgreSQL lida das variáveis <prefixo>_NAME, <prefixo>_HOST..."""
+    def env(nome, padrao=None):
+        return os.getenv(f'{prefixo}_{nome}', os.getenv(f'DB_{nome}', padrao))
+
+    timeout_ms = int(env('STATEMENT_TIMEOUT_MS', 15000))
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env('NAME', 'systemjob'),
+        'USER': env('USER', 'postgres'),
+        'PASSWORD': env('PASSWORD', ''),
+        'HOST': env('HOST', 'localhost'),
+        'PORT': env('PORT', '5432'),
+        # Com pool, o Django passa ConnectionPool.check_connection: a conexão é
+        # testada antes de ser entregue a uma requisição
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': int(env('CONNECT_TIMEOUT', 5)),
+            # Consultas presas ou transações abandonadas não seguram conexões do pool
+            'options': f'-c statement_timeout={timeout_ms} -c idle_in_transaction_session_timeout={timeout_ms * 4}',
+        },
     }
-}
+    if env('POOL', '1') == '1':
+        config['OPTIONS']['pool'] = {
+            'min_size': int(env('POOL_MIN', 2)),
+            'max_size': int(env('POOL_MAX', 10)),
+            'timeout': float(env('POOL_TIMEOUT', 10)),
+            'max_idle': float(env('POOL_MAX_IDLE', 300)),
+            'max_lifetime': float(env('POOL_MAX_LIFETIME', 1800)),
+        }
+    else:
+        # Sem pool: conexão persistente por thread
+        config['CONN_MAX_AGE'] = int(env('CONN_MAX_AGE', 60))
+    return config
+
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {'default': _postgres()}
+    # Réplicas de leitura (src/replicas.py): DB_REPLICA_HOSTS=host1,host2; as
+    # demais DB_REPLICA_* caem nas DB_* do primário quando ausentes
+    for _numero, _host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+        DATABASES[f'replica_{_numero}'] = {
+            **_postgres('DB_REPLICA'),
+            'HOST': _host.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Escritas concorrentes (runserver com threads, ASGI, teste_carga) esperam
+            # o lock em vez de falhar com "database is locked" no meio da transação
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': int(os.getenv('DB_SQLITE_TIMEOUT', 20)),
+            },
+        }
+    }
+    # Segunda conexão ao mesmo arquivo faz o papel de réplica localmente e nos testes
+    if os.getenv('DB_REPLICA_LOCAL', '1') == '1':
+        DATABASES['replica_1'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['src.replicas.ReplicaRouter']
+DB_REPLICA_FIXO_SEGUNDOS = int(os.getenv('DB_REPLICA_FIXO_SEGUNDOS', 10))
+DB_REPLICA_MAX_ATRASO = float(os.getenv('DB_REPLICA_MAX_ATRASO', 5))
+DB_REPLICA_VERIFICACAO = int(os.getenv('DB_REPLICA_VERIFICACAO', 5))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,6 +191,7 @@ AWS_S3_REGION_NAME = os.getenv('SUPABASE_S3_REGION', 'us-west-2')
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = None
 AWS_QUERYSTRING_AUTH = True
+AWS_QUERYSTRING_EXPIRE = int(os.getenv('AWS_QUERYSTRING_EXPIRE', 3600))
 AWS_S3_CUSTOM_DOMAIN = None
 AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'max-age=86400'}
 AWS_S3_SIGNATURE_VERSION = 's3v4'
@@ -121,6 +199,17 @@ AWS_S3_ADDRESSING_STYLE = 'virtual'
 
 API_RESEND = os.getenv('RESEND_API_KEY')
 
+# Fila de e-mails (account/emails.py). Sem chave do Resend, usa EMAIL_BACKEND do Django
+EMAIL_OUTBOX_BACKEND = os.getenv(
+    'EMAIL_OUTBOX_BACKEND', 'account.emails.BackendResend' if API_RESEND else 'account.emails.BackendDjango'
+)
+EMAIL_OUTBOX_LOTE = int(os.getenv('EMAIL_OUTBOX_LOTE', 100))
+EMAIL_OUTBOX_MAX_TENTATIVAS = int(os.getenv('EMAIL_OUTBOX_MAX_TENTATIVAS', 8))
+EMAIL_OUTBOX_LIMITE_POR_MINUTO = int(os.getenv('EMAIL_OUTBOX_LIMITE_POR_MINUTO', 600))
+EMAIL_OUTBOX_SINCRONO = False
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'emails'
+
 from django.contrib.messages import constants as messages
 
 MESSAGE_TAGS = {
@@ -178,4 +267,82 @@ CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_RESULT_SERIALIZER = 'json'
+
+# Cache da aplicação (job_vacancies/cache.py): locmem, file ou redis
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/1')),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_FILE_PATH', str(BASE_DIR / 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'systemjob',
+        }
+    }
+
+# As versões que invalidam o cache (job_vacancies/cache.py, account/referencias.py)
+# precisam ser vistas por todos os processos; o locmem é de um processo só
+if CACHE_BACKEND not in ('redis', 'file') and not DEBUG:
+    raise ValueError("CACHE_BACKEND precisa ser 'redis' (ou 'file', com um único servidor) fora do DEBUG")
+
+# Contador de visualizações de vagas (job_vacancies/visualizacoes.py)
+VISUALIZACOES_BUFFER = os.getenv('VISUALIZACOES_BUFFER', 'local')
+VISUALIZACOES_FLUSH_INTERVALO = int(os.getenv('VISUALIZACOES_FLUSH_INTERVALO', 30))
+VISUALIZACOES_FLUSH_SINCRONO = False
+
+# Agendamento do celery beat
+CELERY_BEAT_SCHEDULE = {
+    'enviar-emails-pendentes': {
+        'task': 'account.tasks.enviar_emails_pendentes_task',
+        'schedule': 15.0,
+    },
+    'reagendar-avatares-pendentes': {
+        'task': 'account.tasks.reagendar_avatares_pendentes_task',
+        'schedule': 30 * 60.0,
+    },
+    # Não faz nada com o buffer 'local': cada processo web descarrega o próprio
+    'flush-visualizacoes-vagas': {
+        'task': 'job_vacancies.tasks.flush_visualizacoes_task',
+        'schedule': float(VISUALIZACOES_FLUSH_INTERVALO),
+    },
+}
+
+# Pub/sub do chat (job_vacancies/chat.py)
+CHAT_PUBSUB = os.getenv('CHAT_PUBSUB', 'job_vacancies.chat.BrokerEmMemoria')
+CHAT_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+CHAT_HEARTBEAT = 15
+
+# Fila de aprovação médica (job_vacancies/fila_aprovacao.py)
+FILA_MEDICA_RESERVA_MINUTOS = int(os.getenv('FILA_MEDICA_RESERVA_MINUTOS', 30))
+FILA_MEDICA_LOTE = int(os.getenv('FILA_MEDICA_LOTE', 5))
+
+# Processamento de avatares (account/avatars.py); True processa na própria requisição
+AVATAR_PROCESSAMENTO_SINCRONO = False
+
+# Orçamento de consultas por requisição (src/consultas.py): 'desligado', 'avisar' ou 'falhar'
+QUERY_ORCAMENTO_MODO = os.getenv('QUERY_ORCAMENTO_MODO', 'avisar' if DEBUG else 'desligado')
+QUERY_ORCAMENTO_PADRAO = int(os.getenv('QUERY_ORCAMENTO_PADRAO', 30))
+QUERY_REPETICAO_LIMITE = int(os.getenv('QUERY_REPETICAO_LIMITE', 3))
+# Orçamentos por nome de url, para views de terceiros (admin)
+QUERY_ORCAMENTOS = {}
+
+# Resultados do comando benchmark (job_vacancies/benchmarks.py)
+BENCHMARK_RESULTADOS = Path(os.getenv('BENCHMARK_RESULTADOS', BASE_DIR / 'benchmarks' / 'resultados.jsonl'))
+
+# Atividade dos usuários (account/atividade.py): no máximo uma escrita por usuário por janela
+ATIVIDADE_JANELA = int(os.getenv('ATIVIDADE_JANELA', 300))
+ATIVIDADE_FLUSH_INTERVALO = int(os.getenv('ATIVIDADE_FLUSH_INTERVALO', 30))
+ATIVIDADE_FLUSH_SINCRONO = False
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from account.models import CategoriaDeficiencia
+from job_vacancies.models import Vaga
+from job_vacancies.tests import SENHA, ambiente_de_teste, criar_empresa, criar_medico, criar_pcd, vaga_aberta
+
+from .replicas import COOKIE_PRIMARIO, alias_leitura, usar_replica
+
+
+def consultas_em(alias):
+    return CaptureQueriesContext(connections[alias])
+
+
+# Fora de transação: dentro do atomic do TestCase toda leitura fica no primário
+@ambiente_de_teste
+@mock.patch.dict('src.replicas._atrasos', clear=True)
+class ReplicaTests(TransactionTestCase):
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_leitura_marcada_vai_para_a_replica(self):
+        self.assertEqual(Vaga.objects.all().db, 'default')
+        with usar_replica():
+            self.assertEqual(Vaga.objects.all().db, 'replica_1')
+        self.assertEqual(Vaga.objects.using(alias_leitura()).db, 'replica_1')
+
+    def test_escrita_vai_para_o_primario(self):
+        with usar_replica(), consultas_em('replica_1') as replica:
+            categoria = CategoriaDeficiencia.objects.create(nome="Visual")
+        self.assertEqual(categoria._state.db, 'default')
+        self.assertEqual(len(replica), 0)
+
+    def test_view_marcada_le_da_replica(self):
+        visual = CategoriaDeficiencia.objects.create(nome="Visual")
+        vaga_aberta(criar_empresa(), criar_medico(), [visual])
+        with consultas_em('default') as primario, consultas_em('replica_1') as replica:
+            response = self.client.get(reverse('job_vacancies:busca'), {'q': "Analista"})
+        self.assertEqual(len(response.context['vagas']), 1)
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse([c for c in primario.captured_queries if 'job_vacancies_vaga' in c['sql']])
+
+    def test_depois_de_escrever_le_do_primario(self):
+        pcd = criar_pcd()
+        response = self.client.post(reverse('account:login'), {'email': pcd.email, 'password': SENHA})
+        self.assertIn(COOKIE_PRIMARIO, response.cookies)
+
+        with consultas_em('replica_1') as replica:
+            self.client.get(reverse('job_vacancies:busca'), {'q': "Analista"})
+        self.assertEqual(len(replica), 0)
+
+    def test_replica_indisponivel_cai_no_primario(self):
+        conexao = connections['replica_1']
+        with mock.patch.object(conexao, 'vendor', 'postgresql'), \
+                mock.patch.object(conexao, 'cursor', side_effect=OperationalError):
+            self.assertEqual(alias_leitura(), 'default')
+
+    def test_replica_atrasada_cai_no_primario(self):
+        conexao = connections['replica_1']
+        with mock.patch.object(conexao, 'vendor', 'postgresql'), mock.patch.object(conexao, 'cursor') as cursor:
+            cursor.return_value.__enter__.return_value.fetchone.return_value = (30,)
+            with self.settings(DB_REPLICA_MAX_ATRASO=5):
+                self.assertEqual(alias_leitura(), 'default')